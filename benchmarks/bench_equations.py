@@ -0,0 +1,21 @@
+"""Benchmarks of equation parsing, per equation and per column."""
+
+import pandas as pd
+from kegg.equations import parse_equation, parse_equations
+from kegg.fetch_kegg_reaction import split_equation
+
+EQUATION = '(n+1) C00002 + C00022 + 2 C00001 <=> C00008 + C00074 + C00404(n)'
+
+def bench_parse_equation(benchmark):
+    benchmark(parse_equation, EQUATION)
+
+def bench_split_equation(benchmark):
+    benchmark(split_equation, EQUATION)
+
+def bench_parse_equation_loop(benchmark, reaction_records):
+    equations = [record['equation'] for record in reaction_records]
+    benchmark(lambda: [parse_equation(equation) for equation in equations])
+
+def bench_parse_equations_column(benchmark, reaction_records):
+    equations = pd.Series([record['equation'] for record in reaction_records])
+    benchmark(parse_equations, equations)
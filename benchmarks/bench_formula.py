@@ -0,0 +1,38 @@
+"""Benchmarks of formula parsing and mass balance checks at KEGG snapshot scale."""
+
+import random
+import pandas as pd
+import pytest
+from kegg.formula import check_mass_balance, parse_formulas
+
+# Sizes close to a full KEGG snapshot
+COMPOUNDS = 20000
+REACTIONS = 12000
+
+@pytest.fixture(scope='module')
+def snapshot():
+    rng = random.Random(0)
+    patterns = ['C{}H{}O{}', 'C{}H{}N{}O{}P', 'C{}H{}O{}R', '(C{}H{}O{})n', 'C{}H{}N{}O{}S']
+    formulas = [rng.choice(patterns).format(*(rng.randint(1, 30) for _ in range(4))) for _ in range(COMPOUNDS)]
+    compounds = pd.DataFrame({'compound_id': [f"C{index:05d}" for index in range(COMPOUNDS)], 'formula': formulas})
+
+    def side():
+        return [{'coefficient': str(rng.randint(1, 3)), 'compound': f"C{rng.randrange(COMPOUNDS):05d}"}
+                for _ in range(rng.randint(1, 3))]
+    reactions = pd.DataFrame({
+        'reaction_id': [f"R{index:05d}" for index in range(REACTIONS)],
+        'reactants': [side() for _ in range(REACTIONS)],
+        'products': [side() for _ in range(REACTIONS)],
+        'is_reversible': [True] * REACTIONS,
+    })
+    return compounds, reactions
+
+def bench_parse_formulas(benchmark, snapshot):
+    compounds, _ = snapshot
+    benchmark(parse_formulas, compounds['formula'].tolist(), compounds['compound_id'].tolist())
+
+def bench_check_mass_balance(benchmark, snapshot):
+    pytest.importorskip('scipy')
+    compounds, reactions = snapshot
+    elements = parse_formulas(compounds['formula'].tolist(), compounds['compound_id'].tolist())
+    benchmark(check_mass_balance, reactions, elements)
@@ -0,0 +1,23 @@
+"""Benchmarks of DataFrame construction from parsed records."""
+
+import pandas as pd
+from kegg.parser import REACTION_SCHEMA, parse_entries
+from kegg.records import to_frame
+
+FIELDS = list(REACTION_SCHEMA.fields)
+
+def bench_frame_per_row(benchmark, reaction_records):
+    # One single-row DataFrame per entry, as repeated get_reaction_info calls build
+    records = reaction_records[:1000]
+    benchmark(lambda: pd.concat([pd.DataFrame([record])[FIELDS] for record in records], ignore_index=True))
+
+def bench_frame_batched(benchmark, reaction_records):
+    records = reaction_records[:1000]
+    benchmark(lambda: pd.DataFrame(records, columns=FIELDS))
+
+def bench_frame_batched_dump(benchmark, reaction_records):
+    benchmark(lambda: pd.DataFrame(reaction_records, columns=FIELDS))
+
+def bench_frame_typed_dump(benchmark, reaction_dump):
+    records = parse_entries(reaction_dump, REACTION_SCHEMA, typed=True)
+    benchmark(to_frame, records)
@@ -0,0 +1,18 @@
+"""Benchmarks of memoized lookups against parsing the entry text again."""
+
+from kegg.memo import RecordMemo
+from kegg.parser import REACTION_SCHEMA, parse_entry
+from kegg.records import reaction_from_dict
+
+def bench_parse_again(benchmark, reaction_texts):
+    benchmark(parse_entry, reaction_texts[0], REACTION_SCHEMA)
+
+def bench_memo_hit_dict(benchmark, reaction_texts):
+    memo = RecordMemo()
+    memo.set('rn', 'R00200', parse_entry(reaction_texts[0], REACTION_SCHEMA))
+    benchmark(memo.get, 'rn', 'R00200')
+
+def bench_memo_hit_typed(benchmark, reaction_texts):
+    memo = RecordMemo()
+    memo.set('rn', 'R00200', parse_entry(reaction_texts[0], REACTION_SCHEMA))
+    benchmark(memo.get, 'rn', 'R00200', reaction_from_dict)
@@ -0,0 +1,23 @@
+"""Benchmarks of the metrics instrumentation, disabled and enabled."""
+
+from kegg import metrics
+from kegg.parser import REACTION_SCHEMA, parse_entry
+
+def _timed_parse(text):
+    with metrics.timer('kegg_stage_seconds', kind='reaction', stage='parse'):
+        return parse_entry(text, REACTION_SCHEMA)
+
+def bench_parse_uninstrumented(benchmark, reaction_texts):
+    text = reaction_texts[0]
+    benchmark(parse_entry, text, REACTION_SCHEMA)
+
+def bench_parse_metrics_disabled(benchmark, reaction_texts):
+    metrics.disable()
+    benchmark(_timed_parse, reaction_texts[0])
+
+def bench_parse_metrics_enabled(benchmark, reaction_texts):
+    metrics.enable()
+    try:
+        benchmark(_timed_parse, reaction_texts[0])
+    finally:
+        metrics.disable()
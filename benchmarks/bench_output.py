@@ -0,0 +1,18 @@
+"""Benchmarks of writing reaction tables as CSV and columnar files."""
+
+import pandas as pd
+import pytest
+from kegg.output import write_dataframe
+from kegg.parser import REACTION_SCHEMA
+
+@pytest.fixture(scope='module')
+def reactions_df(reaction_records):
+    return pd.DataFrame(reaction_records, columns=list(REACTION_SCHEMA.fields))
+
+def bench_write_csv(benchmark, reactions_df, tmp_path):
+    benchmark(write_dataframe, reactions_df, str(tmp_path / 'reactions.csv'))
+
+@pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+def bench_write_columnar(benchmark, reactions_df, tmp_path, file_format):
+    pytest.importorskip('pyarrow')
+    benchmark(write_dataframe, reactions_df, str(tmp_path / f'reactions.{file_format}'))
@@ -0,0 +1,220 @@
+"""Parse-throughput benchmark: table-driven parser vs. the previous if/elif parsers.
+
+Builds a large multi-entry input from the recorded entries in
+``tests/fixtures`` and reports entries parsed per second.
+
+Usage:
+    python benchmarks/bench_parser.py [--entries 20000] [--repeat 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Union
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from kegg.batch import split_entries  # noqa: E402
+from kegg.equations import parse_equation  # noqa: E402
+from kegg.parser import COMPOUND_SCHEMA, REACTION_SCHEMA, parse_entries  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+
+# Previous section-by-section parsers, kept verbatim as the baseline
+
+def legacy_parse_reaction(response_text: str) -> Dict[str, Union[str, List[Dict[str, str]], bool]]:
+    """Parse KEGG API response into structured data.
+    
+    Args:
+        response_text: Raw response text from KEGG API.
+        
+    Returns:
+        Dictionary containing parsed reaction information.
+    """
+    data = {
+        'reaction_id': '',
+        'name': '',
+        'definition': '',
+        'equation': '',
+        'reactants': [],
+        'products': [],
+        'is_reversible': False,
+        'enzyme': '',
+        'pathways': '',
+        'modules': '',
+        'orthology': '',
+        'dblinks': ''
+    }
+    
+    current_section = None
+    for line in response_text.split('\n'):
+        if not line.strip():
+            continue
+            
+        if line.startswith(' '):
+            # Continuation of previous section
+            if current_section == 'NAME':
+                data['name'] += ' ' + line.strip()
+            elif current_section == 'DEFINITION':
+                data['definition'] += ' ' + line.strip()
+            elif current_section == 'EQUATION':
+                data['equation'] += ' ' + line.strip()
+            elif current_section == 'ENZYME':
+                data['enzyme'] += ' ' + line.strip()
+            elif current_section == 'PATHWAY':
+                data['pathways'] += ' ' + line.strip()
+            elif current_section == 'MODULE':
+                data['modules'] += ' ' + line.strip()
+            elif current_section == 'ORTHOLOGY':
+                data['orthology'] += ' ' + line.strip()
+            elif current_section == 'DBLINKS':
+                data['dblinks'] += ' ' + line.strip()
+        else:
+            # New section
+            if ' ' in line:
+                section, content = line.split(' ', 1)
+                current_section = section
+                
+                if section == 'ENTRY':
+                    data['reaction_id'] = content.split()[0]
+                elif section == 'NAME':
+                    data['name'] = content.strip()
+                elif section == 'DEFINITION':
+                    data['definition'] = content.strip()
+                elif section == 'EQUATION':
+                    data['equation'] = content.strip()
+                    # Parse equation into reactants and products
+                    reactants, products = parse_equation(content.strip())
+                    data['reactants'] = reactants
+                    data['products'] = products
+                    data['is_reversible'] = '<=>' in content
+                elif section == 'ENZYME':
+                    data['enzyme'] = content.strip()
+                elif section == 'PATHWAY':
+                    data['pathways'] = content.strip()
+                elif section == 'MODULE':
+                    data['modules'] = content.strip()
+                elif section == 'ORTHOLOGY':
+                    data['orthology'] = content.strip()
+                elif section == 'DBLINKS':
+                    data['dblinks'] = content.strip()
+    
+    return data
+
+def legacy_parse_compound(response_text: str) -> Dict[str, Union[str, List[str]]]:
+    """Parse KEGG API response into structured data.
+    
+    Args:
+        response_text: Raw response text from KEGG API.
+        
+    Returns:
+        Dictionary containing parsed compound information.
+    """
+    data = {
+        'compound_id': '',
+        'name': '',
+        'formula': '',
+        'exact_mass': '',
+        'molecular_weight': '',
+        'reactions': '',
+        'enzymes': '',
+        'pathways': '',
+        'modules': '',
+        'dblinks': ''
+    }
+    
+    current_section = None
+    for line in response_text.split('\n'):
+        if not line.strip():
+            continue
+            
+        if line.startswith(' '):
+            # Continuation of previous section
+            if current_section == 'NAME':
+                data['name'] += ' ' + line.strip()
+            elif current_section == 'FORMULA':
+                data['formula'] += ' ' + line.strip()
+            elif current_section == 'EXACT_MASS':
+                data['exact_mass'] += ' ' + line.strip()
+            elif current_section == 'MOL_WEIGHT':
+                data['molecular_weight'] += ' ' + line.strip()
+            elif current_section == 'REACTION':
+                data['reactions'] += ' ' + line.strip()
+            elif current_section == 'ENZYME':
+                data['enzymes'] += ' ' + line.strip()
+            elif current_section == 'PATHWAY':
+                data['pathways'] += ' ' + line.strip()
+            elif current_section == 'MODULE':
+                data['modules'] += ' ' + line.strip()
+            elif current_section == 'DBLINKS':
+                data['dblinks'] += ' ' + line.strip()
+        else:
+            # New section
+            if ' ' in line:
+                section, content = line.split(' ', 1)
+                current_section = section
+                
+                if section == 'ENTRY':
+                    data['compound_id'] = content.split()[0]
+                elif section == 'NAME':
+                    data['name'] = content.strip()
+                elif section == 'FORMULA':
+                    data['formula'] = content.strip()
+                elif section == 'EXACT_MASS':
+                    data['exact_mass'] = content.strip()
+                elif section == 'MOL_WEIGHT':
+                    data['molecular_weight'] = content.strip()
+                elif section == 'REACTION':
+                    data['reactions'] = content.strip()
+                elif section == 'ENZYME':
+                    data['enzymes'] = content.strip()
+                elif section == 'PATHWAY':
+                    data['pathways'] = content.strip()
+                elif section == 'MODULE':
+                    data['modules'] = content.strip()
+                elif section == 'DBLINKS':
+                    data['dblinks'] = content.strip()
+    
+    return data
+
+def build_dump(prefix: str, n_entries: int) -> str:
+    """Concatenate the recorded entries of a kind until n_entries are reached."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, f"{prefix}*.txt"))):
+        with open(path) as f:
+            texts.append(f.read())
+    return ''.join(texts[i % len(texts)] for i in range(n_entries))
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time of several runs of func."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=20000, help="Entries per input")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    cases = [
+        ('reaction', 'R', legacy_parse_reaction, REACTION_SCHEMA),
+        ('compound', 'C', legacy_parse_compound, COMPOUND_SCHEMA),
+    ]
+    for kind, prefix, legacy, schema in cases:
+        dump = build_dump(prefix, args.entries)
+
+        legacy_time = best_time(lambda: [legacy(entry) for entry in split_entries(dump)], args.repeat)
+        new_time = best_time(lambda: parse_entries(dump, schema), args.repeat)
+
+        print(f"{kind:<9} legacy: {args.entries / legacy_time:>10,.0f} entries/s   "
+              f"table-driven: {args.entries / new_time:>10,.0f} entries/s   "
+              f"speedup: {legacy_time / new_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
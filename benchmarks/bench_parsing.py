@@ -0,0 +1,38 @@
+"""Benchmarks of the flat-file parsers."""
+
+from bench_parser import legacy_parse_reaction
+from kegg import fetch_compound, fetch_kegg_reaction, fetch_reaction
+from kegg.batch import split_entries
+from kegg.parser import COMPOUND_SCHEMA, REACTION_SCHEMA, iter_kegg_entries, parse_entries
+
+def bench_parse_reaction_entry(benchmark, kegg_entry):
+    text = kegg_entry('R00200')
+    benchmark(fetch_reaction.parse_kegg_response, text)
+
+def bench_parse_compound_entry(benchmark, kegg_entry):
+    text = kegg_entry('C00031')
+    benchmark(fetch_compound.parse_kegg_response, text)
+
+def bench_parse_kegg_reaction_entry(benchmark, kegg_entry):
+    text = kegg_entry('R00200')
+    benchmark(fetch_kegg_reaction.parse_kegg_reaction, text)
+
+def bench_parse_reaction_batch(benchmark, reaction_batch):
+    benchmark(parse_entries, reaction_batch, REACTION_SCHEMA)
+
+def bench_parse_reaction_dump(benchmark, reaction_dump):
+    benchmark(parse_entries, reaction_dump, REACTION_SCHEMA)
+
+def bench_parse_reaction_dump_typed(benchmark, reaction_dump):
+    benchmark(parse_entries, reaction_dump, REACTION_SCHEMA, True)
+
+def bench_parse_reaction_dump_legacy(benchmark, reaction_dump):
+    benchmark(lambda: [legacy_parse_reaction(entry) for entry in split_entries(reaction_dump)])
+
+def bench_parse_compound_dump(benchmark, compound_dump):
+    benchmark(parse_entries, compound_dump, COMPOUND_SCHEMA)
+
+def bench_stream_reaction_dump(benchmark, reaction_dump, tmp_path):
+    path = tmp_path / 'reaction'
+    path.write_text(reaction_dump)
+    benchmark(lambda: sum(1 for _ in iter_kegg_entries(str(path), kind='reaction')))
@@ -0,0 +1,19 @@
+"""Benchmarks of the start-up cost of a fresh interpreter importing the package."""
+
+import os
+import subprocess
+import sys
+
+def _python(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    return lambda: subprocess.run([sys.executable, '-c', code], check=True, env=env)
+
+def bench_startup_interpreter(benchmark):
+    benchmark.pedantic(_python('pass'), rounds=10)
+
+def bench_startup_record_api(benchmark):
+    benchmark.pedantic(_python('from kegg.fetch_reaction import get_reaction_record'), rounds=10)
+
+def bench_startup_dataframe_api(benchmark):
+    # The DataFrame functions load pandas on first use
+    benchmark.pedantic(_python('from kegg.fetch_reaction import get_reaction_info; import pandas'), rounds=10)
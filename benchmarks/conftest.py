@@ -0,0 +1,50 @@
+"""Shared inputs of the benchmark suite, built from the recorded KEGG entries."""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_parser import build_dump  # noqa: E402
+from kegg.batch import split_entries  # noqa: E402
+from kegg.parser import REACTION_SCHEMA, parse_entries  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+
+# Entries in the synthetic dumps
+DUMP_ENTRIES = 10000
+
+@pytest.fixture(scope='session')
+def kegg_entry():
+    """Return the recorded KEGG flat-file text for an entry ID."""
+    def _load(entry_id):
+        with open(os.path.join(FIXTURES_DIR, f"{entry_id}.txt")) as f:
+            return f.read()
+    return _load
+
+@pytest.fixture(scope='session')
+def reaction_batch(kegg_entry):
+    """A combined /get response of the recorded reactions."""
+    return kegg_entry('R00200') + kegg_entry('R00299')
+
+@pytest.fixture(scope='session')
+def reaction_dump():
+    """A synthetic dump of 10k reaction entries."""
+    return build_dump('R', DUMP_ENTRIES)
+
+@pytest.fixture(scope='session')
+def compound_dump():
+    """A synthetic dump of 10k compound entries."""
+    return build_dump('C', DUMP_ENTRIES)
+
+@pytest.fixture(scope='session')
+def reaction_texts(reaction_dump):
+    """The entries of the reaction dump, one text per entry."""
+    return [entry + '\n///\n' for entry in split_entries(reaction_dump)]
+
+@pytest.fixture(scope='session')
+def reaction_records(reaction_dump):
+    """The parsed records of the reaction dump."""
+    return parse_entries(reaction_dump, REACTION_SCHEMA)
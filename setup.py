@@ -32,9 +32,24 @@ setup(
         "requests>=2.25.0",
         "pyyaml>=6.0.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "kegg2bigg=kegg.cli:main",
+        ],
+    },
     extras_require={
+        "async": [
+            "aiohttp>=3.8.0",
+        ],
+        "parquet": [
+            "pyarrow>=10.0.0",
+        ],
+        "sparse": [
+            "scipy>=1.8.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
+            "pytest-benchmark>=4.0.0",
             "black>=22.0.0",
             "flake8>=4.0.0",
             "mypy>=0.900",
@@ -0,0 +1,388 @@
+"""Asyncio counterparts of the KEGG fetch functions.
+
+Lookups in the SQLite response cache and mirror run in the loop's default
+executor, so they do not block other coroutines.
+
+Requires the optional ``aiohttp`` dependency (``pip install kegg-data-fetcher[async]``).
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from kegg import fetch_compound, fetch_reaction, metrics
+from kegg.batch import KEGG_MAX_ENTRIES, chunk_ids, match_entries
+from kegg.cache import OfflineCacheMiss, get_cache, is_offline
+from kegg.mirror import get_mirror
+from kegg.ratelimit import get_limiter
+from kegg.records import to_frame
+from utils.config import load_config
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Settings of each entity kind: KEGG database, ID prefix and parser
+_KINDS: Dict[str, Dict[str, Any]] = {
+    'reaction': {'database': 'rn', 'prefix': 'R', 'parse': fetch_reaction.parse_kegg_response},
+    'compound': {'database': 'cpd', 'prefix': 'C', 'parse': fetch_compound.parse_kegg_response},
+}
+
+def _require_aiohttp() -> None:
+    if aiohttp is None:
+        raise ImportError(
+            "aiohttp is required for kegg.aio. Install it with: pip install kegg-data-fetcher[async]"
+        )
+
+def create_session(config: Optional[Dict[str, Any]] = None) -> 'aiohttp.ClientSession':
+    """Create an aiohttp session configured from ``config['kegg']``.
+
+    Args:
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+
+    Returns:
+        A new ClientSession. The caller is responsible for closing it.
+    """
+    _require_aiohttp()
+    if config is None:
+        config = load_config()
+    kegg_config = config['kegg']
+
+    timeout = aiohttp.ClientTimeout(
+        total=None,
+        connect=kegg_config.get('connect_timeout', kegg_config['timeout']),
+        sock_read=kegg_config['timeout']
+    )
+    connector = aiohttp.TCPConnector(limit=kegg_config.get('pool_size', 10))
+    return aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+def _check_id(kind: str, entity_id: str) -> None:
+    prefix = _KINDS[kind]['prefix']
+    if not entity_id.startswith(prefix):
+        raise ValueError(f"Invalid {kind} ID format: {entity_id}. Must start with '{prefix}'.")
+
+def _to_frame(kind: str, records: List[Dict[str, Any]], config: Dict[str, Any]) -> pd.DataFrame:
+    fields = config[kind]['fields']
+    return to_frame(records, columns=fields)[fields]
+
+async def _run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call, such as a SQLite cache or mirror lookup, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+async def _get(session: 'aiohttp.ClientSession', url: str, config: Dict[str, Any]) -> Optional[str]:
+    """Return the response text of a URL, or None if KEGG answers 404.
+
+    Requests share the rate limiter of the synchronous client, so throttled
+    and failed attempts are retried the same way.
+    """
+    async def send() -> Any:
+        started = time.perf_counter()
+        try:
+            async with session.get(url) as response:
+                body = await response.read()
+        except aiohttp.ClientError:
+            metrics.inc('kegg_request_errors_total')
+            raise
+        metrics.observe('kegg_request_seconds', time.perf_counter() - started)
+        metrics.observe('kegg_response_bytes', len(body))
+        metrics.inc('kegg_requests_total', status=response.status)
+        return response, body
+
+    response, body = await get_limiter(config).acall(
+        send,
+        (aiohttp.ClientConnectionError, asyncio.TimeoutError),
+        lambda result: (result[0].status, result[0].headers.get('Retry-After')),
+        description=url
+    )
+    if response.status == 404:
+        return None
+    response.raise_for_status()
+    return body.decode(response.get_encoding())
+
+async def _aget_one(
+    kind: str,
+    entity_id: Optional[str],
+    session: Optional['aiohttp.ClientSession'],
+    config: Optional[Dict[str, Any]]
+) -> pd.DataFrame:
+    if config is None:
+        config = load_config()
+    if entity_id is None:
+        entity_id = config[kind]['default_id']
+    _check_id(kind, entity_id)
+
+    base_url = config['kegg']['base_url'].rstrip('/')
+    url = f"{base_url}/get/{_KINDS[kind]['database']}:{entity_id}"
+    cache = get_cache(config)
+    offline = is_offline(config)
+    mirror = get_mirror(config)
+
+    text = await _run_blocking(mirror.get, _KINDS[kind]['database'], entity_id) if mirror is not None else None
+    if text is None and cache is not None:
+        text = await _run_blocking(cache.get, url, allow_expired=offline)
+    if text is None:
+        if offline:
+            raise OfflineCacheMiss(f"Offline mode: no cached response for {url}")
+
+        own_session = session is None
+        if own_session:
+            session = create_session(config)
+        try:
+            text = await _get(session, url, config)
+        except aiohttp.ClientError as e:
+            logger.error(f"Error fetching {kind} {entity_id}: {e}")
+            raise
+        finally:
+            if own_session:
+                await session.close()
+
+        if text is None:
+            raise ValueError(f"{kind.capitalize()} not found in KEGG: {entity_id}")
+        if cache is not None:
+            await _run_blocking(cache.set, url, text)
+
+    return _to_frame(kind, [_KINDS[kind]['parse'](text)], config)
+
+async def aget_reaction_info(
+    reaction_id: Optional[str] = None,
+    session: Optional['aiohttp.ClientSession'] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """Fetch reaction information from KEGG without blocking the event loop.
+
+    Args:
+        reaction_id: KEGG reaction ID (e.g., 'R00200'). If None, uses the default ID from config.
+        session: Session used for the request. If None, a temporary one is created.
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+
+    Returns:
+        DataFrame containing reaction information.
+
+    Raises:
+        ValueError: If the reaction ID is invalid or not found.
+        aiohttp.ClientError: If there's an error fetching data from KEGG.
+    """
+    _require_aiohttp()
+    return await _aget_one('reaction', reaction_id, session, config)
+
+async def aget_compound_info(
+    compound_id: Optional[str] = None,
+    session: Optional['aiohttp.ClientSession'] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """Fetch compound information from KEGG without blocking the event loop.
+
+    Args:
+        compound_id: KEGG compound ID (e.g., 'C00031'). If None, uses the default ID from config.
+        session: Session used for the request. If None, a temporary one is created.
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+
+    Returns:
+        DataFrame containing compound information.
+
+    Raises:
+        ValueError: If the compound ID is invalid or not found.
+        aiohttp.ClientError: If there's an error fetching data from KEGG.
+    """
+    _require_aiohttp()
+    return await _aget_one('compound', compound_id, session, config)
+
+def _prepare_ids(kind: str, ids: Iterable[str], concurrency: int) -> List[str]:
+    """Validate a batch eagerly, before the async iterator is first awaited."""
+    if concurrency < 1:
+        raise ValueError(f"Invalid concurrency: {concurrency}. Must be at least 1.")
+
+    # Drop duplicates while keeping the caller's order
+    ids = list(dict.fromkeys(ids))
+    for entity_id in ids:
+        _check_id(kind, entity_id)
+    return ids
+
+async def _aget_many(
+    kind: str,
+    ids: List[str],
+    concurrency: int,
+    session: Optional['aiohttp.ClientSession'],
+    config: Optional[Dict[str, Any]]
+) -> AsyncIterator[pd.DataFrame]:
+    if config is None:
+        config = load_config()
+
+    get_limiter(config).check_parallelism(concurrency)
+    database = _KINDS[kind]['database']
+    parse: Callable[[str], Dict[str, Any]] = _KINDS[kind]['parse']
+    base_url = config['kegg']['base_url'].rstrip('/')
+    batch_size = min(config['kegg'].get('max_batch_size', KEGG_MAX_ENTRIES), KEGG_MAX_ENTRIES)
+    cache = get_cache(config)
+    offline = is_offline(config)
+
+    # Serve mirrored and cached entries first, then request the rest concurrently
+    mirror = get_mirror(config)
+
+    def resolve_locally() -> Tuple[Dict[str, str], List[str], List[str]]:
+        cached = mirror.get_many(database, ids) if mirror is not None else {}
+        not_cached = []
+        pending = []
+        for entity_id in ids:
+            if entity_id in cached:
+                continue
+            text = None
+            if cache is not None:
+                text = cache.get(f"{base_url}/get/{database}:{entity_id}", allow_expired=offline)
+            if text is not None:
+                cached[entity_id] = text
+            elif offline:
+                not_cached.append(entity_id)
+            else:
+                pending.append(entity_id)
+        return cached, not_cached, pending
+
+    if mirror is not None or cache is not None:
+        cached, not_cached, pending = await _run_blocking(resolve_locally)
+    else:
+        cached, not_cached, pending = {}, [], list(ids)
+
+    if not_cached:
+        logger.warning(f"Offline mode: {len(not_cached)} {database} entries are not cached")
+
+    # An empty batch still yields one frame, so collected results keep their columns
+    if cached or not_cached or not pending:
+        df = _to_frame(kind, [parse(text) for text in cached.values()], config)
+        df.attrs['missing_ids'] = not_cached
+        yield df
+
+    if not pending:
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+    own_session = session is None
+    if own_session:
+        session = create_session(config)
+
+    def store_in_cache(found: Dict[str, str]) -> None:
+        for entity_id, entry in found.items():
+            cache.set(f"{base_url}/get/{database}:{entity_id}", entry)
+
+    async def fetch_chunk(chunk: List[str]) -> pd.DataFrame:
+        url = f"{base_url}/get/" + '+'.join(f"{database}:{entity_id}" for entity_id in chunk)
+        async with semaphore:
+            try:
+                text = await _get(session, url, config)
+            except aiohttp.ClientError as e:
+                logger.error(f"Error fetching {database} entries {', '.join(chunk)}: {e}")
+                raise
+
+        found, missing = match_entries(chunk, text or '')
+        if cache is not None and found:
+            await _run_blocking(store_in_cache, found)
+        if missing:
+            logger.warning(f"{kind.capitalize()}s not found in KEGG: {', '.join(missing)}")
+
+        df = _to_frame(kind, [parse(found[entity_id]) for entity_id in chunk if entity_id in found], config)
+        df.attrs['missing_ids'] = missing
+        return df
+
+    tasks = [asyncio.ensure_future(fetch_chunk(chunk)) for chunk in chunk_ids(pending, batch_size)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_session:
+            await session.close()
+
+def aget_reactions_info(
+    reaction_ids: Iterable[str],
+    concurrency: int = 8,
+    session: Optional['aiohttp.ClientSession'] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[pd.DataFrame]:
+    """Fetch several reactions concurrently, yielding results as they complete.
+
+    IDs are grouped into combined ``/get`` requests, of which at most
+    ``concurrency`` are in flight at once.
+
+    Args:
+        reaction_ids: KEGG reaction IDs (e.g., ['R00200', 'R00299']).
+        concurrency: Maximum number of requests in flight.
+        session: Session used for the requests. If None, a temporary one is created.
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+
+    Returns:
+        Async iterator of DataFrames, one per completed request, in completion
+        order. IDs that KEGG did not return are listed in ``df.attrs['missing_ids']``.
+
+    Raises:
+        ValueError: If a reaction ID is invalid.
+        aiohttp.ClientError: If there's an error fetching data from KEGG.
+    """
+    _require_aiohttp()
+    reaction_ids = _prepare_ids('reaction', reaction_ids, concurrency)
+    return _aget_many('reaction', reaction_ids, concurrency, session, config)
+
+def aget_compounds_info(
+    compound_ids: Iterable[str],
+    concurrency: int = 8,
+    session: Optional['aiohttp.ClientSession'] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[pd.DataFrame]:
+    """Fetch several compounds concurrently, yielding results as they complete.
+
+    IDs are grouped into combined ``/get`` requests, of which at most
+    ``concurrency`` are in flight at once.
+
+    Args:
+        compound_ids: KEGG compound IDs (e.g., ['C00031', 'C00002']).
+        concurrency: Maximum number of requests in flight.
+        session: Session used for the requests. If None, a temporary one is created.
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+
+    Returns:
+        Async iterator of DataFrames, one per completed request, in completion
+        order. IDs that KEGG did not return are listed in ``df.attrs['missing_ids']``.
+
+    Raises:
+        ValueError: If a compound ID is invalid.
+        aiohttp.ClientError: If there's an error fetching data from KEGG.
+    """
+    _require_aiohttp()
+    compound_ids = _prepare_ids('compound', compound_ids, concurrency)
+    return _aget_many('compound', compound_ids, concurrency, session, config)
+
+async def acollect(results: AsyncIterator[pd.DataFrame], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Collect the DataFrames of an async fetch into a single DataFrame.
+
+    Args:
+        results: Async iterator returned by ``aget_reactions_info`` or
+            ``aget_compounds_info``.
+        columns: Columns of the result if ``results`` yields no DataFrame.
+            The fetch functions always yield at least one, with the
+            configured fields.
+
+    Returns:
+        Concatenated DataFrame. IDs missing from any request are listed in
+        ``df.attrs['missing_ids']``.
+    """
+    frames = []
+    missing = []
+    async for df in results:
+        frames.append(df)
+        missing.extend(df.attrs.get('missing_ids', []))
+
+    if not frames:
+        df = to_frame([], columns=columns)
+        df.attrs['missing_ids'] = []
+        return df if columns is None else df[columns]
+
+    df = pd.concat(frames, ignore_index=True)
+    df.attrs['missing_ids'] = missing
+    return df
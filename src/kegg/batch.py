@@ -0,0 +1,180 @@
+"""Helpers for fetching several KEGG entries with combined ``/get`` requests."""
+
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+import requests
+
+if TYPE_CHECKING:
+    from kegg.client import KeggClient
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# KEGG accepts at most 10 entries in a single /get request
+KEGG_MAX_ENTRIES = 10
+
+def chunk_ids(ids: Iterable[str], size: int = KEGG_MAX_ENTRIES) -> Iterator[List[str]]:
+    """Group IDs into chunks of at most ``size`` entries.
+
+    Args:
+        ids: IDs to group.
+        size: Maximum number of IDs per chunk.
+
+    Yields:
+        Lists of IDs, in input order.
+    """
+    if size < 1:
+        raise ValueError(f"Invalid chunk size: {size}. Must be at least 1.")
+
+    chunk = []
+    for entity_id in ids:
+        chunk.append(entity_id)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def split_entries(response_text: str) -> List[str]:
+    """Split a multi-entry KEGG flat-file response on the ``///`` terminator.
+
+    Args:
+        response_text: Raw response text from KEGG API.
+
+    Returns:
+        List of entry texts, each without its terminator line.
+    """
+    entries = []
+    current = []
+    for line in response_text.split('\n'):
+        if line.startswith('///'):
+            entries.append('\n'.join(current))
+            current = []
+        else:
+            current.append(line)
+
+    # Tolerate a missing terminator after the last entry
+    if any(line.strip() for line in current):
+        entries.append('\n'.join(current))
+
+    return entries
+
+def entry_id(entry_text: str) -> Optional[str]:
+    """Return the ID found on the ``ENTRY`` line of a KEGG entry.
+
+    Args:
+        entry_text: Text of a single KEGG entry.
+
+    Returns:
+        The entry ID, or None if the entry has no ENTRY line.
+    """
+    for line in entry_text.split('\n'):
+        if line.startswith('ENTRY'):
+            parts = line.split()
+            if len(parts) > 1:
+                return parts[1]
+    return None
+
+def fetch_entries(
+    database: str,
+    ids: Iterable[str],
+    client: 'KeggClient',
+    local: bool = True
+) -> Tuple[Dict[str, str], List[str]]:
+    """Fetch raw KEGG entries using as few ``/get`` requests as possible.
+
+    Entries are first resolved from the local mirror, then from the response
+    cache under their single-entry URL (``{base_url}/get/{database}:{id}``),
+    so batch and single fetches share cached responses. Only the remaining
+    IDs are requested from KEGG.
+
+    Args:
+        database: KEGG database prefix (e.g., 'rn' or 'cpd').
+        ids: Entry IDs to fetch.
+        client: Client used for the requests.
+        local: Whether to resolve entries from the mirror and the response
+            cache. If False, every entry is requested from KEGG.
+
+    Returns:
+        Tuple of (entries, missing) where entries maps each found ID to its
+        raw entry text and missing lists the IDs KEGG did not return (or, in
+        offline mode, the IDs that are not cached).
+
+    Raises:
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    batch_size = min(client.config['kegg'].get('max_batch_size', KEGG_MAX_ENTRIES), KEGG_MAX_ENTRIES)
+    cache = client.cache if local else None
+    offline = client.offline and local
+
+    ids = list(ids)
+    entries = {}
+    if local and client.mirror is not None:
+        entries = client.mirror.get_many(database, ids)
+
+    missing = []
+    pending = []
+    for entity_id in ids:
+        if entity_id in entries:
+            continue
+        body = None
+        if cache is not None:
+            body = cache.get(client.url(f"get/{database}:{entity_id}"), allow_expired=offline)
+        if body is not None:
+            entries[entity_id] = body
+        elif offline:
+            missing.append(entity_id)
+        else:
+            pending.append(entity_id)
+
+    if offline and missing:
+        logger.warning(f"Offline mode: {len(missing)} {database} entries are not cached")
+
+    for chunk in chunk_ids(pending, batch_size):
+        url = client.url("get/" + '+'.join(f"{database}:{entity_id}" for entity_id in chunk))
+
+        try:
+            response = client.request(url)
+            # KEGG answers 404 when none of the requested entries exist
+            if response.status_code == 404:
+                missing.extend(chunk)
+                continue
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {database} entries {', '.join(chunk)}: {e}")
+            raise
+
+        found, not_found = match_entries(chunk, response.text)
+        entries.update(found)
+        missing.extend(not_found)
+        if cache is not None:
+            for entity_id, entry in found.items():
+                cache.set(client.url(f"get/{database}:{entity_id}"), entry)
+
+    return entries, missing
+
+def match_entries(chunk: List[str], response_text: str) -> Tuple[Dict[str, str], List[str]]:
+    """Match the entries of a combined response to the requested IDs.
+
+    Args:
+        chunk: IDs sent in the combined request.
+        response_text: Raw response text from KEGG API.
+
+    Returns:
+        Tuple of (found, missing) where found maps each returned ID to its
+        entry text, terminated like a single-entry response.
+    """
+    returned = {}
+    for entry in split_entries(response_text):
+        found_id = entry_id(entry)
+        if found_id is not None:
+            returned[found_id] = entry + '\n///\n'
+
+    found = {}
+    missing = []
+    for entity_id in chunk:
+        if entity_id in returned:
+            found[entity_id] = returned[entity_id]
+        else:
+            missing.append(entity_id)
+    return found, missing
@@ -0,0 +1,137 @@
+"""Concurrent, optionally resumable fetching of many KEGG entries."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import requests
+from kegg import metrics
+from kegg.batch import KEGG_MAX_ENTRIES, chunk_ids, fetch_entries
+from kegg.client import KeggClient
+from kegg.journal import Journal
+from kegg.parser import COMPOUND_SCHEMA, REACTION_SCHEMA, EntrySchema, parse_entry
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default number of completed entries per journaled shard
+DEFAULT_SHARD_SIZE = 1000
+
+class FetchKind(NamedTuple):
+    """How to fetch and parse one kind of KEGG entry."""
+    database: str
+    prefix: str
+    schema: EntrySchema
+    config_key: str
+
+KINDS: Dict[str, FetchKind] = {
+    'reactions': FetchKind('rn', 'R', REACTION_SCHEMA, 'reaction'),
+    'compounds': FetchKind('cpd', 'C', COMPOUND_SCHEMA, 'compound'),
+}
+
+class FetchResult(NamedTuple):
+    """Outcome of a bulk fetch."""
+    records: List[Dict[str, Any]]
+    missing: List[str]
+    failed: List[str]
+
+def fetch_many(
+    kind: FetchKind,
+    ids: List[str],
+    client: KeggClient,
+    workers: int = 8,
+    chunk_size: int = KEGG_MAX_ENTRIES,
+    progress: Optional[Callable[[int, int], None]] = None,
+    journal: Optional[str] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE
+) -> FetchResult:
+    """Fetch and parse many entries with a pool of worker threads.
+
+    IDs are split into chunks that are fetched concurrently with combined
+    ``/get`` requests. A chunk that fails is logged and its IDs are reported
+    as failed; the other chunks are not affected.
+
+    With a journal, parsed records are written to shards of ``shard_size``
+    entries as they complete, and each shard is journaled with its IDs. A
+    later call with the same journal skips completed IDs, retries only the
+    rest (including earlier failures) and returns the records of all shards,
+    so a crashed run resumes without refetching.
+
+    Args:
+        kind: Kind of the entries.
+        ids: Entry IDs to fetch.
+        client: Client shared by the workers.
+        workers: Number of worker threads.
+        chunk_size: Number of IDs per task.
+        progress: Optional callback receiving (entries done, entries failed)
+            after each chunk.
+        journal: Path of the progress journal, or None for a one-shot fetch.
+        shard_size: Number of completed entries per shard when journaling.
+
+    Returns:
+        FetchResult with the parsed records in input order, the IDs KEGG did
+        not return and the IDs whose request failed.
+    """
+    client.limiter.check_parallelism(workers)
+    run_journal = Journal(journal) if journal is not None else None
+    todo = ids
+    if run_journal is not None:
+        completed = run_journal.completed(kind.database)
+        todo = [entity_id for entity_id in ids if entity_id not in completed]
+        if len(todo) < len(ids):
+            logger.info(f"Journal {journal}: skipping {len(ids) - len(todo)} completed {kind.database} entries")
+
+    def fetch_chunk(chunk: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        with metrics.timer('kegg_stage_seconds', kind=kind.config_key, stage='fetch'):
+            return fetch_entries(kind.database, chunk, client)
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    failed: List[str] = []
+    shard: Dict[str, Dict[str, Any]] = {}
+    shard_missing: List[str] = []
+
+    def flush_shard() -> None:
+        if run_journal is not None and (shard or shard_missing):
+            run_journal.write_shard(kind.database, list(shard.values()), list(shard), list(shard_missing))
+            shard.clear()
+            shard_missing.clear()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_chunk, chunk): chunk for chunk in chunk_ids(todo, chunk_size)}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                found, not_found = future.result()
+            except requests.RequestException as e:
+                logger.error(f"Failed to fetch {len(chunk)} {kind.database} entries: {e}")
+                failed.extend(chunk)
+                if run_journal is not None:
+                    run_journal.record_failed(kind.database, chunk)
+                if progress is not None:
+                    progress(len(chunk), len(chunk))
+                continue
+
+            # Journaled records are kept in shards only, and read back at the end
+            target = shard if run_journal is not None else entries
+            with metrics.timer('kegg_stage_seconds', kind=kind.config_key, stage='parse'):
+                for entity_id, text in found.items():
+                    target[entity_id] = parse_entry(text, kind.schema)
+            missing.extend(not_found)
+            shard_missing.extend(not_found)
+            if len(shard) + len(shard_missing) >= shard_size:
+                flush_shard()
+            if progress is not None:
+                progress(len(chunk), 0)
+    flush_shard()
+
+    if run_journal is not None:
+        # Records of earlier runs come back from their shards
+        for record in run_journal.load_records(kind.database):
+            entries[record[kind.schema.id_field]] = record
+        wanted = set(ids)
+        missing = list(dict.fromkeys(
+            entity_id for entity_id in run_journal.missing(kind.database) if entity_id in wanted
+        ))
+
+    records = [entries[entity_id] for entity_id in ids if entity_id in entries]
+    return FetchResult(records, missing, failed)
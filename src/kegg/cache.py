@@ -0,0 +1,159 @@
+"""Persistent on-disk cache for KEGG API responses."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+import requests
+from kegg import metrics
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class OfflineCacheMiss(requests.RequestException):
+    """Raised in offline mode when a response is not available in the cache."""
+
+class ResponseCache:
+    """SQLite-backed cache of KEGG response texts keyed by request URL.
+
+    Entries older than ``ttl`` seconds are treated as misses. When the stored
+    bodies exceed ``max_size_mb``, the least recently used entries are evicted.
+
+    Args:
+        path: Path to the SQLite database file.
+        ttl: Time to live of an entry in seconds. None keeps entries forever.
+        max_size_mb: Size budget of the stored bodies in megabytes. None
+            disables eviction.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_size_mb: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        # Bytes of the stored bodies, kept up to date by set, eviction and clear
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url: str, allow_expired: bool = False) -> Optional[str]:
+        """Return the cached response for a URL.
+
+        Args:
+            url: Request URL.
+            allow_expired: Whether to return entries older than the TTL.
+
+        Returns:
+            The cached response text, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, created FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                metrics.inc('kegg_cache_misses_total')
+                return None
+
+            body, created = row
+            if not allow_expired and self.ttl is not None and now - created > self.ttl:
+                metrics.inc('kegg_cache_misses_total')
+                return None
+
+            with self._conn:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE url = ?", (now, url))
+        metrics.inc('kegg_cache_hits_total')
+        return body
+
+    def set(self, url: str, body: str) -> None:
+        """Store the response for a URL and evict entries if over budget.
+
+        Args:
+            url: Request URL.
+            body: Response text.
+        """
+        now = time.time()
+        size = len(body.encode('utf-8'))
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, body, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, body, size, now, now)
+                )
+                total = self._size + size - (row[0] if row is not None else 0)
+                if self.max_size is not None and total > self.max_size:
+                    total -= self._evict(total)
+            self._size = total
+
+    def _evict(self, total: int) -> int:
+        """Delete least recently used entries until ``total`` bytes fit the budget.
+
+        Returns:
+            The number of bytes freed.
+        """
+        freed = 0
+        stale = []
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed"):
+            if total - freed <= self.max_size:
+                break
+            stale.append((url,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", stale)
+        logger.debug(f"Evicted {len(stale)} cached responses ({freed} bytes)")
+        return freed
+
+    def clear(self) -> None:
+        """Delete all cached responses."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+            self._size = 0
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+# One cache instance per database file, shared by all fetchers
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+def get_cache(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """Return the response cache described by the configuration.
+
+    Args:
+        config: Loaded configuration dictionary.
+
+    Returns:
+        The shared ResponseCache, or None if caching is disabled.
+    """
+    cache_config = config.get('cache', {})
+    if not cache_config.get('enabled', False):
+        return None
+
+    path = cache_config.get('path', 'cache/kegg_responses.sqlite')
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, cache_config.get('ttl'), cache_config.get('max_size_mb'))
+            _caches[path] = cache
+    return cache
+
+def is_offline(config: Dict[str, Any]) -> bool:
+    """Return whether the configuration restricts fetching to the cache."""
+    return bool(config.get('cache', {}).get('offline', False))
@@ -0,0 +1,261 @@
+"""Command-line interface for batch KEGG downloads.
+
+Usage:
+    kegg2bigg fetch --reactions ids.txt --compounds ids.txt --workers 3 --out out.parquet
+    kegg2bigg mirror sync [--databases rn cpd] [--max-age SECONDS] [--prune]
+    kegg2bigg replay --fixtures tests/fixtures [--port 8080] [--latency SECONDS]
+
+ID files hold one ID per line (blank lines and ``#`` comments are ignored);
+``-`` reads IDs from standard input. Progress, throughput, error counts and
+the estimated time remaining are reported on standard error. With
+``--journal``, an interrupted run resumes where it stopped, and IDs whose
+requests failed are written to ``<out>.failed.txt`` for a retry.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import IO, Callable, Iterable, List, Optional
+from kegg import metrics
+from kegg.batch import KEGG_MAX_ENTRIES
+from kegg.bulk import DEFAULT_SHARD_SIZE, KINDS, fetch_many
+from kegg.client import KeggClient
+from kegg.output import write_dataframe
+from kegg.ratelimit import get_limiter
+from kegg.records import to_frame
+from utils.config import load_config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def read_ids(source: str, stdin: Optional[IO[str]] = None) -> List[str]:
+    """Read entry IDs from a file, or from standard input if ``source`` is '-'.
+
+    Only the first token of each line is used, and database prefixes such as
+    'rn:' are removed. Duplicates are dropped while keeping the file order.
+
+    Args:
+        source: Path to an ID file, or '-'.
+        stdin: Stream used for '-'. If None, uses ``sys.stdin``.
+
+    Returns:
+        List of unique IDs.
+    """
+    if source == '-':
+        lines: Iterable[str] = stdin if stdin is not None else sys.stdin
+        return _parse_id_lines(lines)
+    with open(source, 'r', encoding='utf-8') as f:
+        return _parse_id_lines(f)
+
+def _parse_id_lines(lines: Iterable[str]) -> List[str]:
+    ids = []
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            ids.append(line.split(None, 1)[0].split(':', 1)[-1])
+    return list(dict.fromkeys(ids))
+
+class Progress:
+    """Periodic progress report with throughput, error count and ETA.
+
+    On a terminal the report is redrawn in place; otherwise (e.g. under cron)
+    one line is written per interval.
+
+    Args:
+        label: Name of the work being tracked.
+        total: Number of entries to process.
+        stream: Output stream. If None, uses ``sys.stderr``.
+        interval: Minimum number of seconds between reports. If None, uses
+            1 second on a terminal and 30 seconds otherwise.
+        clock: Time source, for testing.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        total: int,
+        stream: Optional[IO[str]] = None,
+        interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.label = label
+        self.total = total
+        self.stream = stream if stream is not None else sys.stderr
+        self.interactive = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = interval if interval is not None else (1.0 if self.interactive else 30.0)
+        self.clock = clock
+
+        self.done = 0
+        self.errors = 0
+        self.started = clock()
+        self._last_report = self.started
+
+    def update(self, done: int = 0, errors: int = 0) -> None:
+        """Record processed entries and report if the interval has elapsed."""
+        self.done += done
+        self.errors += errors
+        now = self.clock()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._write(self.format(now))
+
+    def format(self, now: Optional[float] = None) -> str:
+        """Return the current progress line."""
+        elapsed = max((now if now is not None else self.clock()) - self.started, 1e-9)
+        rate = self.done / elapsed
+        percent = 100.0 * self.done / self.total if self.total else 100.0
+        if rate > 0:
+            eta = _format_duration((self.total - self.done) / rate)
+        else:
+            eta = '?'
+        return (
+            f"{self.label}: {self.done}/{self.total} ({percent:.1f}%), "
+            f"{rate:.1f} entries/s, {self.errors} errors, ETA {eta}"
+        )
+
+    def finish(self) -> None:
+        """Write the final report."""
+        self._write(self.format())
+        if self.interactive:
+            self.stream.write('\n')
+        self.stream.flush()
+
+    def _write(self, line: str) -> None:
+        if self.interactive:
+            self.stream.write('\r\033[K' + line)
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+def output_path(out: str, label: str, several: bool) -> str:
+    """Return the output file of one kind ('out_reactions.parquet' if several kinds are written)."""
+    if not several:
+        return out
+    stem, extension = os.path.splitext(out)
+    if extension in ('.gz', '.bz2', '.xz', '.zst', '.zip'):
+        stem, inner = os.path.splitext(stem)
+        extension = inner + extension
+    return f"{stem}_{label}{extension}"
+
+def run_fetch(args: argparse.Namespace, stdin: Optional[IO[str]] = None, stderr: Optional[IO[str]] = None) -> int:
+    """Run the ``fetch`` command and return the process exit code."""
+    config = load_config(args.config)
+    metrics.configure(config)
+    requested = [(label, source) for label, source in (('reactions', args.reactions), ('compounds', args.compounds))
+                 if source is not None]
+    if not requested:
+        raise SystemExit("kegg2bigg fetch: at least one of --reactions or --compounds is required")
+    if sum(source == '-' for _, source in requested) > 1:
+        raise SystemExit("kegg2bigg fetch: only one ID list can be read from standard input")
+
+    # By default, as many workers as requests the rate limiter lets through at once
+    workers = args.workers if args.workers is not None else get_limiter(config).concurrency.max_limit
+    exit_code = 0
+    with KeggClient(config, pool_size=max(workers, config['kegg'].get('pool_size', 10))) as client:
+        # Each run starts with a full retry budget, even if the limiter outlives it
+        client.limiter.budget.reset()
+        for label, source in requested:
+            kind = KINDS[label]
+            ids = read_ids(source, stdin)
+            invalid = [entity_id for entity_id in ids if not entity_id.startswith(kind.prefix)]
+            if invalid:
+                logger.error(f"Skipping {len(invalid)} invalid {label} IDs: {', '.join(invalid[:10])}")
+                ids = [entity_id for entity_id in ids if entity_id.startswith(kind.prefix)]
+
+            progress = Progress(label, len(ids), stream=stderr, interval=args.progress_interval)
+            journal = f"{args.journal}.{label}" if args.journal else None
+            result = fetch_many(kind, ids, client, workers=workers, chunk_size=args.chunk_size,
+                                progress=progress.update, journal=journal, shard_size=args.shard_size)
+            progress.finish()
+
+            fields = config[kind.config_key]['fields']
+            with metrics.timer('kegg_stage_seconds', kind=kind.config_key, stage='frame'):
+                df = to_frame(result.records, columns=fields)
+            with metrics.timer('kegg_stage_seconds', kind=kind.config_key, stage='select'):
+                df = df[fields]
+            path = output_path(args.out, label, len(requested) > 1)
+            with metrics.timer('kegg_stage_seconds', kind=kind.config_key, stage='write'):
+                write_dataframe(df, path, file_format=args.format, compression=args.compression,
+                                index=config['output'].get('index', False))
+
+            logger.info(
+                f"{label}: {len(result.records)} written to {path}, {len(result.missing)} not found, "
+                f"{len(result.failed)} failed, {len(invalid)} invalid"
+            )
+            if result.failed:
+                failed_path = f"{path}.failed.txt"
+                with open(failed_path, 'w', encoding='utf-8') as f:
+                    f.write(''.join(f"{entity_id}\n" for entity_id in result.failed))
+                logger.warning(f"{label}: {len(result.failed)} failed IDs listed in {failed_path}")
+            if result.failed or invalid:
+                exit_code = 1
+    metrics.flush()
+    return exit_code
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser of the ``kegg2bigg`` command."""
+    parser = argparse.ArgumentParser(prog='kegg2bigg', description="Fetch KEGG reactions and compounds in bulk.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch_parser = subparsers.add_parser('fetch', help="Fetch entries listed in ID files")
+    fetch_parser.add_argument('--config', default='config.yaml', help="Configuration file")
+    fetch_parser.add_argument('--reactions', metavar='FILE', help="Reaction ID file, or '-' for stdin")
+    fetch_parser.add_argument('--compounds', metavar='FILE', help="Compound ID file, or '-' for stdin")
+    fetch_parser.add_argument('--out', required=True,
+                              help="Output file; with both kinds, '_reactions'/'_compounds' is appended to the name")
+    fetch_parser.add_argument('--format', default=None, help="Output format (default: from the file extension)")
+    fetch_parser.add_argument('--compression', default=None, help="Output compression codec")
+    fetch_parser.add_argument('--workers', type=int, default=None,
+                              help="Number of concurrent requests (default: kegg.max_concurrency)")
+    fetch_parser.add_argument('--chunk-size', type=int, default=KEGG_MAX_ENTRIES,
+                              help="Entries per worker task")
+    fetch_parser.add_argument('--journal', metavar='PATH', default=None,
+                              help="Progress journal; rerunning with the same journal resumes the fetch")
+    fetch_parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                              help="Entries per journaled shard")
+    fetch_parser.add_argument('--progress-interval', type=float, default=None,
+                              help="Seconds between progress reports (default: 1 on a terminal, 30 otherwise)")
+
+    mirror_parser = subparsers.add_parser('mirror', help="Maintain the local KEGG mirror", add_help=False)
+    mirror_parser.add_argument('mirror_args', nargs=argparse.REMAINDER)
+
+    replay_parser = subparsers.add_parser('replay', help="Serve recorded entries as a local KEGG stand-in",
+                                          add_help=False)
+    replay_parser.add_argument('replay_args', nargs=argparse.REMAINDER)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Console entry point of ``kegg2bigg``."""
+    parser = build_parser()
+    # Options of the delegated commands are left to their own parsers
+    args, extra = parser.parse_known_args(argv)
+
+    if args.command == 'mirror':
+        from kegg.mirror import main as mirror_main
+        mirror_main(args.mirror_args + extra)
+        return
+    if args.command == 'replay':
+        from kegg.replay import main as replay_main
+        replay_main(extra + args.replay_args)
+        return
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
+    config = load_config(args.config)
+    logging.basicConfig(level=config['logging']['level'], format=config['logging']['format'])
+    raise SystemExit(run_fetch(args))
+
+if __name__ == "__main__":
+    main()
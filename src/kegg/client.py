@@ -0,0 +1,191 @@
+"""Shared HTTP client for the KEGG REST API."""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from kegg import metrics
+from kegg.cache import OfflineCacheMiss, get_cache, is_offline
+from kegg.mirror import get_mirror
+from kegg.ratelimit import get_limiter
+from utils.config import load_config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class KeggClient:
+    """Client owning a pooled keep-alive ``requests.Session`` for KEGG.
+
+    Reusing one client avoids a new TCP and TLS handshake per request. The
+    client is safe to share between threads and resolves entries from the
+    local mirror and the response cache when they are enabled. Requests go
+    through the rate limiter shared by all clients with the same KEGG
+    settings (see ``kegg.ratelimit``).
+
+    Args:
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+        pool_size: Maximum number of pooled connections. If None, uses
+            ``config['kegg']['pool_size']``.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, pool_size: Optional[int] = None):
+        self.config = config if config is not None else load_config()
+        kegg_config = self.config['kegg']
+
+        self.base_url = kegg_config['base_url'].rstrip('/')
+        self.pool_size = pool_size or kegg_config.get('pool_size', 10)
+        self.timeout: Tuple[float, float] = (
+            kegg_config.get('connect_timeout', kegg_config['timeout']),
+            kegg_config['timeout']
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.cache = get_cache(self.config)
+        self.offline = is_offline(self.config)
+        self.mirror = get_mirror(self.config)
+        self.limiter = get_limiter(self.config)
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL of an API path such as ``get/rn:R00200``."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, url: str) -> requests.Response:
+        """Send a GET request without consulting the cache.
+
+        The request waits for the rate limiter, and throttled (403, 429, 5xx),
+        timed out and failed attempts are retried with jittered exponential
+        backoff, up to ``kegg.max_retries`` times.
+
+        Args:
+            url: Absolute request URL.
+
+        Returns:
+            The response, whatever its status code. When retries are exhausted,
+            this is the last throttled response.
+
+        Raises:
+            requests.RequestException: If the request could not be completed.
+        """
+        return self.limiter.call(
+            lambda: self._send(url),
+            (requests.ConnectionError, requests.Timeout),
+            _response_info,
+            description=url
+        )
+
+    def _send(self, url: str) -> requests.Response:
+        """Send a single attempt of a request."""
+        if not metrics.enabled():
+            return self.session.get(url, timeout=self.timeout)
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            metrics.inc('kegg_request_errors_total')
+            raise
+        metrics.observe('kegg_request_seconds', time.perf_counter() - started)
+        metrics.observe('kegg_response_bytes', len(response.content))
+        metrics.inc('kegg_requests_total', status=response.status_code)
+        return response
+
+    def get_text(self, url: str) -> str:
+        """Fetch a URL, serving it from the response cache when possible.
+
+        Args:
+            url: Absolute request URL.
+
+        Returns:
+            Response text.
+
+        Raises:
+            OfflineCacheMiss: If offline mode is on and the URL is not cached.
+            requests.RequestException: If there's an error fetching data from KEGG.
+        """
+        if self.cache is not None:
+            body = self.cache.get(url, allow_expired=self.offline)
+            if body is not None:
+                return body
+
+        if self.offline:
+            raise OfflineCacheMiss(f"Offline mode: no cached response for {url}")
+
+        response = self.request(url)
+        response.raise_for_status()
+
+        if self.cache is not None:
+            self.cache.set(url, response.text)
+        return response.text
+
+    def get_entry_text(self, database: str, entity_id: str) -> str:
+        """Fetch the flat-file text of one entry, resolving it locally first.
+
+        The entry is looked up in the local mirror, then in the response
+        cache, before KEGG is contacted.
+
+        Args:
+            database: KEGG database prefix (e.g., 'rn' or 'cpd').
+            entity_id: Entry ID (e.g., 'R00200').
+
+        Returns:
+            Entry text.
+
+        Raises:
+            OfflineCacheMiss: If offline mode is on and the entry is not stored locally.
+            requests.RequestException: If there's an error fetching data from KEGG.
+        """
+        if self.mirror is not None:
+            body = self.mirror.get(database, entity_id)
+            if body is not None:
+                return body
+        return self.get_text(self.url(f"get/{database}:{entity_id}"))
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> 'KeggClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+def _response_info(response: requests.Response) -> Tuple[int, Optional[str]]:
+    """Return the status code and Retry-After header of a response."""
+    headers = getattr(response, 'headers', None) or {}
+    return response.status_code, headers.get('Retry-After')
+
+# Process-wide clients, one per distinct connection setup
+_clients: Dict[Tuple[Any, ...], KeggClient] = {}
+_clients_lock = threading.Lock()
+
+def get_client(config: Optional[Dict[str, Any]] = None) -> KeggClient:
+    """Return the shared client for a configuration.
+
+    Args:
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+
+    Returns:
+        A KeggClient shared by every caller using the same KEGG, cache and
+        mirror settings.
+    """
+    if config is None:
+        config = load_config()
+
+    key = (
+        repr(sorted(config['kegg'].items())),
+        repr(sorted(config.get('cache', {}).items())),
+        repr(sorted(config.get('mirror', {}).items()))
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = KeggClient(config)
+            _clients[key] = client
+    return client
@@ -0,0 +1,151 @@
+"""Fetching a set of reactions together with every compound they reference.
+
+Building a model needs the compounds of all reactions, and the same few
+compounds (water, ATP, NAD+...) appear in most of them. The closure crawler
+fetches the reactions, collects the unique compound IDs of their
+stoichiometry and fetches each of those once, in concurrent combined
+requests. It can then follow the ``reactions`` field of the new compounds to
+pull in neighbouring reactions, level by level.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+from kegg.batch import KEGG_MAX_ENTRIES
+from kegg.bulk import KINDS, fetch_many
+from kegg.client import KeggClient, get_client
+from kegg.records import term_parts, to_frame
+from utils.config import load_config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class ReactionClosure(NamedTuple):
+    """Reactions and compounds fetched by :func:`fetch_reaction_closure`."""
+    reactions: 'pd.DataFrame'
+    compounds: 'pd.DataFrame'
+    missing: List[str]
+    failed: List[str]
+
+def stoichiometry_compounds(record: Dict[str, Any]) -> List[str]:
+    """Return the unique compound IDs of a parsed reaction, in equation order.
+
+    Suffixes such as '(n)' or '(side 1)' are removed, so 'C00404(n)' gives
+    'C00404'.
+    """
+    compounds = []
+    for term in list(record.get('reactants') or []) + list(record.get('products') or []):
+        compounds.append(term_parts(term)[1].split('(', 1)[0])
+    return list(dict.fromkeys(compounds))
+
+def fetch_reaction_closure(
+    reaction_ids: Iterable[str],
+    depth: int = 0,
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    workers: int = 8,
+    chunk_size: int = KEGG_MAX_ENTRIES,
+    exclude_compounds: Iterable[str] = (),
+    progress: Optional[Callable[[int, int], None]] = None
+) -> ReactionClosure:
+    """Fetch reactions and every compound referenced by their stoichiometry.
+
+    Each unique reaction and compound ID is requested exactly once, whatever
+    the number of reactions referencing it. With ``depth`` > 0, the reactions
+    listed in the ``reactions`` field of the fetched compounds are added and
+    their compounds fetched in turn, up to ``depth`` levels. The closure grows
+    quickly with depth through common compounds such as water or ATP; list
+    them in ``exclude_compounds`` to fetch them without following their
+    reactions.
+
+    Args:
+        reaction_ids: KEGG reaction IDs (e.g., ['R00200', 'R00299']).
+        depth: Number of expansion levels through compound reactions.
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        workers: Number of concurrent requests.
+        chunk_size: Number of IDs per request.
+        exclude_compounds: Compound IDs whose reactions are not followed.
+        progress: Optional callback receiving (entries done, entries failed)
+            after each chunk.
+
+    Returns:
+        ReactionClosure with the reactions and compounds tables (with the
+        configured fields, reactions in the order they were reached), the
+        IDs KEGG did not return and the IDs whose requests failed.
+
+    Raises:
+        ValueError: If a reaction ID is invalid or ``depth`` is negative.
+    """
+    if config is None:
+        config = client.config if client is not None else load_config()
+    if client is None:
+        client = get_client(config)
+    if depth < 0:
+        raise ValueError(f"Closure depth must be at least 0, got {depth}")
+
+    frontier = list(dict.fromkeys(reaction_ids))
+    for reaction_id in frontier:
+        if not reaction_id.startswith('R'):
+            raise ValueError(f"Invalid reaction ID format: {reaction_id}. Must start with 'R'.")
+    excluded = set(exclude_compounds)
+
+    reactions: List[Dict[str, Any]] = []
+    compounds: List[Dict[str, Any]] = []
+    seen_reactions: Set[str] = set(frontier)
+    seen_compounds: Set[str] = set()
+    missing: List[str] = []
+    failed: List[str] = []
+
+    level = 0
+    while frontier:
+        result = fetch_many(KINDS['reactions'], frontier, client, workers=workers,
+                            chunk_size=chunk_size, progress=progress)
+        reactions.extend(result.records)
+        missing.extend(result.missing)
+        failed.extend(result.failed)
+
+        # Collect the compounds not fetched yet, once each
+        new_compounds: List[str] = []
+        for record in result.records:
+            for compound_id in stoichiometry_compounds(record):
+                if compound_id not in seen_compounds:
+                    seen_compounds.add(compound_id)
+                    new_compounds.append(compound_id)
+        # Glycans (G) and other non-compound entries are outside the compound database
+        skipped = [entity_id for entity_id in new_compounds if not entity_id.startswith('C')]
+        if skipped:
+            logger.info(f"Skipping {len(skipped)} non-compound entries: {', '.join(skipped[:10])}")
+            new_compounds = [entity_id for entity_id in new_compounds if entity_id.startswith('C')]
+
+        result = fetch_many(KINDS['compounds'], new_compounds, client, workers=workers,
+                            chunk_size=chunk_size, progress=progress)
+        compounds.extend(result.records)
+        missing.extend(result.missing)
+        failed.extend(result.failed)
+        logger.info(
+            f"Closure level {level}: {len(frontier)} reactions, {len(new_compounds)} new compounds"
+        )
+
+        if level >= depth:
+            break
+        level += 1
+
+        # Next level: reactions of the new compounds that were not reached yet
+        frontier = []
+        for record in result.records:
+            if record['compound_id'] in excluded:
+                continue
+            for reaction_id in (record.get('reactions') or '').split():
+                if reaction_id not in seen_reactions:
+                    seen_reactions.add(reaction_id)
+                    frontier.append(reaction_id)
+
+    reaction_fields = config['reaction']['fields']
+    compound_fields = config['compound']['fields']
+    reactions_df = to_frame(reactions, columns=reaction_fields)[reaction_fields]
+    compounds_df = to_frame(compounds, columns=compound_fields)[compound_fields]
+    return ReactionClosure(reactions_df, compounds_df, missing, failed)
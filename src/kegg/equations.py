@@ -0,0 +1,202 @@
+"""Parsing of KEGG reaction equations into reactants and products.
+
+A KEGG equation joins terms with `` + `` on each side of ``<=>`` (or ``=>``).
+Each term is an optional coefficient, a compound ID and an optional
+parenthesized suffix, for example ``C00002``, ``2 C00001``, ``n C00083``,
+``(n+1) C00002``, ``C00404(n)`` or ``C00001(side 1)``.
+"""
+
+import re
+from fractions import Fraction
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Coefficient forms: 2, 1/2, n, 2n, (n+1), (m+n), (n-1)
+COEFFICIENT_PATTERN = r'\d+(?:[./]\d+)?|\d*[a-z]|\([^()\s]+\)'
+
+# One equation term, with named groups
+TERM_PATTERN = (
+    rf'^(?:(?P<coefficient_expr>{COEFFICIENT_PATTERN})\s+)?'
+    r'(?P<compound>[^\s()]+)(?P<suffix>\([^()]*\))?$'
+)
+TERM_RE = re.compile(TERM_PATTERN)
+
+# Split of an equation into its two sides (terms never contain '<', '=' or '>')
+ARROW_EQUATION_PATTERN = r'^\s*(?P<left>[^<=>]*?)\s*(?P<arrow><=>|=>)\s*(?P<right>[^<=>]*?)\s*$'
+
+# Tokens of many newline-joined equations: an equation boundary, an arrow or a term
+TOKEN_RE = re.compile(
+    r'(\n|<=>|=>)'
+    rf'|(?:({COEFFICIENT_PATTERN}) )?([A-Za-z0-9][^\s()]*)(\([^()\n]*\))?'
+)
+
+# Columns of the long-form table returned by parse_equations
+EQUATION_COLUMNS = ['reaction_id', 'side', 'compound', 'coefficient', 'coefficient_expr', 'suffix']
+
+def parse_equation(equation: str) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Parse reaction equation into reactants and products.
+
+    Args:
+        equation: Reaction equation string.
+
+    Returns:
+        Tuple of (reactants, products) where each is a list of dictionaries
+        containing 'coefficient' and 'compound' keys.
+    """
+    # Split equation into reactants and products
+    if '<=>' in equation:
+        reactants_str, products_str = equation.split('<=>')
+    elif '=>' in equation:
+        reactants_str, products_str = equation.split('=>')
+    else:
+        raise ValueError(f"Invalid equation format: {equation}")
+
+    # Parse reactants and products
+    reactants = parse_compounds(reactants_str.strip())
+    products = parse_compounds(products_str.strip())
+
+    return reactants, products
+
+def parse_compounds(compounds_str: str) -> List[Dict[str, str]]:
+    """Parse compound string into list of compounds with coefficients.
+
+    Args:
+        compounds_str: String containing compounds and coefficients.
+
+    Returns:
+        List of dictionaries containing 'coefficient' and 'compound' keys.
+        The compound keeps its suffix (e.g., 'C00404(n)'); the coefficient
+        defaults to '1'.
+    """
+    compounds = []
+    for term in compounds_str.split(' + '):
+        term = term.strip()
+        if not term:
+            continue
+
+        match = TERM_RE.match(term)
+        if match is None:
+            # Unrecognised term: keep it whole rather than guessing a coefficient
+            coefficient, compound = '1', term
+        else:
+            coefficient = match.group('coefficient_expr') or '1'
+            compound = match.group('compound') + (match.group('suffix') or '')
+
+        compounds.append({
+            'coefficient': coefficient,
+            'compound': compound
+        })
+
+    return compounds
+
+def _coefficient_value(expr: str) -> float:
+    """Return the numeric value of a coefficient, or NaN if it is symbolic."""
+    try:
+        return float(Fraction(expr))
+    except ValueError:
+        return float('nan')
+
+def _tokenize_regex(equations: 'pd.Series') -> Tuple['np.ndarray', ...]:
+    """Split equations into terms with one regex pass over the joined text."""
+    import numpy as np
+
+    # findall builds all token tuples in C
+    text = '\n'.join(equations.fillna('').astype(str)) + '\n'
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        empty = np.array([], dtype=object)
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int8), empty, empty, empty
+    marker, expr, compound, suffix = (np.array(column, dtype=object) for column in zip(*tokens))
+
+    # Locate each token's equation and side from running counts of markers
+    is_newline = marker == '\n'
+    is_arrow = (marker == '<=>') | (marker == '=>')
+    position = np.cumsum(is_newline) - is_newline
+    arrows = np.cumsum(is_arrow)
+    arrows_at_end = arrows[is_newline]
+    arrows_before = np.concatenate(([0], arrows_at_end[:-1]))
+    side = arrows - arrows_before[position]
+
+    # Keep terms of equations with exactly one arrow
+    one_arrow = (arrows_at_end - arrows_before) == 1
+    keep = (marker == '') & one_arrow[position]
+    return position[keep], side[keep].astype(np.int8), expr[keep], compound[keep], suffix[keep]
+
+def _tokenize_arrow(equations: 'pd.Series', pa: Any) -> Tuple['np.ndarray', ...]:
+    """Split equations into terms with pyarrow compute kernels."""
+    import numpy as np
+    import pyarrow.compute as pc
+
+    array = pa.array(equations.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    sides = pc.extract_regex(array, ARROW_EQUATION_PATTERN)
+
+    parts = []
+    for code, name in ((0, 'left'), (1, 'right')):
+        lists = pc.split_pattern(pc.struct_field(sides, name), ' + ')
+        parents = pc.list_parent_indices(lists)
+        terms = pc.extract_regex(pc.utf8_trim_whitespace(pc.list_flatten(lists)), TERM_PATTERN)
+        valid = pc.is_valid(terms)
+        terms = terms.filter(valid)
+        parts.append((
+            parents.filter(valid).to_numpy(),
+            np.full(len(terms), code, dtype=np.int8),
+            *(pc.struct_field(terms, field).to_numpy(zero_copy_only=False)
+              for field in ('coefficient_expr', 'compound', 'suffix')),
+        ))
+    position, side, expr, compound, suffix = (np.concatenate(columns) for columns in zip(*parts))
+
+    # Order by equation, then side; lexsort is stable so term order is kept
+    order = np.lexsort((side, position))
+    return position[order], side[order], expr[order], compound[order], suffix[order]
+
+def parse_equations(equations: 'pd.Series', reaction_ids: Optional[Iterable[str]] = None) -> 'pd.DataFrame':
+    """Parse a column of equations into a long-form stoichiometry table.
+
+    All equations are tokenized in one vectorized pass, instead of one
+    Python call per equation. With pyarrow installed, the precompiled term
+    pattern runs in Arrow compute kernels; otherwise the equations are joined
+    and tokenized by a single regex scan, with equation and side membership
+    derived from NumPy cumulative sums.
+
+    Args:
+        equations: Equation strings, e.g. ``reactions_df['equation']``.
+        reaction_ids: Reaction ID of each equation. If None, uses the index of
+            ``equations``.
+
+    Returns:
+        DataFrame with one row per term and the columns reaction_id, side
+        ('reactant' or 'product'), compound (ID without suffix), coefficient
+        (float, NaN for symbolic coefficients such as 'n' or '(n+1)'),
+        coefficient_expr (coefficient as written, '1' when omitted) and suffix
+        (e.g. '(n)' or '(side 1)', empty if none). Rows follow the input
+        order, reactants before products. Equations without exactly one
+        arrow are skipped.
+    """
+    import numpy as np
+    import pandas as pd
+
+    reaction_ids = equations.index if reaction_ids is None else pd.Index(list(reaction_ids))
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        position, side, expr, compound, suffix = _tokenize_regex(equations)
+    else:
+        position, side, expr, compound, suffix = _tokenize_arrow(equations, pa)
+
+    # Few distinct coefficients exist, so each is converted once
+    codes, uniques = pd.factorize(expr)
+    uniques = np.array([value or '1' for value in uniques], dtype=object)
+    values = np.array([_coefficient_value(value) for value in uniques], dtype=float)
+
+    return pd.DataFrame({
+        'reaction_id': reaction_ids[position],
+        'side': pd.Categorical.from_codes(side, categories=['reactant', 'product']),
+        'compound': compound,
+        'coefficient': values[codes],
+        'coefficient_expr': uniques[codes],
+        'suffix': suffix,
+    }, columns=EQUATION_COLUMNS)
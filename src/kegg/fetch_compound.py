@@ -1,28 +1,56 @@
 """Module for fetching compound information from KEGG."""
 
 import logging
-from typing import Dict, List, Optional, Union
-import pandas as pd
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 import requests
+from kegg import metrics
+from kegg.batch import fetch_entries
+from kegg.bulk import KINDS, FetchResult, fetch_many
+from kegg.client import KeggClient, get_client
+from kegg.memo import RecordMemo, get_memo
+from kegg.output import write_output
+from kegg.parser import COMPOUND_SCHEMA, parse_entry
+from kegg.records import Compound, compound_from_dict, to_frame
+from kegg.singleflight import coalesce
 from utils.config import load_config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def get_compound_info(compound_id: Optional[str] = None) -> pd.DataFrame:
-    """Fetch compound information from KEGG.
+def get_compound_record(
+    compound_id: Optional[str] = None,
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    typed: bool = False
+) -> Union[Dict[str, Any], Compound]:
+    """Fetch one compound from KEGG as a plain record.
+    
+    Unlike :func:`get_compound_info`, this does not import pandas, so one-shot
+    lookups do not pay for its import. Concurrent calls for the same ID share
+    a single request and parse, and receive the same dictionary, which must
+    not be modified.
     
     Args:
         compound_id: KEGG compound ID (e.g., 'C00031'). If None, uses the default ID from config.
+        client: Client used for the request. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        typed: Whether to return a compact ``kegg.records.Compound`` instead of a
+            dictionary.
         
     Returns:
-        DataFrame containing compound information.
+        Dictionary with every parsed field, or a Compound record if ``typed``.
         
     Raises:
         ValueError: If the compound ID is invalid.
         requests.RequestException: If there's an error fetching data from KEGG.
     """
-    config = load_config()
+    if config is None:
+        config = client.config if client is not None else load_config()
     
     if compound_id is None:
         compound_id = config['compound']['default_id']
@@ -31,26 +59,197 @@ def get_compound_info(compound_id: Optional[str] = None) -> pd.DataFrame:
     if not compound_id.startswith('C'):
         raise ValueError(f"Invalid compound ID format: {compound_id}. Must start with 'C'.")
     
-    # Construct API URL
-    base_url = config['kegg']['base_url']
-    url = f"{base_url}/get/cpd:{compound_id}"
+    memo = get_memo(config)
+    if memo is not None:
+        record = memo.get('cpd', compound_id, typed=compound_from_dict if typed else None)
+        if record is not None:
+            return record
+    
+    if client is None:
+        client = get_client(config)
     
+    # Concurrent callers asking for the same compound share one request and parse
+    data = coalesce(('cpd', compound_id, client.base_url), lambda: _fetch_compound(compound_id, client, memo))
+    
+    return compound_from_dict(data) if typed else data
+
+def _fetch_compound(compound_id: str, client: KeggClient, memo: Optional[RecordMemo]) -> Dict[str, Any]:
+    """Fetch and parse one compound and memoize it, for :func:`get_compound_record`."""
     try:
-        response = requests.get(url, timeout=config['kegg']['timeout'])
-        response.raise_for_status()
+        with metrics.timer('kegg_stage_seconds', kind='compound', stage='fetch'):
+            response_text = client.get_entry_text('cpd', compound_id)
     except requests.RequestException as e:
         logger.error(f"Error fetching compound {compound_id}: {e}")
         raise
     
     # Parse response
-    data = parse_kegg_response(response.text)
+    with metrics.timer('kegg_stage_seconds', kind='compound', stage='parse'):
+        data = parse_kegg_response(response_text)
+    
+    if memo is not None:
+        memo.set('cpd', compound_id, data)
+    return data
+
+def get_compound_info(
+    compound_id: Optional[str] = None,
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> 'pd.DataFrame':
+    """Fetch compound information from KEGG.
+    
+    Args:
+        compound_id: KEGG compound ID (e.g., 'C00031'). If None, uses the default ID from config.
+        client: Client used for the request. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        
+    Returns:
+        DataFrame containing compound information.
+        
+    Raises:
+        ValueError: If the compound ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if config is None:
+        config = client.config if client is not None else load_config()
+    
+    data = get_compound_record(compound_id, client=client, config=config)
     
     # Create DataFrame
-    df = pd.DataFrame([data])
+    with metrics.timer('kegg_stage_seconds', kind='compound', stage='frame'):
+        df = to_frame([data])
     
     # Select fields based on configuration
     fields = config['compound']['fields']
-    df = df[fields]
+    with metrics.timer('kegg_stage_seconds', kind='compound', stage='select'):
+        df = df[fields]
+    
+    return df
+
+def get_compound_records(
+    compound_ids: Iterable[str],
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    journal: Optional[str] = None,
+    typed: bool = False
+) -> FetchResult:
+    """Fetch several compounds as plain records using combined KEGG requests.
+    
+    IDs are grouped into multi-entry ``/get`` calls, so a list of N compounds
+    costs about N / 10 round trips instead of N. Like
+    :func:`get_compound_record`, this does not import pandas, with or without a
+    journal.
+    
+    Args:
+        compound_ids: KEGG compound IDs (e.g., ['C00031', 'C00002']).
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        journal: Optional path of a progress journal. Completed entries are
+            saved in shards as they arrive, so repeating an interrupted call
+            with the same journal only fetches the remaining IDs. Failed
+            requests are then reported instead of raising.
+        typed: Whether to return compact ``kegg.records.Compound`` records
+            instead of dictionaries.
+        
+    Returns:
+        FetchResult with one record per compound found, in input order, the IDs
+        KEGG did not return and the IDs whose requests failed (only with a
+        journal).
+        
+    Raises:
+        ValueError: If a compound ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if config is None:
+        config = client.config if client is not None else load_config()
+    
+    # Drop duplicates while keeping the caller's order
+    compound_ids = list(dict.fromkeys(compound_ids))
+    
+    # Validate compound ID format
+    for compound_id in compound_ids:
+        if not compound_id.startswith('C'):
+            raise ValueError(f"Invalid compound ID format: {compound_id}. Must start with 'C'.")
+    
+    if client is None:
+        client = get_client(config)
+    
+    failed = []
+    if journal is not None:
+        result = fetch_many(KINDS['compounds'], compound_ids, client, workers=1, journal=journal)
+        records, missing, failed = result.records, result.missing, result.failed
+    else:
+        # Memoized compounds are served without a request
+        memo = get_memo(config)
+        parsed = {}
+        if memo is not None:
+            for compound_id in compound_ids:
+                data = memo.get('cpd', compound_id)
+                if data is not None:
+                    parsed[compound_id] = data
+        
+        with metrics.timer('kegg_stage_seconds', kind='compound', stage='fetch'):
+            entries, missing = fetch_entries('cpd', [compound_id for compound_id in compound_ids if compound_id not in parsed], client)
+        
+        # Parse each entry of the combined responses
+        with metrics.timer('kegg_stage_seconds', kind='compound', stage='parse'):
+            for compound_id, text in entries.items():
+                parsed[compound_id] = parse_kegg_response(text)
+                if memo is not None:
+                    memo.set('cpd', compound_id, parsed[compound_id])
+        records = [parsed[compound_id] for compound_id in compound_ids if compound_id in parsed]
+    
+    if missing:
+        logger.warning(f"Compounds not found in KEGG: {', '.join(missing)}")
+    
+    if typed:
+        records = [compound_from_dict(record) for record in records]
+    return FetchResult(records, missing, failed)
+
+def get_compounds_info(
+    compound_ids: Iterable[str],
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    journal: Optional[str] = None
+) -> 'pd.DataFrame':
+    """Fetch information for several compounds using combined KEGG requests.
+    
+    IDs are grouped into multi-entry ``/get`` calls, so a list of N compounds
+    costs about N / 10 round trips instead of N.
+    
+    Args:
+        compound_ids: KEGG compound IDs (e.g., ['C00031', 'C00002']).
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        journal: Optional path of a progress journal. Completed entries are
+            saved in shards as they arrive, so repeating an interrupted call
+            with the same journal only fetches the remaining IDs. Failed
+            requests are then listed in ``df.attrs['failed_ids']`` instead of
+            raising.
+        
+    Returns:
+        DataFrame with one row per compound found, in input order. IDs that
+        KEGG did not return are listed in ``df.attrs['missing_ids']``.
+        
+    Raises:
+        ValueError: If a compound ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if config is None:
+        config = client.config if client is not None else load_config()
+    
+    records, missing, failed = get_compound_records(compound_ids, client=client, config=config, journal=journal)
+    
+    # Select fields based on configuration
+    fields = config['compound']['fields']
+    with metrics.timer('kegg_stage_seconds', kind='compound', stage='frame'):
+        df = to_frame(records, columns=fields)
+    with metrics.timer('kegg_stage_seconds', kind='compound', stage='select'):
+        df = df[fields]
+    df.attrs['missing_ids'] = missing
+    df.attrs['failed_ids'] = failed
     
     return df
 
@@ -63,72 +262,7 @@ def parse_kegg_response(response_text: str) -> Dict[str, Union[str, List[str]]]:
     Returns:
         Dictionary containing parsed compound information.
     """
-    data = {
-        'compound_id': '',
-        'name': '',
-        'formula': '',
-        'exact_mass': '',
-        'molecular_weight': '',
-        'reactions': '',
-        'enzymes': '',
-        'pathways': '',
-        'modules': '',
-        'dblinks': ''
-    }
-    
-    current_section = None
-    for line in response_text.split('\n'):
-        if not line.strip():
-            continue
-            
-        if line.startswith(' '):
-            # Continuation of previous section
-            if current_section == 'NAME':
-                data['name'] += ' ' + line.strip()
-            elif current_section == 'FORMULA':
-                data['formula'] += ' ' + line.strip()
-            elif current_section == 'EXACT_MASS':
-                data['exact_mass'] += ' ' + line.strip()
-            elif current_section == 'MOL_WEIGHT':
-                data['molecular_weight'] += ' ' + line.strip()
-            elif current_section == 'REACTION':
-                data['reactions'] += ' ' + line.strip()
-            elif current_section == 'ENZYME':
-                data['enzymes'] += ' ' + line.strip()
-            elif current_section == 'PATHWAY':
-                data['pathways'] += ' ' + line.strip()
-            elif current_section == 'MODULE':
-                data['modules'] += ' ' + line.strip()
-            elif current_section == 'DBLINKS':
-                data['dblinks'] += ' ' + line.strip()
-        else:
-            # New section
-            if ' ' in line:
-                section, content = line.split(' ', 1)
-                current_section = section
-                
-                if section == 'ENTRY':
-                    data['compound_id'] = content.split()[0]
-                elif section == 'NAME':
-                    data['name'] = content.strip()
-                elif section == 'FORMULA':
-                    data['formula'] = content.strip()
-                elif section == 'EXACT_MASS':
-                    data['exact_mass'] = content.strip()
-                elif section == 'MOL_WEIGHT':
-                    data['molecular_weight'] = content.strip()
-                elif section == 'REACTION':
-                    data['reactions'] = content.strip()
-                elif section == 'ENZYME':
-                    data['enzymes'] = content.strip()
-                elif section == 'PATHWAY':
-                    data['pathways'] = content.strip()
-                elif section == 'MODULE':
-                    data['modules'] = content.strip()
-                elif section == 'DBLINKS':
-                    data['dblinks'] = content.strip()
-    
-    return data
+    return parse_entry(response_text, COMPOUND_SCHEMA)
 
 # Example usage
 if __name__ == "__main__":
@@ -138,16 +272,12 @@ if __name__ == "__main__":
     
     compound_id = config['compound']['default_id']
     try:
-        df = get_compound_info(compound_id)
+        df = get_compound_info(compound_id, config=config)
         print("\nCompound Information DataFrame:")
         print(df)
         
-        # Save to CSV in data directory
-        output_file = os.path.join(
-            config['output']['data_dir'],
-            f"kegg_compound_{compound_id}.{config['output']['file_format']}"
-        )
-        df.to_csv(output_file, index=config['output']['index'])
+        # Save to the data directory in the configured format
+        output_file = write_output(df, f"kegg_compound_{compound_id}", config)
         print(f"\nData saved to {output_file}")
         logger.info(f"Successfully saved compound data for {compound_id}")
     except Exception as e:
@@ -1,33 +1,18 @@
-import requests
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
-import re
+from kegg.client import KeggClient, get_client
+from kegg.equations import parse_compounds as _parse_compounds
+from kegg.parser import iter_sections
 
 def parse_kegg_reaction(response_text: str) -> Dict:
     """Parse KEGG reaction information into a structured dictionary."""
     info = {}
-    current_key = None
-    
-    for line in response_text.split('\n'):
-        if not line.strip():
-            continue
-            
-        if line.startswith(' '):
-            # Continuation of previous key
-            if current_key and current_key in info:
-                if isinstance(info[current_key], list):
-                    info[current_key].append(line.strip())
-                else:
-                    info[current_key] = [info[current_key], line.strip()]
-        else:
-            # New key
-            if ' ' in line:
-                key, value = line.split(' ', 1)
-                info[key] = value.strip()
-                current_key = key
-            else:
-                current_key = line.strip()
-                info[current_key] = []
+    for sections in iter_sections(response_text.split('\n')):
+        for key, occurrences in sections.items():
+            # Single-line sections map to a string, the others to their list of lines
+            lines = occurrences[-1]
+            info[key] = lines[0] if len(lines) == 1 else lines
+        break
     
     return info
 
@@ -44,28 +29,9 @@ def parse_compounds(compound_str: str) -> List[Dict[str, str]]:
     if not compound_str:
         return []
     
-    # Split by '+' and handle stoichiometric coefficients
-    compounds = []
-    for comp in compound_str.split('+'):
-        comp = comp.strip()
-        if not comp:
-            continue
-            
-        # Match coefficient and compound name
-        match = re.match(r'^(\d+)\s*(.+)$', comp)
-        if match:
-            coefficient, compound = match.groups()
-            compounds.append({
-                'coefficient': coefficient,
-                'compound': compound.strip()
-            })
-        else:
-            compounds.append({
-                'coefficient': '1',
-                'compound': comp.strip()
-            })
-    
-    return compounds
+    # Coefficients such as '(n+1)' contain '+', so terms are split on ' + '
+    # and matched with the shared term pattern
+    return _parse_compounds(compound_str)
 
 def split_equation(equation: str) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], bool]:
     """
@@ -96,23 +62,28 @@ def split_equation(equation: str) -> Tuple[List[Dict[str, str]], List[Dict[str,
     
     return reactants, products, is_reversible
 
-def get_reaction_info(reaction_id: str) -> pd.DataFrame:
+def get_reaction_info(reaction_id: str, client: Optional[KeggClient] = None) -> pd.DataFrame:
     """
     Fetch and parse KEGG reaction information for a given reaction ID.
     
     Args:
         reaction_id (str): KEGG reaction ID (e.g., 'R00200')
+        client (Optional[KeggClient]): Client used for the request. If None, uses the shared client.
         
     Returns:
         pd.DataFrame: DataFrame containing the reaction information
+        
+    Raises:
+        requests.RequestException: If the request still fails after the client's
+            retries, so callers can tell network errors from parsing errors.
     """
-    url = f"https://rest.kegg.jp/get/{reaction_id}"
-    response = requests.get(url)
+    if client is None:
+        client = get_client()
+    url = client.url(f"get/{reaction_id}")
     
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch reaction information for {reaction_id}")
+    response_text = client.get_text(url)
     
-    info = parse_kegg_reaction(response.text)
+    info = parse_kegg_reaction(response_text)
     
     # Split equation into reactants and products, and get reversibility
     equation = info.get('EQUATION', '')
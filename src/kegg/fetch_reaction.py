@@ -1,28 +1,57 @@
 """Module for fetching reaction information from KEGG."""
 
 import logging
-from typing import Dict, List, Optional, Union
-import pandas as pd
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 import requests
+from kegg import metrics
+from kegg.batch import fetch_entries
+from kegg.bulk import KINDS, FetchResult, fetch_many
+from kegg.client import KeggClient, get_client
+from kegg.equations import parse_compounds, parse_equation  # noqa: F401 (re-exported)
+from kegg.memo import RecordMemo, get_memo
+from kegg.output import write_output
+from kegg.parser import REACTION_SCHEMA, parse_entry
+from kegg.records import Reaction, reaction_from_dict, to_frame
+from kegg.singleflight import coalesce
 from utils.config import load_config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def get_reaction_info(reaction_id: Optional[str] = None) -> pd.DataFrame:
-    """Fetch reaction information from KEGG.
+def get_reaction_record(
+    reaction_id: Optional[str] = None,
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    typed: bool = False
+) -> Union[Dict[str, Any], Reaction]:
+    """Fetch one reaction from KEGG as a plain record.
+    
+    Unlike :func:`get_reaction_info`, this does not import pandas, so one-shot
+    lookups do not pay for its import. Concurrent calls for the same ID share
+    a single request and parse, and receive the same dictionary, which must
+    not be modified.
     
     Args:
         reaction_id: KEGG reaction ID (e.g., 'R00200'). If None, uses the default ID from config.
+        client: Client used for the request. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        typed: Whether to return a compact ``kegg.records.Reaction`` instead of a
+            dictionary.
         
     Returns:
-        DataFrame containing reaction information.
+        Dictionary with every parsed field, or a Reaction record if ``typed``.
         
     Raises:
         ValueError: If the reaction ID is invalid.
         requests.RequestException: If there's an error fetching data from KEGG.
     """
-    config = load_config()
+    if config is None:
+        config = client.config if client is not None else load_config()
     
     if reaction_id is None:
         reaction_id = config['reaction']['default_id']
@@ -31,179 +60,225 @@ def get_reaction_info(reaction_id: Optional[str] = None) -> pd.DataFrame:
     if not reaction_id.startswith('R'):
         raise ValueError(f"Invalid reaction ID format: {reaction_id}. Must start with 'R'.")
     
-    # Construct API URL
-    base_url = config['kegg']['base_url']
-    url = f"{base_url}/get/rn:{reaction_id}"
+    memo = get_memo(config)
+    if memo is not None:
+        record = memo.get('rn', reaction_id, typed=reaction_from_dict if typed else None)
+        if record is not None:
+            return record
+    
+    if client is None:
+        client = get_client(config)
+    
+    # Concurrent callers asking for the same reaction share one request and parse
+    data = coalesce(('rn', reaction_id, client.base_url), lambda: _fetch_reaction(reaction_id, client, memo))
     
+    return reaction_from_dict(data) if typed else data
+
+def _fetch_reaction(reaction_id: str, client: KeggClient, memo: Optional[RecordMemo]) -> Dict[str, Any]:
+    """Fetch and parse one reaction and memoize it, for :func:`get_reaction_record`."""
     try:
-        response = requests.get(url, timeout=config['kegg']['timeout'])
-        response.raise_for_status()
+        with metrics.timer('kegg_stage_seconds', kind='reaction', stage='fetch'):
+            response_text = client.get_entry_text('rn', reaction_id)
     except requests.RequestException as e:
         logger.error(f"Error fetching reaction {reaction_id}: {e}")
         raise
     
     # Parse response
-    data = parse_kegg_response(response.text)
+    with metrics.timer('kegg_stage_seconds', kind='reaction', stage='parse'):
+        data = parse_kegg_response(response_text)
+    
+    if memo is not None:
+        memo.set('rn', reaction_id, data)
+    return data
+
+def get_reaction_info(
+    reaction_id: Optional[str] = None,
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> 'pd.DataFrame':
+    """Fetch reaction information from KEGG.
+    
+    Args:
+        reaction_id: KEGG reaction ID (e.g., 'R00200'). If None, uses the default ID from config.
+        client: Client used for the request. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        
+    Returns:
+        DataFrame containing reaction information.
+        
+    Raises:
+        ValueError: If the reaction ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if config is None:
+        config = client.config if client is not None else load_config()
+    
+    data = get_reaction_record(reaction_id, client=client, config=config)
     
     # Create DataFrame
-    df = pd.DataFrame([data])
+    with metrics.timer('kegg_stage_seconds', kind='reaction', stage='frame'):
+        df = to_frame([data])
     
     # Select fields based on configuration
     fields = config['reaction']['fields']
-    df = df[fields]
+    with metrics.timer('kegg_stage_seconds', kind='reaction', stage='select'):
+        df = df[fields]
     
     return df
 
-def parse_kegg_response(response_text: str) -> Dict[str, Union[str, List[Dict[str, str]], bool]]:
-    """Parse KEGG API response into structured data.
+def get_reaction_records(
+    reaction_ids: Iterable[str],
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    journal: Optional[str] = None,
+    typed: bool = False
+) -> FetchResult:
+    """Fetch several reactions as plain records using combined KEGG requests.
+    
+    IDs are grouped into multi-entry ``/get`` calls, so a list of N reactions
+    costs about N / 10 round trips instead of N. Like
+    :func:`get_reaction_record`, this does not import pandas, with or without a
+    journal.
     
     Args:
-        response_text: Raw response text from KEGG API.
+        reaction_ids: KEGG reaction IDs (e.g., ['R00200', 'R00299']).
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        journal: Optional path of a progress journal. Completed entries are
+            saved in shards as they arrive, so repeating an interrupted call
+            with the same journal only fetches the remaining IDs. Failed
+            requests are then reported instead of raising.
+        typed: Whether to return compact ``kegg.records.Reaction`` records
+            instead of dictionaries.
         
     Returns:
-        Dictionary containing parsed reaction information.
+        FetchResult with one record per reaction found, in input order, the IDs
+        KEGG did not return and the IDs whose requests failed (only with a
+        journal).
+        
+    Raises:
+        ValueError: If a reaction ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
     """
-    data = {
-        'reaction_id': '',
-        'name': '',
-        'definition': '',
-        'equation': '',
-        'reactants': [],
-        'products': [],
-        'is_reversible': False,
-        'enzyme': '',
-        'pathways': '',
-        'modules': '',
-        'orthology': '',
-        'dblinks': ''
-    }
-    
-    current_section = None
-    for line in response_text.split('\n'):
-        if not line.strip():
-            continue
-            
-        if line.startswith(' '):
-            # Continuation of previous section
-            if current_section == 'NAME':
-                data['name'] += ' ' + line.strip()
-            elif current_section == 'DEFINITION':
-                data['definition'] += ' ' + line.strip()
-            elif current_section == 'EQUATION':
-                data['equation'] += ' ' + line.strip()
-            elif current_section == 'ENZYME':
-                data['enzyme'] += ' ' + line.strip()
-            elif current_section == 'PATHWAY':
-                data['pathways'] += ' ' + line.strip()
-            elif current_section == 'MODULE':
-                data['modules'] += ' ' + line.strip()
-            elif current_section == 'ORTHOLOGY':
-                data['orthology'] += ' ' + line.strip()
-            elif current_section == 'DBLINKS':
-                data['dblinks'] += ' ' + line.strip()
-        else:
-            # New section
-            if ' ' in line:
-                section, content = line.split(' ', 1)
-                current_section = section
-                
-                if section == 'ENTRY':
-                    data['reaction_id'] = content.split()[0]
-                elif section == 'NAME':
-                    data['name'] = content.strip()
-                elif section == 'DEFINITION':
-                    data['definition'] = content.strip()
-                elif section == 'EQUATION':
-                    data['equation'] = content.strip()
-                    # Parse equation into reactants and products
-                    reactants, products = parse_equation(content.strip())
-                    data['reactants'] = reactants
-                    data['products'] = products
-                    data['is_reversible'] = '<=>' in content
-                elif section == 'ENZYME':
-                    data['enzyme'] = content.strip()
-                elif section == 'PATHWAY':
-                    data['pathways'] = content.strip()
-                elif section == 'MODULE':
-                    data['modules'] = content.strip()
-                elif section == 'ORTHOLOGY':
-                    data['orthology'] = content.strip()
-                elif section == 'DBLINKS':
-                    data['dblinks'] = content.strip()
+    if config is None:
+        config = client.config if client is not None else load_config()
     
-    return data
+    # Drop duplicates while keeping the caller's order
+    reaction_ids = list(dict.fromkeys(reaction_ids))
+    
+    # Validate reaction ID format
+    for reaction_id in reaction_ids:
+        if not reaction_id.startswith('R'):
+            raise ValueError(f"Invalid reaction ID format: {reaction_id}. Must start with 'R'.")
+    
+    if client is None:
+        client = get_client(config)
+    
+    failed = []
+    if journal is not None:
+        result = fetch_many(KINDS['reactions'], reaction_ids, client, workers=1, journal=journal)
+        records, missing, failed = result.records, result.missing, result.failed
+    else:
+        # Memoized reactions are served without a request
+        memo = get_memo(config)
+        parsed = {}
+        if memo is not None:
+            for reaction_id in reaction_ids:
+                data = memo.get('rn', reaction_id)
+                if data is not None:
+                    parsed[reaction_id] = data
+        
+        with metrics.timer('kegg_stage_seconds', kind='reaction', stage='fetch'):
+            entries, missing = fetch_entries('rn', [reaction_id for reaction_id in reaction_ids if reaction_id not in parsed], client)
+        
+        # Parse each entry of the combined responses
+        with metrics.timer('kegg_stage_seconds', kind='reaction', stage='parse'):
+            for reaction_id, text in entries.items():
+                parsed[reaction_id] = parse_kegg_response(text)
+                if memo is not None:
+                    memo.set('rn', reaction_id, parsed[reaction_id])
+        records = [parsed[reaction_id] for reaction_id in reaction_ids if reaction_id in parsed]
+    
+    if missing:
+        logger.warning(f"Reactions not found in KEGG: {', '.join(missing)}")
+    
+    if typed:
+        records = [reaction_from_dict(record) for record in records]
+    return FetchResult(records, missing, failed)
 
-def parse_equation(equation: str) -> tuple[List[Dict[str, str]], List[Dict[str, str]]]:
-    """Parse reaction equation into reactants and products.
+def get_reactions_info(
+    reaction_ids: Iterable[str],
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    journal: Optional[str] = None
+) -> 'pd.DataFrame':
+    """Fetch information for several reactions using combined KEGG requests.
+    
+    IDs are grouped into multi-entry ``/get`` calls, so a list of N reactions
+    costs about N / 10 round trips instead of N.
     
     Args:
-        equation: Reaction equation string.
+        reaction_ids: KEGG reaction IDs (e.g., ['R00200', 'R00299']).
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        journal: Optional path of a progress journal. Completed entries are
+            saved in shards as they arrive, so repeating an interrupted call
+            with the same journal only fetches the remaining IDs. Failed
+            requests are then listed in ``df.attrs['failed_ids']`` instead of
+            raising.
         
     Returns:
-        Tuple of (reactants, products) where each is a list of dictionaries
-        containing 'coefficient' and 'compound' keys.
+        DataFrame with one row per reaction found, in input order. IDs that
+        KEGG did not return are listed in ``df.attrs['missing_ids']``.
+        
+    Raises:
+        ValueError: If a reaction ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
     """
-    # Split equation into reactants and products
-    if '<=>' in equation:
-        reactants_str, products_str = equation.split('<=>')
-    elif '=>' in equation:
-        reactants_str, products_str = equation.split('=>')
-    else:
-        raise ValueError(f"Invalid equation format: {equation}")
+    if config is None:
+        config = client.config if client is not None else load_config()
+    
+    records, missing, failed = get_reaction_records(reaction_ids, client=client, config=config, journal=journal)
     
-    # Parse reactants and products
-    reactants = parse_compounds(reactants_str.strip())
-    products = parse_compounds(products_str.strip())
+    # Select fields based on configuration
+    fields = config['reaction']['fields']
+    with metrics.timer('kegg_stage_seconds', kind='reaction', stage='frame'):
+        df = to_frame(records, columns=fields)
+    with metrics.timer('kegg_stage_seconds', kind='reaction', stage='select'):
+        df = df[fields]
+    df.attrs['missing_ids'] = missing
+    df.attrs['failed_ids'] = failed
     
-    return reactants, products
+    return df
 
-def parse_compounds(compounds_str: str) -> List[Dict[str, str]]:
-    """Parse compound string into list of compounds with coefficients.
+def parse_kegg_response(response_text: str) -> Dict[str, Union[str, List[Dict[str, str]], bool]]:
+    """Parse KEGG API response into structured data.
     
     Args:
-        compounds_str: String containing compounds and coefficients.
+        response_text: Raw response text from KEGG API.
         
     Returns:
-        List of dictionaries containing 'coefficient' and 'compound' keys.
+        Dictionary containing parsed reaction information.
     """
-    compounds = []
-    for term in compounds_str.split(' + '):
-        term = term.strip()
-        if not term:
-            continue
-            
-        # Split coefficient and compound
-        parts = term.split(' ', 1)
-        if len(parts) == 1:
-            coefficient = '1'
-            compound = parts[0]
-        else:
-            coefficient, compound = parts
-            
-        compounds.append({
-            'coefficient': coefficient,
-            'compound': compound
-        })
-    
-    return compounds
+    return parse_entry(response_text, REACTION_SCHEMA)
 
 # Example usage
 if __name__ == "__main__":
     # Create data directory if it doesn't exist
+    config = load_config()
     os.makedirs(config['output']['data_dir'], exist_ok=True)
     
     reaction_id = config['reaction']['default_id']
     try:
-        df = get_reaction_info(reaction_id)
+        df = get_reaction_info(reaction_id, config=config)
         print("\nReaction Information DataFrame:")
         print(df)
         
-        # Save to CSV in data directory
-        output_file = os.path.join(
-            config['output']['data_dir'],
-            f"kegg_reaction_{reaction_id}.{config['output']['file_format']}"
-        )
-        df.to_csv(output_file, index=config['output']['index'])
+        # Save to the data directory in the configured format
+        output_file = write_output(df, f"kegg_reaction_{reaction_id}", config)
         print(f"\nData saved to {output_file}")
         logging.info(f"Successfully saved reaction data for {reaction_id}")
     except Exception as e:
@@ -0,0 +1,245 @@
+"""Element counts of KEGG compound formulas and reaction mass balance.
+
+:func:`parse_formulas` turns the ``formula`` strings of many compounds into a
+dense compounds x elements count matrix with one vectorized regex pass.
+Hydrates such as 'C4H4O4.2H2O' are counted part by part, with the leading
+multiplier of each part applied.
+:func:`check_mass_balance` then computes the element imbalance of every
+reaction at once as the product of the sparse stoichiometric matrix and the
+element matrix, so a whole KEGG snapshot is checked in one matrix product.
+
+Generic formulas cannot be counted exactly and are flagged instead:
+
+* ``R`` groups (e.g. 'C5H7O4R') are counted in an 'R' column, so that a
+  reaction moving an R group from one side to the other still balances,
+  and flagged in ``has_r_group``;
+* polymers such as '(C6H10O5)n' are flagged in ``is_polymer`` and their row
+  is NaN, like formulas that are empty or cannot be parsed.
+
+The mass balance check requires the optional ``scipy`` dependency
+(``pip install kegg-data-fetcher[sparse]``).
+"""
+
+import logging
+import re
+from typing import Iterable, NamedTuple, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from kegg.stoichiometry import build_stoichiometric_matrix
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# One element symbol with its optional count; R is KEGG's generic group
+ELEMENT_RE = r'([A-Z][a-z]?)(\d*)'
+# A parenthesised group repeated a symbolic number of times, e.g. '(C6H10O5)n'
+POLYMER_RE = r'\)[a-z]'
+# A parenthesised group repeated a fixed number of times, e.g. '(CH2)2'
+GROUP_RE = re.compile(r'\(([^()]*)\)(\d+)')
+
+class ElementMatrix(NamedTuple):
+    """Element counts of compound formulas with their labels and flags.
+
+    Attributes:
+        counts: Float matrix of shape (compounds, elements). Rows of polymers
+            and of unparsed formulas are NaN.
+        compound_ids: Compound ID of each row.
+        elements: Element symbol of each column, C and H first, then
+            alphabetical ('R' for generic groups).
+        has_r_group: Whether each formula contains an R group.
+        is_polymer: Whether each formula has a symbolic repeat such as 'n'.
+        is_unparsed: Whether each formula is empty or could not be parsed.
+    """
+    counts: np.ndarray
+    compound_ids: np.ndarray
+    elements: np.ndarray
+    has_r_group: np.ndarray
+    is_polymer: np.ndarray
+    is_unparsed: np.ndarray
+
+class MassBalance(NamedTuple):
+    """Element imbalance of reactions, from :func:`check_mass_balance`.
+
+    Attributes:
+        imbalance: Float matrix of shape (reactions, elements): atoms of each
+            element in the products minus those in the reactants. Rows of
+            reactions that cannot be checked are NaN.
+        reaction_ids: Reaction ID of each row.
+        elements: Element symbol of each column.
+        is_balanced: Whether each reaction has no imbalance.
+        is_unknown: Whether the balance of each reaction is unknown because of
+            a polymer, a missing or unparsed formula, or a symbolic
+            coefficient.
+        has_r_group: Whether each reaction involves a compound with an R group.
+    """
+    imbalance: np.ndarray
+    reaction_ids: np.ndarray
+    elements: np.ndarray
+    is_balanced: np.ndarray
+    is_unknown: np.ndarray
+    has_r_group: np.ndarray
+
+    def unbalanced_ids(self) -> np.ndarray:
+        """Return the IDs of the reactions that are known to be unbalanced."""
+        return self.reaction_ids[~self.is_balanced & ~self.is_unknown]
+
+def _element_order(symbols: Iterable[str]) -> list:
+    """Sort element symbols in Hill order: C, H, then alphabetical."""
+    return sorted(symbols, key=lambda symbol: (symbol != 'C', symbol != 'H', symbol))
+
+def _expand_groups(formula: str) -> str:
+    """Write out numerically repeated groups, e.g. '(CH2)2' as 'CH2CH2'."""
+    while True:
+        expanded = GROUP_RE.sub(lambda match: match.group(1) * int(match.group(2)), formula)
+        if expanded == formula:
+            return formula
+        formula = expanded
+
+def parse_formulas(
+    formulas: Sequence[Optional[str]],
+    compound_ids: Optional[Sequence[str]] = None,
+    elements: Optional[Sequence[str]] = None
+) -> ElementMatrix:
+    """Count the atoms of each element in many formulas at once.
+
+    Args:
+        formulas: Formula strings such as 'C6H12O6' (None or '' if unknown).
+        compound_ids: Label of each formula. If None, uses the row numbers.
+        elements: Columns of the result. If None, uses every element found.
+            Elements found but not listed are dropped with a warning.
+
+    Returns:
+        ElementMatrix with the counts and flags.
+    """
+    text = pd.Series(list(formulas), dtype=object).fillna('').astype(str)
+    text = text.str.replace(r'\s', '', regex=True)
+    is_polymer = text.str.contains(POLYMER_RE, regex=True).to_numpy(dtype=bool)
+
+    # Hydrates such as 'C4H4O4.2H2O' are split into parts with a leading multiplier
+    parts = text.str.split('.', regex=False).explode()
+    part_rows = parts.index.to_numpy()
+    split = parts.reset_index(drop=True).str.extract(r'^(\d*)(.*)$')
+    bodies = split[1].fillna('')
+    multipliers = np.ones(len(bodies))
+    numbered = split[0].fillna('').to_numpy(dtype=str)
+    multipliers[numbered != ''] = numbered[numbered != ''].astype(float)
+    grouped = bodies.str.contains('(', regex=False).to_numpy(dtype=bool) & ~is_polymer[part_rows]
+    if grouped.any():
+        bodies[grouped] = [_expand_groups(body) for body in bodies[grouped]]
+
+    # One regex pass over all formula parts: one row per (part, element) token
+    tokens = bodies.str.extractall(ELEMENT_RE)
+    token_parts = tokens.index.get_level_values(0).to_numpy()
+    rows = part_rows[token_parts]
+    symbols = tokens[0].to_numpy(dtype=str)
+    numbers = tokens[1].fillna('').to_numpy(dtype=str)
+    counts = np.ones(len(numbers))
+    explicit = numbers != ''
+    counts[explicit] = numbers[explicit].astype(float)
+    counts *= multipliers[token_parts]
+
+    # A formula is parsed when the tokens of each of its parts cover the part entirely
+    covered = np.bincount(token_parts, weights=np.char.str_len(symbols) + np.char.str_len(numbers),
+                          minlength=len(bodies))
+    body_lengths = bodies.str.len().to_numpy()
+    bad_parts = (body_lengths == 0) | (covered != body_lengths)
+    lengths = text.str.len().to_numpy()
+    is_unparsed = (lengths == 0) | ((np.bincount(part_rows, weights=bad_parts, minlength=len(text)) > 0) & ~is_polymer)
+
+    has_r_group = np.zeros(len(text), dtype=bool)
+    has_r_group[rows[symbols == 'R']] = True
+
+    # Only the tokens of countable formulas make columns
+    countable = ~(is_polymer | is_unparsed)[rows]
+    found = np.unique(symbols[countable])
+    columns = _element_order(found) if elements is None else list(elements)
+    dropped = sorted(set(found) - set(columns))
+    if dropped:
+        logger.warning(f"Ignoring elements outside the requested columns: {', '.join(dropped)}")
+    column_index = {symbol: index for index, symbol in enumerate(columns)}
+    keep = countable & np.isin(symbols, columns)
+    matrix = np.zeros((len(text), len(columns)))
+    np.add.at(matrix, (rows[keep], np.array([column_index[symbol] for symbol in symbols[keep]], dtype=np.int64)),
+              counts[keep])
+
+    matrix[is_polymer | is_unparsed] = np.nan
+    unparsed_count = int((is_unparsed & (lengths > 0)).sum())
+    if unparsed_count:
+        logger.warning(f"{unparsed_count} formulas could not be parsed")
+
+    labels = np.arange(len(text)).astype(str) if compound_ids is None else np.asarray(compound_ids, dtype=str)
+    return ElementMatrix(
+        counts=matrix,
+        compound_ids=labels,
+        elements=np.asarray(columns, dtype=str),
+        has_r_group=has_r_group,
+        is_polymer=is_polymer,
+        is_unparsed=is_unparsed,
+    )
+
+def check_mass_balance(
+    reactions_df: pd.DataFrame,
+    compounds: Union[pd.DataFrame, ElementMatrix],
+    ignore_elements: Iterable[str] = (),
+    tolerance: float = 1e-9
+) -> MassBalance:
+    """Compute the element imbalance of every reaction at once.
+
+    The imbalance is the product of the transposed (sparse) stoichiometric
+    matrix and the element matrix of the compounds. KEGG formulas are those
+    of neutral compounds and some equations leave out protons, so hydrogen
+    can be skipped with ``ignore_elements=('H',)``.
+
+    Args:
+        reactions_df: DataFrame with reaction_id, reactants, products and
+            is_reversible columns, as returned by the fetch functions.
+        compounds: DataFrame with compound_id and formula columns (e.g. from
+            ``get_compounds_info``), or an ElementMatrix.
+        ignore_elements: Elements left out of the check.
+        tolerance: Largest absolute imbalance still counted as balanced.
+
+    Returns:
+        MassBalance with one row per reaction, in input order. Reactions with
+        a compound missing from ``compounds`` are unknown.
+
+    Raises:
+        ImportError: If scipy is not installed.
+    """
+    if not isinstance(compounds, ElementMatrix):
+        compounds = parse_formulas(compounds['formula'].tolist(), compound_ids=compounds['compound_id'].tolist())
+    stoichiometry = build_stoichiometric_matrix(reactions_df, sparse_format='csr')
+    matrix = stoichiometry.matrix.copy()
+    # Compounds cancelling out within a reaction must not bring in NaN rows
+    matrix.eliminate_zeros()
+
+    kept = ~np.isin(compounds.elements, list(ignore_elements))
+    elements = compounds.elements[kept]
+    # Align the element rows with the compounds of the stoichiometric matrix
+    positions = pd.Index(compounds.compound_ids).get_indexer(stoichiometry.compound_ids)
+    known = positions >= 0
+    counts = np.full((len(stoichiometry.compound_ids), len(elements)), np.nan)
+    counts[known] = compounds.counts[positions[known]][:, kept]
+    r_groups = np.zeros(len(stoichiometry.compound_ids), dtype=bool)
+    r_groups[known] = compounds.has_r_group[positions[known]]
+    if not known.all():
+        logger.warning(f"{int((~known).sum())} compounds of the reactions have no formula")
+
+    transposed = matrix.T.tocsr()
+    imbalance = np.asarray(transposed @ counts)
+    is_unknown = np.isnan(imbalance).any(axis=1)
+    # Symbolic coefficients are NaN in the stoichiometric matrix
+    entry_rows = np.repeat(np.arange(transposed.shape[0]), np.diff(transposed.indptr))
+    is_unknown[entry_rows[np.isnan(transposed.data)]] = True
+    imbalance[is_unknown] = np.nan
+    is_balanced = ~is_unknown & (np.abs(np.nan_to_num(imbalance)) <= tolerance).all(axis=1)
+    has_r_group = np.zeros(len(imbalance), dtype=bool)
+    has_r_group[entry_rows[r_groups[transposed.indices] > 0]] = True
+
+    return MassBalance(
+        imbalance=imbalance,
+        reaction_ids=stoichiometry.reaction_ids,
+        elements=elements,
+        is_balanced=is_balanced,
+        is_unknown=is_unknown,
+        has_r_group=has_r_group,
+    )
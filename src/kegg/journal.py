@@ -0,0 +1,156 @@
+"""On-disk progress journal for resumable bulk fetches.
+
+The journal is an append-only JSON-lines file. Each line records either a
+completed output shard (the IDs it covers and where it was written) or a set
+of IDs whose requests failed. Shards are JSON-lines files of the parsed
+records, so reading them back needs neither pandas nor pickle. Lines are written with a single ``write``
+followed by ``fsync``, and shards are written to a temporary file and renamed
+into place before they are journaled, so after a crash the journal only ever
+refers to complete shards. A torn last line is cut off when the journal is
+opened, so that later events start on a line of their own.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Set
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class Journal:
+    """Append-only journal of completed IDs and output shards.
+
+    Args:
+        path: Path to the journal file. It is created if missing. Shards are
+            stored in the ``<path>.shards`` directory next to it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.shard_dir = f"{path}.shards"
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+
+        journal_dir = os.path.dirname(path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        if os.path.exists(path):
+            self._truncate_torn_line()
+            self._events = self._read()
+
+    def _truncate_torn_line(self) -> None:
+        """Cut the file after its last newline, dropping a line torn by a crash."""
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+
+            # Search backwards for the end of the last complete line
+            position = end
+            keep = 0
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline >= 0:
+                    keep = start + newline + 1
+                    break
+                position = start
+            logger.warning(f"Dropping {end - keep} bytes of an incomplete last line of journal {self.path}")
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self) -> List[Dict[str, Any]]:
+        events = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Only the last line can be torn by a crash
+                    logger.warning(f"Ignoring incomplete line {number} of journal {self.path}")
+        return events
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._events.append(event)
+
+    def completed(self, database: str) -> Set[str]:
+        """Return the IDs of a database stored in shards or reported missing by KEGG."""
+        done: Set[str] = set()
+        for event in self._events:
+            if event.get('event') == 'shard' and event.get('database') == database:
+                done.update(event['ids'])
+                done.update(event.get('missing', []))
+        return done
+
+    def failed(self, database: str) -> Set[str]:
+        """Return the IDs of a database that failed and have not completed since."""
+        failed: Set[str] = set()
+        for event in self._events:
+            if event.get('event') == 'failed' and event.get('database') == database:
+                failed.update(event['ids'])
+        return failed - self.completed(database)
+
+    def missing(self, database: str) -> List[str]:
+        """Return the IDs of a database that KEGG did not return."""
+        return [
+            entity_id for event in self._events
+            if event.get('event') == 'shard' and event.get('database') == database
+            for entity_id in event.get('missing', [])
+        ]
+
+    def shards(self, database: str) -> List[str]:
+        """Return the paths of the shards written for a database, in write order."""
+        base = os.path.dirname(self.path)
+        return [
+            os.path.join(base, event['path']) for event in self._events
+            if event.get('event') == 'shard' and event.get('database') == database and event.get('path')
+        ]
+
+    def write_shard(self, database: str, records: List[Dict[str, Any]], ids: List[str], missing: List[str]) -> None:
+        """Write a shard of parsed records and journal its IDs.
+
+        Args:
+            database: KEGG database prefix (e.g., 'rn').
+            records: Parsed records of the shard.
+            ids: IDs whose records are in the shard.
+            missing: IDs KEGG did not return, recorded so they are not retried.
+        """
+        relative = None
+        if records:
+            os.makedirs(self.shard_dir, exist_ok=True)
+            sequence = sum(1 for event in self._events if event.get('event') == 'shard')
+            path = os.path.join(self.shard_dir, f"{database}-{sequence:06d}.jsonl")
+            temporary = f"{path}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+            relative = os.path.relpath(path, os.path.dirname(self.path) or '.')
+
+        self._append({'event': 'shard', 'database': database, 'path': relative, 'ids': ids, 'missing': missing})
+
+    def record_failed(self, database: str, ids: List[str]) -> None:
+        """Journal IDs whose requests failed; they are retried by the next run."""
+        self._append({'event': 'failed', 'database': database, 'ids': ids})
+
+    def load_records(self, database: str) -> List[Dict[str, Any]]:
+        """Read back the records of every shard written for a database."""
+        records: List[Dict[str, Any]] = []
+        for path in self.shards(database):
+            with open(path, 'r', encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f)
+        return records
@@ -0,0 +1,343 @@
+"""Mapping of KEGG reaction and compound IDs to BiGG and MetaNetX.
+
+Cross-references are read from local dumps:
+
+* BiGG ``bigg_models_reactions.txt`` and ``bigg_models_metabolites.txt``,
+  whose ``database_links`` column holds KEGG identifiers.org links.
+* MetaNetX ``reac_xref.tsv`` and ``chem_xref.tsv``, which map source IDs
+  such as ``kegg.reaction:R00200`` (or ``keggR:R00200`` in older releases)
+  to MNX IDs.
+
+The dumps are parsed once into long ``(kegg_id, target_db, target_id)``
+tables with categorical columns, which are pickled so later runs load in a
+fraction of a second. The tables are sorted by KEGG ID, and lookups are
+vectorized binary searches into them, never per-ID Python work.
+"""
+
+import logging
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from kegg.records import term_parts
+from utils.config import load_config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Version of the pickled index layout
+INDEX_VERSION = 2
+
+# Index columns
+XREF_COLUMNS = ['kegg_id', 'target_db', 'target_id']
+
+# MetaNetX source prefixes (current and pre-4.0 releases) by entity kind
+_MNX_KEGG_PREFIXES = {
+    'reaction': ('kegg.reaction', 'keggR'),
+    'compound': ('kegg.compound', 'keggC'),
+}
+_MNX_BIGG_PREFIXES = {
+    'reaction': ('bigg.reaction', 'biggR'),
+    'compound': ('bigg.metabolite', 'biggM'),
+}
+
+# identifiers.org links to KEGG in the BiGG database_links column
+_BIGG_KEGG_LINK = {
+    'reaction': r'kegg\.reaction/(R\d{5})',
+    'compound': r'kegg\.compound/(C\d{5})',
+}
+
+def _empty_xref() -> pd.DataFrame:
+    return pd.DataFrame({column: pd.Series(dtype=str) for column in XREF_COLUMNS})
+
+def read_bigg_xref(path: str, kind: str) -> pd.DataFrame:
+    """Read the KEGG links of a BiGG reactions or metabolites dump.
+
+    Args:
+        path: Path to ``bigg_models_reactions.txt`` or ``bigg_models_metabolites.txt``.
+        kind: 'reaction' or 'compound'.
+
+    Returns:
+        DataFrame with columns kegg_id, target_db ('bigg') and target_id.
+        Metabolites map to their compartment-free universal BiGG ID.
+    """
+    id_column = 'universal_bigg_id' if kind == 'compound' else 'bigg_id'
+    df = pd.read_csv(path, sep='\t', usecols=[id_column, 'database_links'], dtype=str)
+    df = df.dropna(subset=['database_links'])
+
+    links = df['database_links'].str.extractall(_BIGG_KEGG_LINK[kind])
+    xref = pd.DataFrame({
+        'kegg_id': links[0].to_numpy(),
+        'target_db': 'bigg',
+        'target_id': df[id_column].loc[links.index.get_level_values(0)].to_numpy(),
+    })
+    return xref.drop_duplicates(ignore_index=True)
+
+def read_metanetx_xref(path: str, kind: str) -> pd.DataFrame:
+    """Read the KEGG and BiGG links of a MetaNetX ``reac_xref.tsv`` or ``chem_xref.tsv``.
+
+    Args:
+        path: Path to the MetaNetX cross-reference file.
+        kind: 'reaction' or 'compound'.
+
+    Returns:
+        DataFrame with columns kegg_id, target_db ('metanetx' or 'bigg') and
+        target_id. BiGG IDs are obtained by joining on the MNX ID.
+    """
+    df = pd.read_csv(
+        path, sep='\t', comment='#', header=None, usecols=[0, 1],
+        names=['source', 'mnx_id'], dtype=str
+    ).dropna()
+    df = df[df['mnx_id'] != 'EMPTY']
+
+    parts = df['source'].str.split(':', n=1, expand=True)
+    if parts.shape[1] < 2:
+        return _empty_xref()
+    prefix, source_id = parts[0], parts[1]
+
+    kegg = pd.DataFrame({
+        'kegg_id': source_id[prefix.isin(_MNX_KEGG_PREFIXES[kind])],
+        'mnx_id': df['mnx_id'][prefix.isin(_MNX_KEGG_PREFIXES[kind])],
+    })
+    # Pre-4.0 releases prefix BiGG IDs with 'R_' or 'M_'
+    bigg = pd.DataFrame({
+        'target_id': source_id[prefix.isin(_MNX_BIGG_PREFIXES[kind])].str.replace(r'^[RM]_', '', regex=True),
+        'mnx_id': df['mnx_id'][prefix.isin(_MNX_BIGG_PREFIXES[kind])],
+    })
+
+    to_mnx = kegg.rename(columns={'mnx_id': 'target_id'}).assign(target_db='metanetx')
+    to_bigg = kegg.merge(bigg, on='mnx_id')[['kegg_id', 'target_id']].assign(target_db='bigg')
+    xref = pd.concat([to_mnx, to_bigg], ignore_index=True)[XREF_COLUMNS]
+    return xref.drop_duplicates(ignore_index=True)
+
+class XrefIndex:
+    """In-memory cross-reference index from KEGG IDs to BiGG and MetaNetX.
+
+    Args:
+        reactions: Reaction links with columns kegg_id, target_db, target_id.
+        compounds: Compound links with the same columns.
+        sources: Stamps ``(path, mtime_ns, size)`` of the dumps the index was
+            built from, by dump name, used to detect a stale saved index.
+    """
+
+    def __init__(
+        self,
+        reactions: pd.DataFrame,
+        compounds: pd.DataFrame,
+        sources: Optional[Dict[str, Tuple[str, int, int]]] = None
+    ):
+        self.tables = {
+            'reaction': self._compact(reactions),
+            'compound': self._compact(compounds),
+        }
+        self.sources = dict(sources or {})
+        # Column arrays of each table, sorted by KEGG ID, built once for binary searches
+        self._arrays = {
+            kind: tuple(table[column].astype(str).to_numpy() for column in XREF_COLUMNS)
+            for kind, table in self.tables.items()
+        }
+
+    @staticmethod
+    def _compact(xref: pd.DataFrame) -> pd.DataFrame:
+        xref = xref[XREF_COLUMNS].drop_duplicates().sort_values(XREF_COLUMNS, ignore_index=True)
+        return xref.astype('category')
+
+    @classmethod
+    def build(
+        cls,
+        bigg_reactions: Optional[str] = None,
+        bigg_metabolites: Optional[str] = None,
+        mnx_reac_xref: Optional[str] = None,
+        mnx_chem_xref: Optional[str] = None
+    ) -> 'XrefIndex':
+        """Build an index from whichever cross-reference dumps are given.
+
+        Args:
+            bigg_reactions: Path to BiGG ``bigg_models_reactions.txt``.
+            bigg_metabolites: Path to BiGG ``bigg_models_metabolites.txt``.
+            mnx_reac_xref: Path to MetaNetX ``reac_xref.tsv``.
+            mnx_chem_xref: Path to MetaNetX ``chem_xref.tsv``.
+
+        Returns:
+            The built index.
+        """
+        reactions: List[pd.DataFrame] = [_empty_xref()]
+        compounds: List[pd.DataFrame] = [_empty_xref()]
+        if bigg_reactions:
+            reactions.append(read_bigg_xref(bigg_reactions, 'reaction'))
+        if bigg_metabolites:
+            compounds.append(read_bigg_xref(bigg_metabolites, 'compound'))
+        if mnx_reac_xref:
+            reactions.append(read_metanetx_xref(mnx_reac_xref, 'reaction'))
+        if mnx_chem_xref:
+            compounds.append(read_metanetx_xref(mnx_chem_xref, 'compound'))
+        sources = {
+            key: source_stamp(path) for key, path in (
+                ('bigg_reactions', bigg_reactions), ('bigg_metabolites', bigg_metabolites),
+                ('mnx_reac_xref', mnx_reac_xref), ('mnx_chem_xref', mnx_chem_xref),
+            ) if path
+        }
+        return cls(pd.concat(reactions, ignore_index=True), pd.concat(compounds, ignore_index=True), sources)
+
+    def save(self, path: str) -> None:
+        """Persist the index in pickled binary form."""
+        index_dir = os.path.dirname(path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'tables': self.tables, 'sources': self.sources},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'XrefIndex':
+        """Load an index saved with :meth:`save`.
+
+        Raises:
+            ValueError: If the file was written by an incompatible version.
+        """
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Incompatible cross-reference index version in {path}")
+        return cls(data['tables']['reaction'], data['tables']['compound'], data.get('sources'))
+
+    def map_ids(self, kind: str, ids: Iterable[str]) -> pd.DataFrame:
+        """Return every link of the given KEGG IDs.
+
+        Args:
+            kind: 'reaction' or 'compound'.
+            ids: KEGG IDs to map.
+
+        Returns:
+            Long DataFrame with columns kegg_id, target_db and target_id. IDs
+            without links do not appear.
+        """
+        keys, target_dbs, target_ids = self._arrays[kind]
+        wanted = pd.unique(pd.Series(list(ids), dtype=str).to_numpy())
+
+        # Each ID's links are one contiguous run of the sorted table
+        starts = np.searchsorted(keys, wanted, side='left')
+        counts = np.searchsorted(keys, wanted, side='right') - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.repeat(starts, counts) + offsets
+
+        return pd.DataFrame({
+            'kegg_id': keys[rows],
+            'target_db': target_dbs[rows],
+            'target_id': target_ids[rows],
+        })
+
+    def _first_targets(self, kind: str, ids: pd.Series) -> pd.DataFrame:
+        """Return one BiGG and one MetaNetX ID (the lowest) per KEGG ID."""
+        mapped = self.map_ids(kind, ids.dropna())
+        wide = (
+            mapped.groupby(['kegg_id', 'target_db'], sort=False)['target_id'].min()
+            .unstack('target_db')
+            .reindex(columns=['bigg', 'metanetx'])
+            .rename(columns={'bigg': 'bigg_id', 'metanetx': 'metanetx_id'})
+        )
+        wide.columns.name = None
+        return wide
+
+    def map_reactions(self, reactions_df: pd.DataFrame) -> pd.DataFrame:
+        """Add BiGG and MetaNetX IDs to a reaction DataFrame.
+
+        Args:
+            reactions_df: DataFrame with a reaction_id column.
+
+        Returns:
+            Copy of the DataFrame with bigg_id and metanetx_id columns (NaN
+            when unmapped). When several IDs match, the lowest is used; use
+            :meth:`map_ids` to get all of them.
+        """
+        targets = self._first_targets('reaction', reactions_df['reaction_id'])
+        return reactions_df.join(targets, on='reaction_id')
+
+    def map_compounds(self, compounds_df: pd.DataFrame) -> pd.DataFrame:
+        """Add BiGG and MetaNetX IDs to a compound DataFrame.
+
+        Args:
+            compounds_df: DataFrame with a compound_id column.
+
+        Returns:
+            Copy of the DataFrame with bigg_id and metanetx_id columns.
+        """
+        targets = self._first_targets('compound', compounds_df['compound_id'])
+        return compounds_df.join(targets, on='compound_id')
+
+    def map_stoichiometry(self, reactions_df: pd.DataFrame) -> pd.DataFrame:
+        """Map the compounds of every reaction's reactants and products.
+
+        Args:
+            reactions_df: DataFrame with reaction_id, reactants and products
+                columns, holding term dicts or StoichTerm tuples.
+
+        Returns:
+            Long DataFrame with columns reaction_id, side ('reactant' or
+            'product'), coefficient, compound, bigg_id and metanetx_id.
+        """
+        frames = []
+        for column, side in (('reactants', 'reactant'), ('products', 'product')):
+            terms = reactions_df[['reaction_id', column]].explode(column).dropna(subset=[column])
+            parts = [term_parts(term) for term in terms[column]]
+            frames.append(pd.DataFrame({
+                'reaction_id': terms['reaction_id'].to_numpy(),
+                'side': side,
+                'coefficient': [coefficient for coefficient, _ in parts],
+                'compound': [compound for _, compound in parts],
+            }))
+        long = pd.concat(frames, ignore_index=True)
+
+        targets = self._first_targets('compound', long['compound'])
+        return long.join(targets, on='compound')
+
+def source_stamp(path: str) -> Tuple[str, int, int]:
+    """Return the absolute path, modification time (ns) and size of a dump."""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+def load_index(config: Optional[Dict[str, Any]] = None, rebuild: bool = False) -> XrefIndex:
+    """Load the cross-reference index, building it from the dumps if needed.
+
+    The pickled index at ``config['mapping']['index_path']`` is reused unless
+    it is missing, ``rebuild`` is set, or the dumps differ from those it was
+    built from: a dump was added or removed, or its modification time or size
+    changed. Dumps that do not exist are skipped with a warning.
+
+    Args:
+        config: Configuration dictionary. If None, loads ``config.yaml``.
+        rebuild: Whether to rebuild the index even if it is up to date.
+
+    Returns:
+        The cross-reference index.
+    """
+    if config is None:
+        config = load_config()
+    mapping_config = config.get('mapping', {})
+
+    sources = {}
+    for key in ('bigg_reactions', 'bigg_metabolites', 'mnx_reac_xref', 'mnx_chem_xref'):
+        path = mapping_config.get(key)
+        if path and os.path.exists(path):
+            sources[key] = path
+        elif path:
+            logger.warning(f"Cross-reference dump not found, skipping: {path}")
+
+    index_path = mapping_config.get('index_path')
+    if index_path and os.path.exists(index_path) and not rebuild:
+        try:
+            index = XrefIndex.load(index_path)
+        except ValueError as e:
+            logger.info(f"Rebuilding cross-reference index: {e}")
+        else:
+            stamps = {key: source_stamp(path) for key, path in sources.items()}
+            if index.sources == stamps:
+                return index
+            logger.info("Cross-reference dumps changed since the index was built")
+
+    logger.info(f"Building cross-reference index from {', '.join(sources.values()) or 'no dumps'}")
+    index = XrefIndex.build(**sources)
+    if index_path:
+        index.save(index_path)
+    return index
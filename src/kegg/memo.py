@@ -0,0 +1,164 @@
+"""In-process LRU memo of parsed KEGG entries.
+
+The response cache and the mirror keep entry texts, which are parsed again
+on every lookup. Long-running services that look up the same few thousand
+entries can enable this memo (``memo.enabled``) to keep the parsed records in
+memory instead, so that a repeated lookup is a dictionary hit.
+
+Callers never receive the stored objects: dictionaries are returned as
+copies (including their stoichiometry lists), and typed records, which are
+immutable, are returned as is.
+"""
+
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from kegg import metrics
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rough footprint of an entry and of one stoichiometry term, in bytes
+ENTRY_OVERHEAD = 1024
+TERM_OVERHEAD = 256
+
+def copy_record(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a parsed entry that shares nothing mutable with it."""
+    return {key: [dict(term) for term in value] if isinstance(value, list) else value
+            for key, value in data.items()}
+
+def estimate_size(data: Dict[str, Any]) -> int:
+    """Estimate the memory held by a parsed entry, in bytes."""
+    size = ENTRY_OVERHEAD
+    for value in data.values():
+        if isinstance(value, str):
+            size += sys.getsizeof(value)
+        elif isinstance(value, list):
+            size += TERM_OVERHEAD * len(value)
+    return size
+
+class RecordMemo:
+    """Thread-safe LRU memo of parsed entries keyed by database and ID.
+
+    Args:
+        max_entries: Maximum number of entries. None for no limit.
+        max_size_mb: Budget of the estimated entry sizes in megabytes. None
+            for no limit.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10000, max_size_mb: Optional[float] = 64):
+        self.max_entries = max_entries
+        self.max_size = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        # key -> [parsed dictionary, typed record or None, estimated size]
+        self._entries: 'OrderedDict[Tuple[str, str], List[Any]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, database: str, entity_id: str, typed: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Any:
+        """Return a memoized entry.
+
+        Args:
+            database: KEGG database prefix (e.g., 'rn' or 'cpd').
+            entity_id: Entry ID (e.g., 'R00200').
+            typed: Record builder (e.g., ``kegg.records.reaction_from_dict``).
+                If given, the typed record is returned, built once and shared.
+
+        Returns:
+            A copy of the parsed dictionary, the shared typed record, or None
+            on a miss.
+        """
+        key = (database, entity_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                if typed is not None and entry[1] is None:
+                    entry[1] = typed(entry[0])
+                data, record = entry[0], entry[1]
+        if entry is None:
+            metrics.inc('kegg_memo_misses_total')
+            return None
+        metrics.inc('kegg_memo_hits_total')
+        return record if typed is not None else copy_record(data)
+
+    def set(self, database: str, entity_id: str, data: Dict[str, Any]) -> None:
+        """Store a parsed entry, evicting the least recently used ones if over budget.
+
+        The memo keeps its own copy, so ``data`` may be modified afterwards.
+        """
+        key = (database, entity_id)
+        size = estimate_size(data)
+        entry = [copy_record(data), None, size]
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            self._entries[key] = entry
+            self._size += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the memo fits its budget."""
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_size is not None and self._size > self.max_size)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry[2]
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counts, the number of entries and their estimated size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self._size,
+            }
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# One memo per KEGG server and budget, shared by all fetchers
+_memos: Dict[Tuple[Any, ...], RecordMemo] = {}
+_memos_lock = threading.Lock()
+
+def get_memo(config: Dict[str, Any]) -> Optional[RecordMemo]:
+    """Return the memo described by the configuration.
+
+    Args:
+        config: Loaded configuration dictionary.
+
+    Returns:
+        The shared RecordMemo, or None if the memo is disabled.
+    """
+    memo_config = config.get('memo', {})
+    if not memo_config.get('enabled', False):
+        return None
+
+    max_entries = memo_config.get('max_entries', 10000)
+    max_size_mb = memo_config.get('max_size_mb', 64)
+    key = (config['kegg']['base_url'], max_entries, max_size_mb)
+    with _memos_lock:
+        memo = _memos.get(key)
+        if memo is None:
+            memo = RecordMemo(max_entries, max_size_mb)
+            _memos[key] = memo
+    return memo
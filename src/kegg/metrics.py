@@ -0,0 +1,375 @@
+"""Counters and histograms for the fetch pipeline.
+
+Metrics are recorded in a process-wide registry once enabled, with
+:func:`enable` or the ``metrics`` section of the configuration, and exported
+through pluggable sinks: log lines, a JSON file or the Prometheus text
+format. While metrics are disabled (the default), every recording call
+returns after a single check, so the instrumented code pays almost nothing.
+
+Recorded metrics:
+    kegg_requests_total{status}: HTTP requests sent to KEGG, by status.
+    kegg_request_errors_total: Requests that failed without a response.
+    kegg_request_seconds: Request latency.
+    kegg_response_bytes: Size of the response bodies.
+    kegg_retries_total{reason}: Retried attempts, by status code or error type.
+    kegg_coalesced_total: Single-entry fetches served by a concurrent identical call.
+    kegg_cache_hits_total, kegg_cache_misses_total: Response cache lookups.
+    kegg_mirror_hits_total, kegg_mirror_misses_total: Local mirror lookups.
+    kegg_memo_hits_total, kegg_memo_misses_total: Parsed entry memo lookups.
+    kegg_stage_seconds{kind,stage}: Time spent per pipeline stage ('fetch',
+        'parse', 'frame' for the DataFrame construction, 'select' for the
+        field projection and 'write' for the output file of ``kegg2bigg``).
+"""
+
+import abc
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in seconds and in bytes
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = tuple(float(4 ** power) for power in range(4, 14))
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+class Histogram:
+    """Bucketed distribution of observed values.
+
+    Args:
+        buckets: Increasing bucket upper bounds; larger values fall in an
+            implicit ``+Inf`` bucket.
+    """
+
+    def __init__(self, buckets: Iterable[float] = SECONDS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        """Add one value to the distribution."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket.
+
+        Args:
+            q: Quantile between 0 and 1 (e.g., 0.99).
+
+        Returns:
+            The estimate, clamped to the observed range, or NaN if empty.
+        """
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else self.min
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(max(estimate, self.min), self.max)
+            seen += count
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return count, sum, range, mean, p50/p95/p99 and cumulative buckets."""
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5) if self.count else None,
+            'p95': self.quantile(0.95) if self.count else None,
+            'p99': self.quantile(0.99) if self.count else None,
+            'buckets': {_format_bound(bound): count for bound, count in cumulative},
+        }
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms.
+
+    Args:
+        sinks: Objects with an ``emit(registry)`` method, called by
+            :meth:`flush`.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None):
+        self.sinks = list(sinks or [])
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add ``value`` to a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Add a value to a histogram; ``*_bytes`` histograms use byte buckets."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(BYTES_BUCKETS if name.endswith('_bytes') else SECONDS_BUCKETS)
+                self._histograms[key] = histogram
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Return the value of a counter (0 if it was never incremented)."""
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """Return a histogram, or None if nothing was observed."""
+        with self._lock:
+            return self._histograms.get(_key(name, labels))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return all metrics as plain data, keyed like ``name{label="value"}``."""
+        with self._lock:
+            return {
+                'counters': {_format_key(key): value for key, value in sorted(self._counters.items())},
+                'histograms': {_format_key(key): histogram.to_dict()
+                               for key, histogram in sorted(self._histograms.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, histogram.to_dict()) for key, histogram in self._histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{_format_key((name, labels))} {_format_number(value)}")
+        for (name, labels), data in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in data['buckets'].items():
+                lines.append(f"{_format_key((name + '_bucket', labels + (('le', bound),)))} {count}")
+            lines.append(f"{_format_key((name + '_sum', labels))} {_format_number(data['sum'])}")
+            lines.append(f"{_format_key((name + '_count', labels))} {data['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def flush(self) -> None:
+        """Send the current metrics to every sink."""
+        for sink in self.sinks:
+            sink.emit(self)
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    if not labels:
+        return name, ()
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+def _format_key(key: LabelKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{label}="{value}"' for label, value in labels) + '}'
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == math.inf else _format_number(bound)
+
+def _format_number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+class LoggingSink:
+    """Log one line per metric, with p50/p95/p99 for histograms.
+
+    Args:
+        level: Logging level of the lines.
+    """
+
+    def __init__(self, level: int = logging.INFO):
+        self.level = level
+
+    def emit(self, registry: MetricsRegistry) -> None:
+        snapshot = registry.snapshot()
+        for name, value in snapshot['counters'].items():
+            logger.log(self.level, f"{name} = {_format_number(value)}")
+        for name, data in snapshot['histograms'].items():
+            logger.log(
+                self.level,
+                f"{name}: count={data['count']} sum={data['sum']:.4g} p50={data['p50']:.4g} "
+                f"p95={data['p95']:.4g} p99={data['p99']:.4g} max={data['max']:.4g}"
+            )
+
+class _FileSink(abc.ABC):
+    """Sink replacing a file atomically, so readers never see partial output."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abc.abstractmethod
+    def render(self, registry: MetricsRegistry) -> str:
+        """Return the file content for the current state of ``registry``."""
+
+    def emit(self, registry: MetricsRegistry) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(self.render(registry))
+        os.replace(temporary, self.path)
+
+class JsonSink(_FileSink):
+    """Write :meth:`MetricsRegistry.snapshot` to a JSON file.
+
+    Args:
+        path: Output file, replaced on every flush.
+    """
+
+    def render(self, registry: MetricsRegistry) -> str:
+        return json.dumps(registry.snapshot(), indent=2) + '\n'
+
+class PrometheusSink(_FileSink):
+    """Write the Prometheus text format, e.g. for the node exporter's textfile collector.
+
+    Args:
+        path: Output file, replaced on every flush.
+    """
+
+    def render(self, registry: MetricsRegistry) -> str:
+        return registry.to_prometheus()
+
+SINKS = {'logging': LoggingSink, 'json': JsonSink, 'prometheus': PrometheusSink}
+
+# The active registry, or None while metrics are disabled
+_registry: Optional[MetricsRegistry] = None
+
+def enable(sinks: Optional[List[Any]] = None) -> MetricsRegistry:
+    """Start recording metrics in a new process-wide registry and return it."""
+    global _registry
+    _registry = MetricsRegistry(sinks)
+    return _registry
+
+def disable() -> None:
+    """Stop recording metrics."""
+    global _registry
+    _registry = None
+
+def enabled() -> bool:
+    """Return whether metrics are being recorded, to skip costly measurements."""
+    return _registry is not None
+
+def get_registry() -> Optional[MetricsRegistry]:
+    """Return the active registry, or None while metrics are disabled."""
+    return _registry
+
+def configure(config: Dict[str, Any]) -> Optional[MetricsRegistry]:
+    """Enable metrics as described by the ``metrics`` configuration section.
+
+    Args:
+        config: Loaded configuration dictionary.
+
+    Returns:
+        The new registry, or None if metrics are disabled.
+
+    Raises:
+        ValueError: If the sink is unknown.
+    """
+    metrics_config = config.get('metrics', {})
+    if not metrics_config.get('enabled', False):
+        return None
+
+    sink_name = metrics_config.get('sink', 'logging')
+    if sink_name not in SINKS:
+        raise ValueError(f"Unknown metrics sink: {sink_name}. Supported: {', '.join(SINKS)}")
+    if sink_name == 'logging':
+        return enable([LoggingSink()])
+    default_path = 'metrics/kegg_metrics.json' if sink_name == 'json' else 'metrics/kegg_metrics.prom'
+    return enable([SINKS[sink_name](metrics_config.get('path') or default_path)])
+
+def flush() -> None:
+    """Send the active registry's metrics to its sinks, if metrics are enabled."""
+    registry = _registry
+    if registry is not None:
+        registry.flush()
+
+def inc(name: str, value: float = 1, **labels: Any) -> None:
+    """Add ``value`` to a counter of the active registry."""
+    registry = _registry
+    if registry is not None:
+        registry.inc(name, value, **labels)
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    """Add a value to a histogram of the active registry."""
+    registry = _registry
+    if registry is not None:
+        registry.observe(name, value, **labels)
+
+class _Timer:
+    """Context manager observing its elapsed time in a histogram."""
+
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry: MetricsRegistry, name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+class _NullTimer:
+    """Shared no-op timer used while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name: str, **labels: Any) -> Any:
+    """Return a context manager timing its block into a histogram.
+
+    Example:
+        with metrics.timer('kegg_stage_seconds', kind='reaction', stage='parse'):
+            record = parse_entry(text, REACTION_SCHEMA)
+    """
+    registry = _registry
+    if registry is None:
+        return _NULL_TIMER
+    return _Timer(registry, name, labels)
@@ -0,0 +1,298 @@
+"""Incremental local mirror of KEGG reaction and compound entries.
+
+The mirror is a SQLite database holding the raw flat-file text of each entry
+with a content hash. ``sync`` enumerates the IDs of a database with KEGG's
+``/list`` operation, downloads only entries that are new or older than the
+configured age, and records which ones changed. Many jobs can then read the
+same mirror instead of each querying KEGG.
+
+Usage:
+    python -m kegg.mirror sync [--databases rn cpd] [--max-age SECONDS] [--prune]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+import requests
+from kegg import metrics
+from kegg.batch import KEGG_MAX_ENTRIES, chunk_ids, fetch_entries
+from utils.config import load_config
+
+if TYPE_CHECKING:
+    from kegg.client import KeggClient
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Databases that can be mirrored
+MIRROR_DATABASES = ('rn', 'cpd')
+# Pseudo-database of the /link tables stored by kegg.pathway
+LINK_DATABASE = 'link'
+
+class KeggMirror:
+    """SQLite store of raw KEGG entries with content hashes.
+
+    Args:
+        path: Path to the SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        mirror_dir = os.path.dirname(path)
+        if mirror_dir:
+            os.makedirs(mirror_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self._conn:
+            # WAL lets many jobs read while a sync is writing
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "db TEXT NOT NULL, id TEXT NOT NULL, body TEXT NOT NULL, hash TEXT NOT NULL, "
+                "fetched REAL NOT NULL, changed REAL NOT NULL, PRIMARY KEY (db, id))"
+            )
+
+    def get(self, database: str, entity_id: str, max_age: Optional[float] = None) -> Optional[str]:
+        """Return the mirrored text of an entry, or None if it is not stored.
+
+        Args:
+            database: KEGG database prefix (e.g., 'rn').
+            entity_id: Entry ID (e.g., 'R00200').
+            max_age: If given, texts fetched more than this many seconds ago
+                count as not stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched FROM entries WHERE db = ? AND id = ?", (database, entity_id)
+            ).fetchone()
+        if row is not None and max_age is not None and time.time() - row[1] > max_age:
+            row = None
+        if row is None:
+            metrics.inc('kegg_mirror_misses_total')
+            return None
+        metrics.inc('kegg_mirror_hits_total')
+        return row[0]
+
+    def get_many(self, database: str, ids: Iterable[str]) -> Dict[str, str]:
+        """Return the mirrored texts of several entries, keyed by ID."""
+        ids = list(ids)
+        found = {}
+        for chunk in chunk_ids(ids, 500):
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, body FROM entries WHERE db = ? AND id IN ({placeholders})",
+                    [database, *chunk]
+                ).fetchall()
+            found.update(rows)
+        metrics.inc('kegg_mirror_hits_total', len(found))
+        metrics.inc('kegg_mirror_misses_total', len(set(ids)) - len(found))
+        return found
+
+    def fetched_times(self, database: str) -> Dict[str, float]:
+        """Return the time each stored entry of a database was last fetched."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, fetched FROM entries WHERE db = ?", (database,)).fetchall()
+        return dict(rows)
+
+    def store(self, database: str, entries: Dict[str, str]) -> Dict[str, int]:
+        """Insert or refresh entries, detecting changes by content hash.
+
+        Args:
+            database: KEGG database prefix (e.g., 'rn').
+            entries: Mapping of entry ID to raw entry text.
+
+        Returns:
+            Counts of 'added', 'updated' and 'unchanged' entries.
+        """
+        now = time.time()
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+        with self._lock:
+            hashes = dict(self._conn.execute(
+                f"SELECT id, hash FROM entries WHERE db = ? AND id IN ({','.join('?' * len(entries))})",
+                [database, *entries]
+            ).fetchall()) if entries else {}
+
+            with self._conn:
+                for entity_id, body in entries.items():
+                    digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+                    old_digest = hashes.get(entity_id)
+                    if old_digest == digest:
+                        counts['unchanged'] += 1
+                        self._conn.execute(
+                            "UPDATE entries SET fetched = ? WHERE db = ? AND id = ?", (now, database, entity_id)
+                        )
+                        continue
+
+                    counts['added' if old_digest is None else 'updated'] += 1
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries (db, id, body, hash, fetched, changed) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (database, entity_id, body, digest, now, now)
+                    )
+        return counts
+
+    def remove(self, database: str, ids: Iterable[str]) -> int:
+        """Delete entries from the mirror and return how many were removed."""
+        ids = list(ids)
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE db = ? AND id = ?", [(database, entity_id) for entity_id in ids]
+                )
+        return len(ids)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+# One mirror instance per database file, shared by all fetchers
+_mirrors: Dict[str, KeggMirror] = {}
+_mirrors_lock = threading.Lock()
+
+def get_mirror(config: Dict[str, Any]) -> Optional[KeggMirror]:
+    """Return the local mirror described by the configuration.
+
+    Args:
+        config: Loaded configuration dictionary.
+
+    Returns:
+        The shared KeggMirror, or None if the mirror is disabled.
+    """
+    mirror_config = config.get('mirror', {})
+    if not mirror_config.get('enabled', False):
+        return None
+
+    path = mirror_config.get('path', 'mirror/kegg_mirror.sqlite')
+    with _mirrors_lock:
+        mirror = _mirrors.get(path)
+        if mirror is None:
+            mirror = KeggMirror(path)
+            _mirrors[path] = mirror
+    return mirror
+
+def list_ids(database: str, client: 'KeggClient') -> List[str]:
+    """Enumerate the entry IDs of a KEGG database with ``/list``.
+
+    Args:
+        database: KEGG database prefix (e.g., 'rn' or 'cpd').
+        client: KeggClient used for the request.
+
+    Returns:
+        List of entry IDs without database prefix (e.g., 'R00200').
+
+    Raises:
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    response = client.request(client.url(f"list/{database}"))
+    response.raise_for_status()
+
+    ids = []
+    for line in response.text.split('\n'):
+        if not line.strip():
+            continue
+        entity_id = line.split('\t', 1)[0].strip()
+        # Older API versions prefix IDs with the database (e.g., 'rn:R00200')
+        ids.append(entity_id.split(':', 1)[-1])
+    return ids
+
+def sync(
+    database: str,
+    mirror: KeggMirror,
+    client: 'KeggClient',
+    max_age: Optional[float] = None,
+    prune: bool = False
+) -> Dict[str, int]:
+    """Bring the mirror of a KEGG database up to date.
+
+    Entries not yet mirrored are downloaded, and entries fetched more than
+    ``max_age`` seconds ago are downloaded again and compared by hash. Other
+    entries are left alone. Progress is committed every 100 entries, so an
+    interrupted sync resumes close to where it stopped.
+
+    Args:
+        database: KEGG database prefix, 'rn' or 'cpd'.
+        mirror: Mirror to update.
+        client: KeggClient used for the requests.
+        max_age: Age in seconds after which an entry is refreshed. If None,
+            stored entries are never refreshed.
+        prune: Whether to delete entries KEGG no longer lists.
+
+    Returns:
+        Counts of 'listed', 'added', 'updated', 'unchanged', 'missing' and
+        'removed' entries.
+
+    Raises:
+        ValueError: If the database cannot be mirrored.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if database not in MIRROR_DATABASES:
+        raise ValueError(f"Unsupported database: {database}. Must be one of {', '.join(MIRROR_DATABASES)}.")
+
+    listed = list_ids(database, client)
+    stored = mirror.fetched_times(database)
+    now = time.time()
+
+    to_fetch = [
+        entity_id for entity_id in listed
+        if entity_id not in stored or (max_age is not None and now - stored[entity_id] > max_age)
+    ]
+    logger.info(
+        f"Mirror sync {database}: {len(listed)} listed, {len(stored)} stored, {len(to_fetch)} to fetch"
+    )
+
+    counts = {'listed': len(listed), 'added': 0, 'updated': 0, 'unchanged': 0, 'missing': 0, 'removed': 0}
+    for chunk in chunk_ids(to_fetch, KEGG_MAX_ENTRIES * 10):
+        entries, missing = fetch_entries(database, chunk, client, local=False)
+        for key, value in mirror.store(database, entries).items():
+            counts[key] += value
+        counts['missing'] += len(missing)
+
+    if prune:
+        listed_set = set(listed)
+        counts['removed'] = mirror.remove(database, [entity_id for entity_id in stored if entity_id not in listed_set])
+
+    logger.info(f"Mirror sync {database} done: {counts}")
+    return counts
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: ``python -m kegg.mirror sync``."""
+    from kegg.client import KeggClient
+
+    parser = argparse.ArgumentParser(prog='kegg.mirror', description="Maintain a local KEGG mirror.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    sync_parser = subparsers.add_parser('sync', help="Download new and stale entries")
+    sync_parser.add_argument('--config', default='config.yaml', help="Configuration file")
+    sync_parser.add_argument('--databases', nargs='+', default=list(MIRROR_DATABASES),
+                             choices=MIRROR_DATABASES, help="Databases to mirror")
+    sync_parser.add_argument('--max-age', type=float, default=None,
+                             help="Refresh entries older than this many seconds (default: config)")
+    sync_parser.add_argument('--prune', action='store_true', help="Delete entries KEGG no longer lists")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    logging.basicConfig(level=config['logging']['level'], format=config['logging']['format'])
+
+    mirror_config = config.get('mirror', {})
+    mirror = KeggMirror(mirror_config.get('path', 'mirror/kegg_mirror.sqlite'))
+    max_age = args.max_age if args.max_age is not None else mirror_config.get('max_age')
+
+    with KeggClient(config) as client:
+        for database in args.databases:
+            try:
+                counts = sync(database, mirror, client, max_age=max_age, prune=args.prune)
+            except requests.RequestException as e:
+                logger.error(f"Mirror sync of {database} failed: {e}")
+                raise SystemExit(1)
+            print(f"{database}: " + ', '.join(f"{key}={value}" for key, value in counts.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Writing fetched KEGG data to CSV or columnar (Parquet, Arrow/Feather) files.
+
+Columnar formats require the optional ``pyarrow`` dependency
+(``pip install kegg-data-fetcher[parquet]``).
+"""
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from kegg.records import term_parts
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ('csv', 'parquet', 'feather', 'arrow')
+
+# File extensions recognised when no format is given
+_EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'arrow',
+    '.ipc': 'arrow',
+}
+
+# Columns holding reaction stoichiometry, as lists of {'coefficient', 'compound'}
+# dicts or tuples of StoichTerm
+STOICHIOMETRY_COLUMNS = ('reactants', 'products')
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for Parquet and Arrow output. "
+            "Install it with: pip install kegg-data-fetcher[parquet]"
+        )
+    return pyarrow
+
+def stoichiometry_type() -> 'pa.DataType':
+    """Return the Arrow type of a stoichiometry column.
+
+    Returns:
+        ``list<struct<coefficient: string, compound: string>>``.
+    """
+    pa = _require_pyarrow()
+    return pa.list_(pa.struct([
+        pa.field('coefficient', pa.string()),
+        pa.field('compound', pa.string()),
+    ]))
+
+def to_arrow_table(df: 'pd.DataFrame', index: bool = False) -> 'pa.Table':
+    """Convert a reaction or compound DataFrame to an Arrow table.
+
+    Stoichiometry columns are stored as nested ``list<struct>`` values instead
+    of their string representation, so they can be read back without parsing.
+
+    Args:
+        df: DataFrame returned by the fetch functions.
+        index: Whether to keep the DataFrame index as a column.
+
+    Returns:
+        Arrow table with the same columns.
+    """
+    pa = _require_pyarrow()
+
+    table = pa.Table.from_pandas(
+        df.drop(columns=[column for column in STOICHIOMETRY_COLUMNS if column in df.columns]),
+        preserve_index=index
+    )
+    stoich_type = stoichiometry_type()
+    # Insert in column order, so every position before the next one is filled
+    stoich_columns = sorted((column for column in STOICHIOMETRY_COLUMNS if column in df.columns),
+                            key=df.columns.get_loc)
+    for column in stoich_columns:
+        values = [
+            [{'coefficient': str(coefficient), 'compound': compound}
+             for coefficient, compound in map(term_parts, terms)]
+            for terms in df[column]
+        ]
+        array = pa.array(values, type=stoich_type)
+        table = table.add_column(df.columns.get_loc(column), column, array)
+    return table
+
+def infer_format(path: str) -> str:
+    """Infer the output format of a path from its extension.
+
+    Raises:
+        ValueError: If the extension is not recognised.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.gz', '.bz2', '.zip', '.xz', '.zst'):
+        extension = os.path.splitext(path[:-len(extension)])[1].lower()
+    try:
+        return _EXTENSIONS[extension]
+    except KeyError:
+        raise ValueError(f"Cannot infer output format from file name: {path}")
+
+def write_dataframe(
+    df: 'pd.DataFrame',
+    path: str,
+    file_format: Optional[str] = None,
+    compression: Optional[str] = None,
+    index: bool = False
+) -> None:
+    """Write a DataFrame of KEGG data to a file.
+
+    Args:
+        df: DataFrame returned by the fetch functions.
+        path: Output file path.
+        file_format: One of 'csv', 'parquet', 'feather' or 'arrow' (Arrow IPC
+            file, same as Feather V2). If None, inferred from the extension.
+        compression: Codec, e.g. 'snappy' or 'zstd' for Parquet, 'lz4' or
+            'zstd' for Feather/Arrow, 'gzip' for CSV. If None, uses the
+            format's default.
+        index: Whether to write the DataFrame index.
+
+    Raises:
+        ValueError: If the format is not supported.
+        ImportError: If a columnar format is requested without pyarrow.
+    """
+    if file_format is None:
+        file_format = infer_format(path)
+    file_format = file_format.lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise ValueError(
+            f"Unsupported output format: {file_format}. Must be one of {', '.join(SUPPORTED_FORMATS)}."
+        )
+
+    if file_format == 'csv':
+        df.to_csv(path, index=index, compression=compression or 'infer')
+    elif file_format == 'parquet':
+        table = to_arrow_table(df, index)
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression=compression or 'snappy')
+    else:
+        table = to_arrow_table(df, index)
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression=compression)
+
+    logger.info(f"Saved {len(df)} rows to {path} ({file_format})")
+
+def write_output(df: 'pd.DataFrame', name: str, config: Dict[str, Any]) -> str:
+    """Write a DataFrame to the data directory using the output configuration.
+
+    Args:
+        df: DataFrame returned by the fetch functions.
+        name: File name without extension (e.g., 'kegg_reaction_R00200').
+        config: Loaded configuration dictionary.
+
+    Returns:
+        Path of the written file.
+    """
+    output_config = config['output']
+    file_format = output_config['file_format']
+    path = os.path.join(output_config['data_dir'], f"{name}.{file_format}")
+    write_dataframe(
+        df,
+        path,
+        file_format=file_format,
+        compression=output_config.get('compression'),
+        index=output_config.get('index', False)
+    )
+    return path
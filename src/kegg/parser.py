@@ -0,0 +1,381 @@
+"""Table-driven parser for KEGG flat-file entries.
+
+KEGG entries use a fixed layout: the section keyword fills the first 12
+columns and the content starts at column 13. Continuation lines leave the
+keyword columns blank. A line starting with ``///`` terminates an entry.
+
+The parser reads each line once, slices the keyword columns instead of
+splitting, and collects the lines of every section in a list that is joined
+once at the end of the entry. Which sections are kept, and under which
+field name, is described by an :class:`EntrySchema`.
+"""
+
+import gzip
+import io
+import os
+from contextlib import ExitStack
+from typing import IO, Any, Callable, Container, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from kegg.equations import parse_equation
+from kegg.records import RECORD_BUILDERS
+
+# Width of the keyword columns in KEGG flat files
+KEYWORD_WIDTH = 12
+
+# First bytes of a gzip stream
+GZIP_MAGIC = b'\x1f\x8b'
+
+class EntrySchema(NamedTuple):
+    """Mapping of KEGG sections to the fields of a parsed record.
+
+    Attributes:
+        kind: Entity kind, e.g. 'reaction' or 'compound'.
+        id_field: Field receiving the first token of the ENTRY line.
+        sections: Mapping of section keyword to field name.
+        fields: All fields of a parsed record, in output order, with their
+            default values.
+        finalize: Optional function deriving extra fields from a record.
+    """
+    kind: str
+    id_field: str
+    sections: Dict[str, str]
+    fields: Dict[str, Any]
+    finalize: Optional[Callable[[Dict[str, Any]], None]] = None
+
+def _finalize_reaction(record: Dict[str, Any]) -> None:
+    """Derive reactants, products and reversibility from the equation."""
+    equation = record['equation']
+    if equation:
+        record['reactants'], record['products'] = parse_equation(equation)
+        record['is_reversible'] = '<=>' in equation
+
+REACTION_SCHEMA = EntrySchema(
+    kind='reaction',
+    id_field='reaction_id',
+    sections={
+        'NAME': 'name',
+        'DEFINITION': 'definition',
+        'EQUATION': 'equation',
+        'ENZYME': 'enzyme',
+        'PATHWAY': 'pathways',
+        'MODULE': 'modules',
+        'ORTHOLOGY': 'orthology',
+        'DBLINKS': 'dblinks',
+    },
+    fields={
+        'reaction_id': '',
+        'name': '',
+        'definition': '',
+        'equation': '',
+        'reactants': [],
+        'products': [],
+        'is_reversible': False,
+        'enzyme': '',
+        'pathways': '',
+        'modules': '',
+        'orthology': '',
+        'dblinks': '',
+    },
+    finalize=_finalize_reaction,
+)
+
+COMPOUND_SCHEMA = EntrySchema(
+    kind='compound',
+    id_field='compound_id',
+    sections={
+        'NAME': 'name',
+        'FORMULA': 'formula',
+        'EXACT_MASS': 'exact_mass',
+        'MOL_WEIGHT': 'molecular_weight',
+        'REACTION': 'reactions',
+        'ENZYME': 'enzymes',
+        'PATHWAY': 'pathways',
+        'MODULE': 'modules',
+        'DBLINKS': 'dblinks',
+    },
+    fields={
+        'compound_id': '',
+        'name': '',
+        'formula': '',
+        'exact_mass': '',
+        'molecular_weight': '',
+        'reactions': '',
+        'enzymes': '',
+        'pathways': '',
+        'modules': '',
+        'dblinks': '',
+    },
+)
+
+SCHEMAS: Dict[str, EntrySchema] = {
+    REACTION_SCHEMA.kind: REACTION_SCHEMA,
+    COMPOUND_SCHEMA.kind: COMPOUND_SCHEMA,
+}
+
+def get_schema(kind: str) -> EntrySchema:
+    """Return the schema of an entity kind ('reaction' or 'compound').
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    try:
+        return SCHEMAS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown entry kind: {kind}. Must be one of {', '.join(SCHEMAS)}.")
+
+def _split_keyword(line: str) -> Tuple[str, str]:
+    """Split a keyword line into (keyword, content) using the fixed layout."""
+    keyword = line[:KEYWORD_WIDTH].rstrip()
+    if ' ' in keyword or (len(line) > KEYWORD_WIDTH and line[KEYWORD_WIDTH - 1] != ' '):
+        # Keyword does not fit the fixed columns; fall back to whitespace
+        parts = line.split(None, 1)
+        return parts[0], parts[1] if len(parts) > 1 else ''
+    return keyword, line[KEYWORD_WIDTH:]
+
+def _group_sections(
+    lines: Iterable[str],
+    wanted: Optional[Container[str]] = None
+) -> Iterator[Dict[str, List[List[str]]]]:
+    """Group the lines of KEGG entries by section, skipping unwanted sections."""
+    sections: Dict[str, List[List[str]]] = {}
+    current: Optional[List[str]] = None
+    started = False
+
+    for line in lines:
+        if not line:
+            continue
+        first = line[0]
+
+        if first == ' ' or first == '\t':
+            if current is not None:
+                value = line.strip()
+                if value:
+                    current.append(value)
+            continue
+
+        if first == '/' and line.startswith('///'):
+            if started:
+                yield sections
+            sections = {}
+            current = None
+            started = False
+            continue
+
+        if first == '\n' or first == '\r':
+            continue
+
+        started = True
+        keyword, content = _split_keyword(line.rstrip())
+        if wanted is not None and keyword not in wanted:
+            current = None
+            continue
+
+        content = content.strip()
+        current = [content] if content else []
+        sections.setdefault(keyword, []).append(current)
+
+    # Tolerate a missing terminator after the last entry
+    if started:
+        yield sections
+
+def iter_sections(
+    lines: Iterable[str],
+    wanted: Optional[Container[str]] = None
+) -> Iterator[Dict[str, List[List[str]]]]:
+    """Group the lines of KEGG entries by section.
+
+    Args:
+        lines: Lines of one or more KEGG entries, with or without newlines.
+        wanted: Section keywords to keep. If None, keeps every section;
+            otherwise the lines of other sections are skipped unstored.
+
+    Yields:
+        One dictionary per entry, mapping each section keyword to a list with
+        one item per occurrence of the section, each item holding the
+        stripped, non-empty lines of that occurrence.
+    """
+    return _group_sections(lines, wanted)
+
+def _build_record(
+    parts: Dict[str, List[str]],
+    entry_id: Optional[str],
+    schema: EntrySchema,
+    list_fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Build a record of a schema from the collected section lines."""
+    if list_fields is None:
+        list_fields = [field for field, default in schema.fields.items() if isinstance(default, list)]
+
+    record = dict(schema.fields)
+    for field in list_fields:
+        # Mutable defaults must not be shared between records
+        record[field] = []
+
+    if entry_id is not None:
+        record[schema.id_field] = entry_id
+    for field, values in parts.items():
+        record[field] = ' '.join(values)
+
+    if schema.finalize is not None:
+        schema.finalize(record)
+    return record
+
+def iter_records(lines: Iterable[str], schema: EntrySchema) -> Iterator[Dict[str, Any]]:
+    """Parse KEGG entries one at a time.
+
+    Args:
+        lines: Lines of one or more KEGG entries, with or without newlines.
+        schema: Schema of the entries.
+
+    Yields:
+        One parsed record per entry.
+    """
+    sections = schema.sections
+    list_fields = [field for field, default in schema.fields.items() if isinstance(default, list)]
+
+    parts: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    entry_id = None
+    started = False
+
+    for line in lines:
+        if not line:
+            continue
+        first = line[0]
+
+        if first == ' ' or first == '\t':
+            if current is not None:
+                value = line.strip()
+                if value:
+                    current.append(value)
+            continue
+
+        if first == '/' and line.startswith('///'):
+            if started:
+                yield _build_record(parts, entry_id, schema, list_fields)
+            parts = {}
+            current = None
+            entry_id = None
+            started = False
+            continue
+
+        if first == '\n' or first == '\r':
+            continue
+
+        started = True
+        keyword = line[:KEYWORD_WIDTH].rstrip()
+        field = sections.get(keyword)
+        if field is None and keyword != 'ENTRY':
+            if ' ' not in keyword and (len(line) <= KEYWORD_WIDTH or line[KEYWORD_WIDTH - 1] == ' '):
+                # Section not in the schema
+                current = None
+                continue
+            keyword, content = _split_keyword(line.rstrip())
+            field = sections.get(keyword)
+            if field is None and keyword != 'ENTRY':
+                current = None
+                continue
+        else:
+            content = line[KEYWORD_WIDTH:]
+
+        content = content.strip()
+        if field is None:
+            entry_id = content.split(None, 1)[0] if content else None
+            current = None
+        else:
+            # A repeated section keeps its last occurrence
+            current = parts[field] = [content] if content else []
+
+    # Tolerate a missing terminator after the last entry
+    if started:
+        yield _build_record(parts, entry_id, schema, list_fields)
+
+def parse_entry(response_text: str, schema: EntrySchema, typed: bool = False) -> Any:
+    """Parse a single KEGG entry into a record.
+
+    Args:
+        response_text: Raw response text from KEGG API.
+        schema: Schema of the entry.
+        typed: Whether to return a typed record (:class:`kegg.records.Reaction`
+            or :class:`kegg.records.Compound`) instead of a dictionary.
+
+    Returns:
+        Dictionary (or typed record) containing the parsed fields. All fields
+        keep their default values if the text holds no entry.
+    """
+    record = next(iter_records(response_text.split('\n'), schema), None)
+    if record is None:
+        record = _build_record({}, None, schema)
+    return RECORD_BUILDERS[schema.kind](record) if typed else record
+
+def parse_entries(response_text: str, schema: EntrySchema, typed: bool = False) -> List[Any]:
+    """Parse a multi-entry KEGG response in a single pass.
+
+    Args:
+        response_text: Raw response text holding ``///``-terminated entries.
+        schema: Schema of the entries.
+        typed: Whether to return typed records instead of dictionaries.
+
+    Returns:
+        List of parsed records, in response order.
+    """
+    records = iter_records(response_text.split('\n'), schema)
+    if typed:
+        return list(map(RECORD_BUILDERS[schema.kind], records))
+    return list(records)
+
+def _open_text(source: Union[str, 'os.PathLike[str]', IO], stack: ExitStack) -> Iterable[str]:
+    """Open a path or file object as lines of text, decompressing gzip input."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            magic = f.read(2)
+        if magic == GZIP_MAGIC:
+            return stack.enter_context(gzip.open(source, 'rt', encoding='utf-8'))
+        return stack.enter_context(open(source, 'r', encoding='utf-8'))
+
+    if isinstance(source, io.TextIOBase):
+        return source
+
+    # Binary file object: peek at the first bytes without consuming them.
+    # Wrappers are detached afterwards so that the caller's object stays open.
+    buffered = source
+    if not hasattr(source, 'peek'):
+        buffered = io.BufferedReader(source)
+        stack.callback(buffered.detach)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        buffered = stack.enter_context(gzip.GzipFile(fileobj=buffered, mode='rb'))
+    text = io.TextIOWrapper(buffered, encoding='utf-8')
+    stack.callback(text.detach)
+    return text
+
+def iter_kegg_entries(
+    source: Union[str, 'os.PathLike[str]', IO],
+    kind: str = 'reaction',
+    typed: bool = False
+) -> Iterator[Any]:
+    """Stream parsed records from a KEGG flat-file dump.
+
+    The file is read line by line and each ``///``-terminated entry is parsed
+    as soon as it is complete, so memory use does not grow with the size of
+    the dump. Gzip-compressed input is detected and decompressed on the fly.
+
+    Args:
+        source: Path to a dump (e.g. KEGG's ``reaction`` or ``compound``
+            file, optionally gzipped) or an open text or binary file object.
+            File objects are not closed.
+        kind: Kind of the entries, 'reaction' or 'compound'.
+        typed: Whether to yield compact typed records
+            (:class:`kegg.records.Reaction` or :class:`kegg.records.Compound`)
+            instead of dictionaries. Recommended for whole-database runs.
+
+    Yields:
+        One parsed record per entry, with the fields of the kind's schema.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    schema = get_schema(kind)
+    with ExitStack() as stack:
+        records = iter_records(_open_text(source, stack), schema)
+        if typed:
+            records = map(RECORD_BUILDERS[kind], records)
+        yield from records
@@ -0,0 +1,190 @@
+"""Fetching the reactions of KEGG pathways and modules.
+
+The member reactions of a pathway map (e.g. 'rn00010') or a module (e.g.
+'M00001') are resolved with one ``/link/rn/...`` request each, and the
+reactions of all requested pathways are then fetched together with combined
+``/get`` requests, so a whole pathway costs a handful of round trips. Link
+tables are stored in the local mirror when it is enabled (and refreshed after
+``mirror.max_age``), and otherwise go through the client's response cache like
+other responses; with neither enabled, each call sends its ``/link`` request.
+"""
+
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Union
+import requests
+from kegg.client import KeggClient, get_client
+from kegg.fetch_reaction import get_reaction_records
+from kegg.mirror import LINK_DATABASE
+from kegg.records import to_frame
+from utils.config import load_config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+PATHWAY_ID_RE = re.compile(r'^(?:path:)?[a-z]{2,4}\d{5}$')
+MODULE_ID_RE = re.compile(r'^(?:md:)?M\d{5}$')
+
+def linked_reaction_ids(source: str, client: KeggClient) -> List[str]:
+    """Return the reactions KEGG links to an entry, with one ``/link`` request.
+
+    The link table is read from and stored in the client's mirror, if any.
+
+    Args:
+        source: Prefixed KEGG ID, e.g. 'path:rn00010' or 'md:M00001'.
+        client: Client used for the request.
+
+    Returns:
+        Reaction IDs without prefix, in KEGG's order. Empty if KEGG knows no
+        links for the entry.
+
+    Raises:
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    mirror = client.mirror
+    text = None
+    if mirror is not None:
+        text = mirror.get(LINK_DATABASE, source, max_age=client.config.get('mirror', {}).get('max_age'))
+    if text is None:
+        try:
+            text = client.get_text(client.url(f"link/rn/{source}"))
+        except requests.HTTPError as e:
+            # KEGG answers 404 when there is nothing to link
+            if e.response is None or e.response.status_code != 404:
+                raise
+            text = ''
+        if mirror is not None:
+            mirror.store(LINK_DATABASE, {source: text})
+
+    reaction_ids = []
+    for line in text.split('\n'):
+        parts = line.split('\t')
+        if len(parts) == 2 and parts[1].startswith('rn:'):
+            reaction_ids.append(parts[1][3:].strip())
+    return list(dict.fromkeys(reaction_ids))
+
+def pathway_reaction_ids(pathway_id: str, client: Optional[KeggClient] = None) -> List[str]:
+    """Return the reaction IDs of a pathway map such as 'rn00010' or 'map00010'.
+
+    Raises:
+        ValueError: If the pathway ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if not PATHWAY_ID_RE.match(pathway_id):
+        raise ValueError(f"Invalid pathway ID format: {pathway_id}. Expected e.g. 'rn00010' or 'map00010'.")
+    client = client if client is not None else get_client()
+    return linked_reaction_ids(pathway_id if ':' in pathway_id else f"path:{pathway_id}", client)
+
+def module_reaction_ids(module_id: str, client: Optional[KeggClient] = None) -> List[str]:
+    """Return the reaction IDs of a module such as 'M00001'.
+
+    Raises:
+        ValueError: If the module ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    if not MODULE_ID_RE.match(module_id):
+        raise ValueError(f"Invalid module ID format: {module_id}. Expected e.g. 'M00001'.")
+    client = client if client is not None else get_client()
+    return linked_reaction_ids(module_id if ':' in module_id else f"md:{module_id}", client)
+
+def get_pathway_reactions(
+    pathway_ids: Union[str, Iterable[str]],
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    combine: bool = True
+) -> Union['pd.DataFrame', Dict[str, 'pd.DataFrame']]:
+    """Fetch the reactions of one or more pathway maps.
+
+    Args:
+        pathway_ids: Pathway ID (e.g., 'rn00010') or several IDs.
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        combine: Whether to return one DataFrame with a leading ``pathway``
+            column, or a dictionary of one DataFrame per pathway.
+
+    Returns:
+        Reactions with the configured fields, in KEGG's link order. A reaction
+        in several pathways is fetched once but appears in each of them. IDs
+        that KEGG did not return are listed in ``df.attrs['missing_ids']``.
+
+    Raises:
+        ValueError: If a pathway ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    return _get_linked_reactions('pathway', pathway_reaction_ids, pathway_ids, client, config, combine)
+
+def get_module_reactions(
+    module_ids: Union[str, Iterable[str]],
+    client: Optional[KeggClient] = None,
+    config: Optional[Dict[str, Any]] = None,
+    combine: bool = True
+) -> Union['pd.DataFrame', Dict[str, 'pd.DataFrame']]:
+    """Fetch the reactions of one or more KEGG modules.
+
+    Args:
+        module_ids: Module ID (e.g., 'M00001') or several IDs.
+        client: Client used for the requests. If None, uses the shared client.
+        config: Configuration dictionary. If None, uses the client's configuration
+            or the cached ``config.yaml``.
+        combine: Whether to return one DataFrame with a leading ``module``
+            column, or a dictionary of one DataFrame per module.
+
+    Returns:
+        Same as :func:`get_pathway_reactions`, per module.
+
+    Raises:
+        ValueError: If a module ID is invalid.
+        requests.RequestException: If there's an error fetching data from KEGG.
+    """
+    return _get_linked_reactions('module', module_reaction_ids, module_ids, client, config, combine)
+
+def _get_linked_reactions(
+    column: str,
+    resolve: Callable[[str, KeggClient], List[str]],
+    source_ids: Union[str, Iterable[str]],
+    client: Optional[KeggClient],
+    config: Optional[Dict[str, Any]],
+    combine: bool
+) -> Union['pd.DataFrame', Dict[str, 'pd.DataFrame']]:
+    if config is None:
+        config = client.config if client is not None else load_config()
+    if client is None:
+        client = get_client(config)
+    source_ids = [source_ids] if isinstance(source_ids, str) else list(dict.fromkeys(source_ids))
+
+    members = {source_id: resolve(source_id, client) for source_id in source_ids}
+    for source_id, reaction_ids in members.items():
+        if not reaction_ids:
+            logger.warning(f"No reactions linked to {column} {source_id}")
+
+    # Reactions shared by several pathways are fetched once
+    all_ids = list(dict.fromkeys(reaction_id for reaction_ids in members.values() for reaction_id in reaction_ids))
+    result = get_reaction_records(all_ids, client=client, config=config)
+    records = {record['reaction_id']: record for record in result.records}
+    missing = set(result.missing)
+
+    fields = config['reaction']['fields']
+    frames = {}
+    for source_id, reaction_ids in members.items():
+        df = to_frame([records[reaction_id] for reaction_id in reaction_ids if reaction_id in records],
+                      columns=fields)[fields]
+        df.attrs['missing_ids'] = [reaction_id for reaction_id in reaction_ids if reaction_id in missing]
+        frames[source_id] = df
+    if not combine:
+        return frames
+
+    if not frames:
+        return to_frame([], columns=[column] + fields)
+
+    import pandas as pd
+
+    combined = pd.concat(
+        [df.assign(**{column: source_id})[[column] + fields] for source_id, df in frames.items()],
+        ignore_index=True
+    )
+    combined.attrs['missing_ids'] = list(result.missing)
+    return combined
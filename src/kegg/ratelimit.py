@@ -0,0 +1,469 @@
+"""Client-side rate limiting and retries for KEGG requests.
+
+KEGG answers 403 (and occasionally 429 or 5xx) when a client sends requests
+too fast, and a long bulk job must ride through these instead of failing.
+Every request sent by :class:`kegg.client.KeggClient` and :mod:`kegg.aio`
+goes through a :class:`RateLimiter` shared by all threads and tasks using the
+same KEGG settings. It combines:
+
+* a token bucket capping the request rate (``kegg.rate_limit``);
+* an AIMD concurrency window: the number of requests in flight grows by one
+  per window of successful requests and is halved when KEGG throttles, so
+  jobs settle near the highest concurrency KEGG tolerates without tuning;
+* jittered exponential retries of throttled, failed and timed out requests,
+  honouring ``Retry-After``, within a retry budget per time window.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Type, TypeVar
+from kegg import metrics
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Statuses KEGG uses to signal overload; other 4xx answers are final
+RETRY_STATUSES = frozenset({403, 429, 500, 502, 503, 504})
+
+T = TypeVar('T')
+ResponseInfo = Callable[[Any], Tuple[int, Optional[str]]]
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens are reserved rather than taken, so each caller learns how long to
+    wait and sleeps without holding the lock, with ``time.sleep`` in threads
+    or ``asyncio.sleep`` in tasks.
+
+    Args:
+        rate: Tokens added per second.
+        burst: Maximum number of tokens, i.e. requests that may be sent at
+            once after an idle period.
+        clock: Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}. Must be positive.")
+        if burst < 1:
+            raise ValueError(f"Invalid burst: {burst}. Must be at least 1.")
+        self.rate = float(rate)
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, possibly ahead of time.
+
+        Returns:
+            Seconds to wait before the reserved token is available.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Wait without blocking the event loop until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class AdaptiveConcurrency:
+    """Concurrency window adjusted by additive increase, multiplicative decrease.
+
+    Each success widens the window by ``1 / limit``, i.e. by one request per
+    full window of successes; a throttling signal shrinks it by
+    ``decrease_factor``, at most once per ``decrease_interval`` so that a
+    burst of failures from the same overload counts once.
+
+    Args:
+        min_limit: Smallest window.
+        max_limit: Largest window.
+        initial: Starting window. If None, starts at ``min_limit`` and ramps up.
+        decrease_factor: Factor applied to the window on throttling.
+        decrease_interval: Minimum seconds between two decreases.
+        clock: Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 10,
+        initial: Optional[int] = None,
+        decrease_factor: float = 0.5,
+        decrease_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(f"Invalid concurrency range: {min_limit}..{max_limit}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.clock = clock
+        self._limit = float(min(max(initial or min_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = -float('inf')
+        self._condition = threading.Condition()
+        # Futures of waiting async tasks, with their event loops
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, 'asyncio.Future[None]']] = []
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        """Take a slot if the window allows it, without waiting."""
+        with self._condition:
+            if self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        """Block the calling thread until a slot is free and take it."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    async def aacquire(self) -> None:
+        """Wait without blocking the event loop until a slot is free and take it.
+
+        The window is shared with threads and possibly several event loops,
+        so each waiting task parks on a future of its own loop, which
+        :meth:`release` resolves thread-safely.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def _wake_async_waiters(self) -> None:
+        """Resolve the futures of waiting tasks; call with the condition held."""
+        for loop, waiter in self._async_waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+        self._async_waiters.clear()
+
+    def release(self, throttled: Optional[bool] = None) -> None:
+        """Give a slot back and adjust the window.
+
+        Args:
+            throttled: True if the request was throttled or failed, False if
+                it succeeded, None to leave the window unchanged.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if throttled is False:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            elif throttled:
+                now = self.clock()
+                if now - self._last_decrease >= self.decrease_interval:
+                    self._last_decrease = now
+                    limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    if int(limit) < int(self._limit):
+                        logger.info(f"KEGG is throttling, reducing concurrency to {int(limit)}")
+                    self._limit = limit
+            self._condition.notify_all()
+            self._wake_async_waiters()
+
+def _resolve(waiter: 'asyncio.Future[None]') -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+class RetryBudget:
+    """Thread-safe number of retries allowed in a sliding time window.
+
+    The budget stops a job or a long-running service from hammering KEGG
+    while it is down: once the retries of the last ``window`` seconds reach
+    ``total``, failures are reported immediately, and retrying resumes as
+    older retries leave the window.
+
+    Args:
+        total: Retries allowed per window. None for no limit.
+        window: Length of the window in seconds. None counts every retry
+            until :meth:`reset`.
+        clock: Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(self, total: Optional[int] = None, window: Optional[float] = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.window = window
+        self.clock = clock
+        self._spent: Deque[float] = deque()
+        self._exhausted = False
+        self._lock = threading.Lock()
+
+    def _expire(self) -> None:
+        if self.window is not None:
+            horizon = self.clock() - self.window
+            while self._spent and self._spent[0] <= horizon:
+                self._spent.popleft()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Retries left in the current window, or None if unlimited."""
+        if self.total is None:
+            return None
+        with self._lock:
+            self._expire()
+            return max(0, self.total - len(self._spent))
+
+    def spend(self) -> bool:
+        """Take one retry from the budget.
+
+        Returns:
+            False if the budget of the current window is exhausted.
+        """
+        if self.total is None:
+            return True
+        with self._lock:
+            self._expire()
+            if len(self._spent) >= self.total:
+                if not self._exhausted:
+                    self._exhausted = True
+                    logger.warning(f"Retry budget of {self.total} exhausted; failures are not retried for now")
+                return False
+            self._exhausted = False
+            self._spent.append(self.clock())
+            return True
+
+    def reset(self) -> None:
+        """Restore the full budget, e.g. at the start of a run."""
+        with self._lock:
+            self._spent.clear()
+            self._exhausted = False
+
+class RateLimiter:
+    """Rate limit, concurrency window and retries applied to each request.
+
+    Args:
+        rate: Maximum requests per second, or None for no rate limit.
+        burst: Requests that may be sent at once after an idle period.
+        min_concurrency: Smallest concurrency window.
+        max_concurrency: Largest concurrency window.
+        max_retries: Retries of one request.
+        backoff: Base delay of the exponential backoff, in seconds.
+        backoff_max: Largest delay between two attempts, in seconds.
+        retry_budget: Retries allowed per ``retry_budget_window``, or None for
+            no limit.
+        retry_budget_window: Length of the retry budget window in seconds.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 3.0,
+        burst: int = 3,
+        min_concurrency: int = 1,
+        max_concurrency: int = 3,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_budget: Optional[int] = None,
+        retry_budget_window: Optional[float] = 60.0
+    ):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = AdaptiveConcurrency(min_concurrency, max_concurrency,
+                                               initial=max(min_concurrency, max_concurrency // 2))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.budget = RetryBudget(retry_budget, retry_budget_window)
+        self._warned: Set[int] = set()
+        self._warned_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RateLimiter':
+        """Create a limiter from the ``kegg`` section of a configuration."""
+        kegg_config = config['kegg']
+        return cls(
+            rate=kegg_config.get('rate_limit', 3.0),
+            burst=kegg_config.get('burst', 3),
+            min_concurrency=kegg_config.get('min_concurrency', 1),
+            max_concurrency=kegg_config.get('max_concurrency', kegg_config.get('pool_size', 3)),
+            max_retries=kegg_config.get('max_retries', 5),
+            backoff=kegg_config.get('retry_backoff', 0.5),
+            backoff_max=kegg_config.get('retry_backoff_max', 30.0),
+            retry_budget=kegg_config.get('retry_budget'),
+            retry_budget_window=kegg_config.get('retry_budget_window', 60.0)
+        )
+
+    def check_parallelism(self, workers: int) -> None:
+        """Warn once if callers ask for more parallel requests than the window allows.
+
+        Worker threads and task concurrency beyond ``max_concurrency`` only
+        wait for a slot, so they do not speed up a fetch.
+
+        Args:
+            workers: Number of worker threads or concurrent tasks requested.
+        """
+        max_limit = self.concurrency.max_limit
+        with self._warned_lock:
+            if workers <= max_limit or workers in self._warned:
+                return
+            self._warned.add(workers)
+        logger.warning(
+            f"{workers} workers requested but at most {max_limit} requests are sent at once; "
+            f"raise kegg.max_concurrency to allow more"
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Return the wait before retry number ``attempt`` (from 0).
+
+        Uses "full jitter": a uniform delay up to the exponential backoff, so
+        clients throttled together do not retry together. A ``Retry-After``
+        header in seconds takes precedence, capped at ``backoff_max``.
+        """
+        if retry_after is not None:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _classify(self, result: Any, error: Optional[BaseException],
+                  response_info: ResponseInfo) -> Tuple[Optional[str], Optional[str]]:
+        """Return the retry reason of an attempt (None on success) and its Retry-After."""
+        if error is not None:
+            return type(error).__name__, None
+        status, retry_after = response_info(result)
+        if status in RETRY_STATUSES:
+            return str(status), retry_after
+        return None, None
+
+    def _should_retry(self, attempt: int, reason: str, description: str) -> bool:
+        if attempt >= self.max_retries or not self.budget.spend():
+            logger.error(f"Giving up on {description} after {attempt + 1} attempts ({reason})")
+            return False
+        metrics.inc('kegg_retries_total', reason=reason)
+        return True
+
+    def call(self, send: Callable[[], T], retry_errors: Tuple[Type[BaseException], ...],
+             response_info: ResponseInfo, description: str = 'request') -> T:
+        """Send a request from a thread, retrying throttled and failed attempts.
+
+        Args:
+            send: Function sending one attempt and returning its response.
+            retry_errors: Exceptions of ``send`` that are retried (connection
+                errors and timeouts).
+            response_info: Function returning the status code and the
+                ``Retry-After`` header (or None) of a response.
+            description: Name of the request in log messages.
+
+        Returns:
+            The first response that is not throttled, or the last one when
+            retries are exhausted.
+
+        Raises:
+            Exception: The last error of ``send`` when retries are exhausted,
+                or any error not listed in ``retry_errors``.
+        """
+        attempt = 0
+        while True:
+            self.concurrency.acquire()
+            if self.bucket is not None:
+                self.bucket.acquire()
+            result, error = self._attempt(send, retry_errors)
+            reason, retry_after = self._classify(result, error, response_info)
+            self.concurrency.release(throttled=reason is not None)
+
+            if reason is None or not self._should_retry(attempt, reason, description):
+                if error is not None:
+                    raise error
+                return result
+            delay = self.delay(attempt, retry_after)
+            logger.warning(f"Retrying {description} in {delay:.2f} s ({reason})")
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, send: Callable[[], Awaitable[T]], retry_errors: Tuple[Type[BaseException], ...],
+                    response_info: ResponseInfo, description: str = 'request') -> T:
+        """Asyncio counterpart of :meth:`call`, with a coroutine function ``send``."""
+        attempt = 0
+        while True:
+            await self.concurrency.aacquire()
+            if self.bucket is not None:
+                await self.bucket.aacquire()
+            try:
+                result, error = await send(), None
+            except retry_errors as e:
+                result, error = None, e
+            except BaseException:
+                self.concurrency.release()
+                raise
+            reason, retry_after = self._classify(result, error, response_info)
+            self.concurrency.release(throttled=reason is not None)
+
+            if reason is None or not self._should_retry(attempt, reason, description):
+                if error is not None:
+                    raise error
+                return result
+            delay = self.delay(attempt, retry_after)
+            logger.warning(f"Retrying {description} in {delay:.2f} s ({reason})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _attempt(self, send: Callable[[], T], retry_errors: Tuple[Type[BaseException], ...]
+                 ) -> Tuple[Optional[T], Optional[BaseException]]:
+        try:
+            return send(), None
+        except retry_errors as e:
+            return None, e
+        except BaseException:
+            self.concurrency.release()
+            raise
+
+# Process-wide limiters, one per distinct KEGG setup
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(config: Dict[str, Any]) -> RateLimiter:
+    """Return the limiter shared by every client and task using the same KEGG settings.
+
+    Args:
+        config: Configuration dictionary.
+
+    Returns:
+        The shared RateLimiter for ``config['kegg']``.
+    """
+    key = repr(sorted(config['kegg'].items()))
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter.from_config(config)
+            _limiters[key] = limiter
+    return limiter
@@ -0,0 +1,162 @@
+"""Compact typed records for parsed KEGG entries.
+
+Parsed entries are plain dictionaries by default, with every value a string
+and every stoichiometry term its own ``{'coefficient', 'compound'}`` dict.
+The record types below hold the same data in immutable tuples instead:
+
+* compound and reaction IDs are interned, so each ID is stored once;
+* coefficients are ``int`` or ``Fraction`` (symbolic ones such as 'n' stay
+  strings);
+* identical stoichiometry terms are shared between reactions;
+* masses are floats.
+
+This cuts the memory of a full KEGG snapshot several-fold. Use
+:func:`to_frame` to turn many records into a DataFrame at once.
+"""
+
+import sys
+from fractions import Fraction
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+Coefficient = Union[int, Fraction, str]
+
+class StoichTerm(NamedTuple):
+    """One compound of a reaction side with its coefficient."""
+    coefficient: Coefficient
+    compound: str
+
+class Reaction(NamedTuple):
+    """Parsed KEGG reaction entry."""
+    reaction_id: str
+    name: str
+    definition: str
+    equation: str
+    reactants: Tuple[StoichTerm, ...]
+    products: Tuple[StoichTerm, ...]
+    is_reversible: bool
+    enzyme: str
+    pathways: str
+    modules: str
+    orthology: str
+    dblinks: str
+
+class Compound(NamedTuple):
+    """Parsed KEGG compound entry."""
+    compound_id: str
+    name: str
+    formula: str
+    exact_mass: Optional[float]
+    molecular_weight: Optional[float]
+    reactions: str
+    enzymes: str
+    pathways: str
+    modules: str
+    dblinks: str
+
+def parse_coefficient(coefficient: Union[str, int, Fraction]) -> Coefficient:
+    """Convert a KEGG coefficient to a number when possible.
+
+    Args:
+        coefficient: Coefficient as written in the equation (e.g., '2', '1/2' or 'n').
+
+    Returns:
+        An int, a Fraction for non-integer values, or the interned string for
+        symbolic coefficients such as 'n' or '(n+1)'.
+    """
+    if not isinstance(coefficient, str):
+        return coefficient
+    if coefficient.isdigit():
+        return int(coefficient)
+    try:
+        value = Fraction(coefficient)
+    except ValueError:
+        return sys.intern(coefficient)
+    return int(value) if value.denominator == 1 else value
+
+@lru_cache(maxsize=65536)
+def make_term(coefficient: Union[str, int, Fraction], compound: str) -> StoichTerm:
+    """Return the shared StoichTerm of a coefficient and compound ID."""
+    return StoichTerm(parse_coefficient(coefficient), sys.intern(compound))
+
+def term_parts(term: Union[StoichTerm, Dict[str, Any]]) -> Tuple[Any, str]:
+    """Return (coefficient, compound) of a StoichTerm or a term dictionary."""
+    if isinstance(term, tuple):
+        return term[0], term[1]
+    return term['coefficient'], term['compound']
+
+def _terms(terms: Iterable[Union[StoichTerm, Dict[str, Any]]]) -> Tuple[StoichTerm, ...]:
+    return tuple(make_term(*term_parts(term)) for term in terms)
+
+def _mass(value: Any) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    return float(value)
+
+def reaction_from_dict(data: Dict[str, Any]) -> Reaction:
+    """Build a Reaction from a parsed reaction dictionary."""
+    return Reaction(
+        reaction_id=sys.intern(data['reaction_id']),
+        name=data['name'],
+        definition=data['definition'],
+        equation=data['equation'],
+        reactants=_terms(data['reactants']),
+        products=_terms(data['products']),
+        is_reversible=bool(data['is_reversible']),
+        enzyme=data['enzyme'],
+        pathways=data['pathways'],
+        modules=data['modules'],
+        orthology=data['orthology'],
+        dblinks=data['dblinks'],
+    )
+
+def compound_from_dict(data: Dict[str, Any]) -> Compound:
+    """Build a Compound from a parsed compound dictionary."""
+    return Compound(
+        compound_id=sys.intern(data['compound_id']),
+        name=data['name'],
+        formula=data['formula'],
+        exact_mass=_mass(data['exact_mass']),
+        molecular_weight=_mass(data['molecular_weight']),
+        reactions=data['reactions'],
+        enzymes=data['enzymes'],
+        pathways=data['pathways'],
+        modules=data['modules'],
+        dblinks=data['dblinks'],
+    )
+
+# Record converters by entity kind
+RECORD_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'reaction': reaction_from_dict,
+    'compound': compound_from_dict,
+}
+
+def to_frame(
+    records: Sequence[Union[Reaction, Compound, Dict[str, Any]]],
+    columns: Optional[List[str]] = None
+) -> 'pd.DataFrame':
+    """Convert many records of one type to a DataFrame in a single call.
+
+    This is the only step that needs pandas, which is imported on first use,
+    so code working with records alone never loads it.
+
+    Args:
+        records: Reaction or Compound records, or parsed entry dictionaries.
+        columns: Columns of an empty result. If None, an empty input gives a
+            DataFrame without columns.
+
+    Returns:
+        DataFrame with one column per record field. Stoichiometry columns
+        hold tuples of StoichTerm (or lists of dicts for dictionaries).
+    """
+    import pandas as pd
+
+    records = list(records)
+    if not records:
+        return pd.DataFrame(columns=columns)
+    if isinstance(records[0], dict):
+        return pd.DataFrame(records, columns=list(records[0]))
+    return pd.DataFrame.from_records(records, columns=type(records[0])._fields)
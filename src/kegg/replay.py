@@ -0,0 +1,429 @@
+"""Local stand-in for the KEGG REST API, serving recorded entries.
+
+The replay server answers ``/get``, ``/list`` and ``/link`` requests from a
+directory of recorded flat files (such as ``tests/fixtures``) or from any
+mapping of entry IDs to entry texts. Links are derived from the entries
+themselves: reaction equations, the REACTION section of compounds and the
+PATHWAY and MODULE sections of both.
+
+Latency, error responses and a limit on concurrent connections can be
+injected, so the fetchers can be tested offline and load-tested under
+realistic concurrency without touching ``rest.kegg.jp``. Point
+``config['kegg']['base_url']`` (or the ``KEGG_BASE_URL`` environment
+variable) at the server's URL.
+
+Usage:
+    python -m kegg.replay --fixtures tests/fixtures --port 8080 --latency 0.05 --error-rate 503=0.01
+"""
+
+import argparse
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple, Union
+from urllib.parse import unquote
+from kegg.batch import KEGG_MAX_ENTRIES, entry_id, split_entries
+from kegg.parser import iter_sections
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Database names accepted in requests, mapped to their short prefix
+DATABASES = {
+    'rn': 'rn', 'reaction': 'rn',
+    'cpd': 'cpd', 'compound': 'cpd',
+    'path': 'path', 'pathway': 'path',
+    'md': 'md', 'module': 'md',
+}
+
+# Entry ID prefix of each database served by /get and /list
+ENTRY_PREFIXES = {'rn': 'R', 'cpd': 'C'}
+
+# Database of an unprefixed ID, recognised by its shape
+_ID_DATABASES = [
+    (re.compile(r'^R\d{5}$'), 'rn'),
+    (re.compile(r'^C\d{5}$'), 'cpd'),
+    (re.compile(r'^M\d{5}$'), 'md'),
+    (re.compile(r'^[a-z]{2,4}\d{5}$'), 'path'),
+]
+
+_COMPOUND_RE = re.compile(r'\bC\d{5}\b')
+
+# Sections of an entry from which its /link tables are derived
+_LINKED_SECTIONS = frozenset({'PATHWAY', 'MODULE', 'EQUATION', 'REACTION'})
+
+def load_entries(path: str) -> Dict[str, str]:
+    """Read recorded entries from a flat file or a directory of ``.txt`` files.
+
+    Args:
+        path: A file holding one or more entries, or a directory of such files.
+
+    Returns:
+        Dictionary mapping entry IDs to entry texts (with their ``///`` line).
+    """
+    if os.path.isdir(path):
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.txt')]
+    else:
+        files = [path]
+
+    entries = {}
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        for entry_text in split_entries(text):
+            entity_id = entry_id(entry_text)
+            if entity_id is not None:
+                entries[entity_id] = entry_text.rstrip('\n') + '\n///\n'
+    return entries
+
+def link_key(term: str) -> Optional[str]:
+    """Return the normalized ``db:id`` form of a linked ID, or None if unknown.
+
+    Pathway maps of any organism code share one key ('rn00010', 'map00010'
+    and 'path:rn00010' all give 'path:map00010').
+    """
+    if ':' in term:
+        database, entity_id = term.split(':', 1)
+        database = DATABASES.get(database)
+    else:
+        entity_id = term
+        database = next((db for pattern, db in _ID_DATABASES if pattern.match(term)), None)
+    if database is None or not entity_id:
+        return None
+    if database == 'path':
+        entity_id = 'map' + entity_id[-5:]
+    return f"{database}:{entity_id}"
+
+def build_links(entries: Mapping[str, str]) -> Dict[str, Dict[str, Set[str]]]:
+    """Derive the link table of a set of entries.
+
+    Args:
+        entries: Dictionary mapping entry IDs to entry texts.
+
+    Returns:
+        Nested dictionary ``links[target_db][source_key]`` holding the keys of
+        the linked entries of ``target_db``. Links go both ways.
+    """
+    links: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+
+    def add(first: Optional[str], second: Optional[str]) -> None:
+        if first is None or second is None:
+            return
+        links[second.split(':', 1)[0]][first].add(second)
+        links[first.split(':', 1)[0]][second].add(first)
+
+    for entity_id, text in entries.items():
+        source = link_key(entity_id)
+        sections = next(iter_sections(text.split('\n'), _LINKED_SECTIONS), {})
+        for line in _section_lines(sections, 'PATHWAY') + _section_lines(sections, 'MODULE'):
+            add(source, link_key(line.split(None, 1)[0]))
+        if entity_id.startswith('R'):
+            for compound in _COMPOUND_RE.findall(' '.join(_section_lines(sections, 'EQUATION'))):
+                add(source, f"cpd:{compound}")
+        elif entity_id.startswith('C'):
+            for line in _section_lines(sections, 'REACTION'):
+                for reaction in line.split():
+                    add(source, link_key(reaction))
+    return links
+
+def _section_lines(sections: Dict[str, List[List[str]]], keyword: str) -> List[str]:
+    return [line for occurrence in sections.get(keyword, []) for line in occurrence]
+
+class ReplayServer:
+    """Threaded HTTP server replaying KEGG REST responses.
+
+    Each connection is served by its own thread with HTTP/1.1 keep-alive, as
+    ``rest.kegg.jp`` does, so pooled clients reuse their connections.
+
+    Args:
+        entries: Directory or file of recorded entries, or a dictionary
+            mapping entry IDs to entry texts.
+        host: Interface to listen on.
+        port: Port to listen on; 0 picks a free port.
+        latency: Delay in seconds added to every response.
+        jitter: Upper bound of a uniformly distributed extra delay in seconds.
+        error_rates: Probability of answering a request with each HTTP error
+            status, e.g. ``{503: 0.01, 403: 0.001}``, instead of serving it.
+        max_connections: Number of connections served at once. Requests on
+            further connections are answered with ``overload_status`` and the
+            connection is closed. None means no limit.
+        overload_status: Status returned beyond ``max_connections`` (KEGG
+            answers excess access with 403).
+        seed: Seed of the error and jitter draws, for reproducible runs.
+
+    Raises:
+        ValueError: If an error status is not an HTTP error or the error rates
+            add up to more than 1.
+    """
+
+    def __init__(
+        self,
+        entries: Union[str, Mapping[str, str]],
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rates: Optional[Mapping[int, float]] = None,
+        max_connections: Optional[int] = None,
+        overload_status: int = 403,
+        seed: Optional[int] = None
+    ):
+        self.entries = load_entries(entries) if isinstance(entries, str) else dict(entries)
+        self.links = build_links(self.entries)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rates = dict(error_rates or {})
+        self.max_connections = max_connections
+        self.overload_status = overload_status
+
+        if any(status < 400 for status in self.error_rates):
+            raise ValueError(f"Error statuses must be HTTP errors: {sorted(self.error_rates)}")
+        if sum(self.error_rates.values()) > 1:
+            raise ValueError(f"Error rates add up to more than 1: {self.error_rates}")
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._open_connections = 0
+        self._stats: Dict[str, Any] = {'requests': 0, 'entries': 0, 'rejected': 0,
+                                       'peak_connections': 0, 'status': Counter()}
+
+        self.httpd = _ReplayHTTPServer((host, port), _ReplayHandler)
+        self.httpd.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to use as ``config['kegg']['base_url']``."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of a configuration whose KEGG base URL is this server."""
+        config = dict(config)
+        config['kegg'] = dict(config['kegg'], base_url=self.base_url)
+        return config
+
+    def start(self) -> str:
+        """Serve requests from a background thread and return the base URL."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever, name='kegg-replay', daemon=True)
+            self._thread.start()
+            logger.info(f"Replaying {len(self.entries)} KEGG entries at {self.base_url}")
+        return self.base_url
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'ReplayServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counts of requests, served entries, rejected connections,
+        the peak number of open connections and responses per status."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['status'] = dict(self._stats['status'])
+        return stats
+
+    def respond(self, path: str) -> Tuple[int, str]:
+        """Return the status and body of a request path, as KEGG would.
+
+        Args:
+            path: Request path, e.g. ``/get/rn:R00200+rn:R00299``.
+
+        Returns:
+            Tuple of (HTTP status, response text).
+        """
+        parts = [unquote(part) for part in path.split('?', 1)[0].strip('/').split('/')]
+        operation, arguments = parts[0], parts[1:]
+        if operation == 'get' and len(arguments) == 1:
+            return self._get(arguments[0])
+        if operation == 'list' and len(arguments) == 1:
+            return self._list(arguments[0])
+        if operation == 'link' and len(arguments) == 2:
+            return self._link(*arguments)
+        return 400, ''
+
+    def _get(self, argument: str) -> Tuple[int, str]:
+        # Like KEGG, only the first entries of an oversized request are returned
+        terms = argument.split('+')[:KEGG_MAX_ENTRIES]
+        texts = [self.entries[term.split(':', 1)[-1]] for term in terms if term.split(':', 1)[-1] in self.entries]
+        if not texts:
+            return 404, ''
+        with self._lock:
+            self._stats['entries'] += len(texts)
+        return 200, ''.join(texts)
+
+    def _list(self, argument: str) -> Tuple[int, str]:
+        prefix = ENTRY_PREFIXES.get(DATABASES.get(argument, ''))
+        if prefix is None:
+            return 400, ''
+        lines = []
+        for entity_id in sorted(entity_id for entity_id in self.entries if entity_id.startswith(prefix)):
+            sections = next(iter_sections(self.entries[entity_id].split('\n'), ('NAME',)), {})
+            name = ' '.join(_section_lines(sections, 'NAME'))
+            lines.append(f"{entity_id}\t{name}\n")
+        return 200, ''.join(lines)
+
+    def _link(self, target: str, source: str) -> Tuple[int, str]:
+        target_db = DATABASES.get(target)
+        if target_db is None:
+            return 400, ''
+        table = self.links.get(target_db, {})
+
+        if source in DATABASES:
+            # A whole database: every link between the two
+            source_db = DATABASES[source]
+            pairs = [(key, linked) for key in sorted(table) if key.startswith(f"{source_db}:")
+                     for linked in sorted(table[key])]
+        else:
+            pairs = []
+            for term in source.split('+'):
+                key = link_key(term)
+                if key is None:
+                    continue
+                shown = term if ':' in term else f"{key.split(':', 1)[0]}:{term}"
+                pairs.extend((shown, linked) for linked in sorted(table.get(key, ())))
+        if not pairs:
+            return 404, ''
+        return 200, ''.join(f"{source_id}\t{linked}\n" for source_id, linked in pairs)
+
+    def _delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def _injected_error(self) -> Optional[int]:
+        if not self.error_rates:
+            return None
+        with self._lock:
+            draw = self._random.random()
+        for status, rate in self.error_rates.items():
+            if draw < rate:
+                return status
+            draw -= rate
+        return None
+
+    def _open(self) -> bool:
+        with self._lock:
+            if self.max_connections is not None and self._open_connections >= self.max_connections:
+                self._stats['rejected'] += 1
+                return False
+            self._open_connections += 1
+            self._stats['peak_connections'] = max(self._stats['peak_connections'], self._open_connections)
+            return True
+
+    def _close(self) -> None:
+        with self._lock:
+            self._open_connections -= 1
+
+    def _record(self, status: int) -> None:
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['status'][status] += 1
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # Room for bursts of connections from large worker pools
+    request_queue_size = 128
+    replay: ReplayServer
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: _ReplayHTTPServer
+
+    def handle(self) -> None:
+        self.admitted = self.server.replay._open()
+        try:
+            super().handle()
+        finally:
+            if self.admitted:
+                self.server.replay._close()
+
+    def do_GET(self) -> None:
+        replay = self.server.replay
+        if not self.admitted:
+            self.close_connection = True
+            self._send(replay.overload_status, '')
+            return
+
+        delay = replay._delay()
+        if delay:
+            time.sleep(delay)
+        status = replay._injected_error()
+        if status is not None:
+            self._send(status, '')
+        else:
+            self._send(*replay.respond(self.path))
+
+    def _send(self, status: int, body: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.replay._record(status)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+def _parse_error_rate(value: str) -> Tuple[int, float]:
+    try:
+        status, rate = value.split('=', 1)
+        return int(status), float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected STATUS=RATE, got {value!r}")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: ``python -m kegg.replay --fixtures DIR``."""
+    parser = argparse.ArgumentParser(prog='kegg.replay', description="Serve recorded KEGG entries over HTTP.")
+    parser.add_argument('--fixtures', required=True, help="Directory or flat file of recorded entries")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=8080, help="Port to listen on (0 picks a free port)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Upper bound of a random extra delay in seconds")
+    parser.add_argument('--error-rate', type=_parse_error_rate, action='append', default=[],
+                        metavar='STATUS=RATE', help="Answer this fraction of requests with STATUS (repeatable)")
+    parser.add_argument('--max-connections', type=int, default=None,
+                        help="Connections served at once; further ones are rejected")
+    parser.add_argument('--overload-status', type=int, default=403,
+                        help="Status returned beyond --max-connections")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the random draws")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = ReplayServer(
+        args.fixtures, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rates=dict(args.error_rate), max_connections=args.max_connections,
+        overload_status=args.overload_status, seed=args.seed
+    )
+    print(f"Serving {len(server.entries)} entries at {server.base_url} (set KEGG_BASE_URL={server.base_url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Stats: {server.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Coalescing of concurrent identical fetches.
+
+When several threads ask for the same entry at the same moment (popular
+compounds such as C00001 or C00002 in an annotation service), only the first
+one sends the request and parses the response; the others wait for it and
+receive the same result, or the same exception. Once the call completes, the
+next request for the key starts a new call, so nothing is cached here.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+from kegg import metrics
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class _Call:
+    """Outcome of one in-flight call, shared by its waiters."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Group of keyed calls of which at most one per key is in flight.
+
+    The group is safe to share between threads.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run ``fn``, or wait for the call already running for ``key``.
+
+        Args:
+            key: Identity of the call, e.g. ``('cpd', 'C00002', base_url)``.
+            fn: Function computing the result.
+
+        Returns:
+            The result of the single call made for ``key``. Concurrent callers
+            receive the same object, which must be treated as read-only.
+
+        Raises:
+            Exception: Whatever ``fn`` raised, in the caller and every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            metrics.inc('kegg_coalesced_total')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"Shared {key} with {call.waiters} concurrent callers")
+        return call.result
+
+    def in_flight(self) -> int:
+        """Return the number of keys with a call in flight."""
+        with self._lock:
+            return len(self._calls)
+
+# Process-wide group used by the fetch functions
+_group = SingleFlight()
+
+def coalesce(key: Hashable, fn: Callable[[], T]) -> T:
+    """Run ``fn`` in the process-wide group; see :meth:`SingleFlight.do`."""
+    return _group.do(key, fn)
+
+def get_group() -> SingleFlight:
+    """Return the process-wide group, e.g. to read its ``calls`` and ``coalesced`` counts."""
+    return _group
@@ -0,0 +1,116 @@
+"""Sparse stoichiometric matrices built from parsed KEGG reactions.
+
+Requires the optional ``scipy`` dependency
+(``pip install kegg-data-fetcher[sparse]``).
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any, NamedTuple
+import numpy as np
+import pandas as pd
+from kegg.equations import _coefficient_value
+from kegg.records import term_parts
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SPARSE_FORMATS = ('csc', 'csr')
+
+def _require_scipy() -> Any:
+    try:
+        from scipy import sparse
+    except ImportError:
+        raise ImportError(
+            "scipy is required for stoichiometric matrices. "
+            "Install it with: pip install kegg-data-fetcher[sparse]"
+        )
+    return sparse
+
+class StoichiometricMatrix(NamedTuple):
+    """Stoichiometric matrix with its row and column labels.
+
+    Attributes:
+        matrix: Sparse matrix of shape (compounds, reactions). Reactants have
+            negative and products positive coefficients.
+        compound_ids: Compound ID of each row, sorted.
+        reaction_ids: Reaction ID of each column, in input order.
+        is_reversible: Boolean reversibility of each column.
+    """
+    matrix: 'sparse.spmatrix'
+    compound_ids: np.ndarray
+    reaction_ids: np.ndarray
+    is_reversible: np.ndarray
+
+def build_stoichiometric_matrix(reactions_df: pd.DataFrame, sparse_format: str = 'csc') -> StoichiometricMatrix:
+    """Build the compounds x reactions stoichiometric matrix of parsed reactions.
+
+    Compound IDs are interned to row indices with one vectorized
+    ``np.unique`` call and coefficients are converted to numbers in bulk,
+    fractions such as '1/2' included, as in :mod:`kegg.equations`. Symbolic coefficients such as 'n' or '(n+1)' cannot be represented
+    numerically; they are stored as NaN and a warning is logged. A compound
+    appearing on both sides of a reaction gets its net coefficient.
+
+    Args:
+        reactions_df: DataFrame with reaction_id, reactants, products and
+            is_reversible columns, as returned by the fetch functions or
+            :func:`kegg.records.to_frame`.
+        sparse_format: 'csc' (column slicing by reaction) or 'csr' (row
+            slicing by compound).
+
+    Returns:
+        StoichiometricMatrix with the matrix and its labels.
+
+    Raises:
+        ValueError: If the sparse format is not supported.
+        ImportError: If scipy is not installed.
+    """
+    if sparse_format not in SPARSE_FORMATS:
+        raise ValueError(f"Unsupported sparse format: {sparse_format}. Must be one of {', '.join(SPARSE_FORMATS)}.")
+    sparse = _require_scipy()
+
+    columns = []
+    compounds = []
+    coefficients = []
+    signs = []
+    for sign, side in ((-1.0, reactions_df['reactants']), (1.0, reactions_df['products'])):
+        for column, terms in enumerate(side):
+            for term in terms:
+                coefficient, compound = term_parts(term)
+                columns.append(column)
+                compounds.append(compound)
+                # Typed records hold int or Fraction coefficients
+                coefficients.append(coefficient if isinstance(coefficient, str) else float(coefficient))
+            signs.extend([sign] * len(terms))
+
+    compound_ids, rows = np.unique(np.asarray(compounds, dtype=object), return_inverse=True)
+    values = pd.to_numeric(pd.Series(coefficients, dtype=object), errors='coerce').to_numpy(dtype=float, copy=True)
+    # Fractions such as '1/2' are not numbers to pandas; convert them exactly
+    unconverted = np.flatnonzero(np.isnan(values))
+    if len(unconverted):
+        values[unconverted] = [_coefficient_value(str(coefficients[index])) for index in unconverted]
+
+    symbolic = np.isnan(values)
+    if symbolic.any():
+        reaction_ids = reactions_df['reaction_id'].to_numpy()
+        affected = pd.unique(reaction_ids[np.asarray(columns)[symbolic]])
+        logger.warning(
+            f"{len(affected)} reactions have symbolic coefficients stored as NaN: "
+            f"{', '.join(map(str, affected[:10]))}{' ...' if len(affected) > 10 else ''}"
+        )
+
+    matrix = sparse.coo_matrix(
+        (values * np.asarray(signs), (rows.reshape(-1), np.asarray(columns, dtype=np.int64))),
+        shape=(len(compound_ids), len(reactions_df))
+    )
+    matrix = matrix.tocsc() if sparse_format == 'csc' else matrix.tocsr()
+    matrix.sum_duplicates()
+
+    return StoichiometricMatrix(
+        matrix=matrix,
+        compound_ids=compound_ids.astype(str),
+        reaction_ids=reactions_df['reaction_id'].to_numpy(dtype=str),
+        is_reversible=reactions_df['is_reversible'].to_numpy(dtype=bool),
+    )
@@ -1,14 +1,30 @@
 """Configuration handling for the KEGG Data Fetcher package."""
 
 import os
+import threading
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
+# Environment variable overriding ``kegg.base_url``, e.g. to use a replay server
+BASE_URL_ENV = 'KEGG_BASE_URL'
+
+# Loaded configurations keyed by absolute path, with the file stamp they were read at
+_config_cache: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+_config_cache_lock = threading.Lock()
+
+def load_config(config_path: str = "config.yaml", reload: bool = False) -> Dict[str, Any]:
     """Load configuration from a YAML file.
     
+    The configuration is parsed and validated once per process and reused
+    until the file's modification time or size changes. The returned
+    dictionary is shared between callers and must be treated as read-only.
+    
+    If the ``KEGG_BASE_URL`` environment variable is set, it replaces
+    ``kegg.base_url`` (for example to point at ``kegg.replay``).
+    
     Args:
         config_path: Path to the configuration file.
+        reload: Whether to re-read the file even if it has not changed.
         
     Returns:
         Dictionary containing the configuration.
@@ -16,16 +32,40 @@ def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     Raises:
         FileNotFoundError: If the configuration file does not exist.
         yaml.YAMLError: If the configuration file is not valid YAML.
+        ValueError: If the configuration is invalid.
     """
-    if not os.path.exists(config_path):
+    path = os.path.abspath(config_path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    base_url = os.environ.get(BASE_URL_ENV)
+    stamp = (stat.st_mtime_ns, stat.st_size, base_url)
+    
+    with _config_cache_lock:
+        cached = _config_cache.get(path)
+        if cached is not None and cached[0] == stamp and not reload:
+            return cached[1]
     
-    with open(config_path, 'r') as f:
+    config = _read_config(path)
+    if base_url:
+        config['kegg']['base_url'] = base_url
+    
+    with _config_cache_lock:
+        _config_cache[path] = (stamp, config)
+    
+    return config
+
+def _read_config(path: str) -> Dict[str, Any]:
+    """Parse, validate and prepare the directories of a configuration file."""
+    with open(path, 'r') as f:
         try:
             config = yaml.safe_load(f)
         except yaml.YAMLError as e:
             raise yaml.YAMLError(f"Error parsing configuration file: {e}")
     
+    validate_config(config)
+    
     # Create necessary directories
     if 'output' in config and 'data_dir' in config['output']:
         os.makedirs(config['output']['data_dir'], exist_ok=True)
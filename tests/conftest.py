@@ -0,0 +1,74 @@
+import os
+import pytest
+import requests
+from kegg.replay import ReplayServer
+from utils.config import BASE_URL_ENV
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+@pytest.fixture(scope="session", autouse=True)
+def kegg_replay():
+    """Point the configuration at a replay server of the recorded fixtures.
+
+    Set KEGG_LIVE_TESTS=1 to run the tests against the real KEGG API.
+    """
+    if os.environ.get("KEGG_LIVE_TESTS"):
+        yield None
+        return
+    previous = os.environ.get(BASE_URL_ENV)
+    with ReplayServer(FIXTURES_DIR) as server:
+        os.environ[BASE_URL_ENV] = server.base_url
+        try:
+            yield server
+        finally:
+            if previous is None:
+                del os.environ[BASE_URL_ENV]
+            else:
+                os.environ[BASE_URL_ENV] = previous
+
+@pytest.fixture
+def kegg_entry():
+    """Return the recorded KEGG flat-file text for an entry ID."""
+    def _load(entry_id):
+        with open(os.path.join(FIXTURES_DIR, f"{entry_id}.txt")) as f:
+            return f.read()
+    return _load
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+        self.content = text.encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+@pytest.fixture
+def fake_kegg(monkeypatch, kegg_entry):
+    """Serve /get and /list requests from the recorded fixtures.
+
+    Returns the list of requested URLs.
+    """
+    urls = []
+
+    def fake_get(session, url, timeout=None):
+        urls.append(url)
+        operation, argument = url.split("/")[-2:]
+        if operation == "list":
+            prefix = {"rn": "R", "cpd": "C"}[argument]
+            names = sorted(name[:-4] for name in os.listdir(FIXTURES_DIR) if name.startswith(prefix))
+            return FakeResponse("".join(f"{name}\tdescription\n" for name in names))
+
+        texts = []
+        for term in argument.split("+"):
+            try:
+                texts.append(kegg_entry(term.split(":", 1)[-1]))
+            except FileNotFoundError:
+                pass
+        if not texts:
+            return FakeResponse("", status_code=404)
+        return FakeResponse("".join(texts))
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    return urls
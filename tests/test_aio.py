@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+import yaml
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from kegg.aio import acollect, aget_compounds_info, aget_reaction_info, aget_reactions_info
+from kegg.replay import ReplayServer
+from .conftest import FIXTURES_DIR
+
+@pytest.fixture
+def config():
+    with open("config.yaml") as f:
+        return yaml.safe_load(f)
+
+def serve_fixtures(kegg_entry, in_flight):
+    """Build an app answering combined /get requests from the recorded fixtures."""
+    async def handle_get(request):
+        in_flight.append(1)
+        await asyncio.sleep(0.01)
+        texts = []
+        for term in request.match_info["ids"].split("+"):
+            try:
+                texts.append(kegg_entry(term.split(":", 1)[1]))
+            except FileNotFoundError:
+                pass
+        in_flight.pop()
+        if not texts:
+            raise web.HTTPNotFound()
+        return web.Response(text="".join(texts))
+
+    app = web.Application()
+    app.router.add_get("/get/{ids}", handle_get)
+    return app
+
+async def run_with_server(kegg_entry, config, coro_factory, in_flight=None):
+    in_flight = [] if in_flight is None else in_flight
+    runner = web.AppRunner(serve_fixtures(kegg_entry, in_flight))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    config["kegg"]["base_url"] = f"http://127.0.0.1:{port}"
+    try:
+        return await coro_factory(config)
+    finally:
+        await runner.cleanup()
+
+def test_aget_reaction_info(kegg_entry, config):
+    """Test fetching a single reaction asynchronously."""
+    df = asyncio.run(run_with_server(
+        kegg_entry, config, lambda cfg: aget_reaction_info("R00200", config=cfg)
+    ))
+    assert list(df["reaction_id"]) == ["R00200"]
+    assert list(df.columns) == config["reaction"]["fields"]
+
+def test_aget_compounds_info(kegg_entry, config):
+    """Test fetching several compounds concurrently into one DataFrame."""
+    config["kegg"]["max_batch_size"] = 1
+    df = asyncio.run(run_with_server(
+        kegg_entry, config,
+        lambda cfg: acollect(aget_compounds_info(["C00031", "C00002", "C99999"], concurrency=2, config=cfg))
+    ))
+    assert sorted(df["compound_id"]) == ["C00002", "C00031"]
+    assert df.attrs["missing_ids"] == ["C99999"]
+
+def test_acollect_empty(config):
+    """Test that an empty fetch collects into a DataFrame with the configured columns."""
+    df = asyncio.run(acollect(aget_compounds_info([], config=config)))
+    assert df.empty
+    assert list(df.columns) == config["compound"]["fields"]
+    assert df.attrs["missing_ids"] == []
+
+    async def nothing():
+        return
+        yield
+
+    df = asyncio.run(acollect(nothing(), columns=["reaction_id"]))
+    assert list(df.columns) == ["reaction_id"]
+
+def test_cache_lookups_do_not_block_the_loop(kegg_entry, config, tmp_path, monkeypatch):
+    """Test that other coroutines keep running while the SQLite cache is read."""
+    import time
+    from kegg.cache import ResponseCache, get_cache
+
+    config["cache"].update(enabled=True, offline=True, path=str(tmp_path / "cache.sqlite"))
+    base_url = config["kegg"]["base_url"].rstrip("/")
+    get_cache(config).set(f"{base_url}/get/rn:R00200", kegg_entry("R00200"))
+    cache_get = ResponseCache.get
+
+    def slow_get(cache, url, allow_expired=False):
+        time.sleep(0.2)
+        return cache_get(cache, url, allow_expired=allow_expired)
+
+    monkeypatch.setattr(ResponseCache, "get", slow_get)
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(ticker())
+        df = await aget_reaction_info("R00200", config=config)
+        task.cancel()
+        return df, len(ticks)
+
+    df, ticks = asyncio.run(main())
+    assert list(df["reaction_id"]) == ["R00200"]
+    assert ticks >= 5
+
+def test_aget_reactions_info_invalid_id():
+    """Test that invalid IDs are rejected before any request is made."""
+    with pytest.raises(ValueError):
+        aget_reactions_info(["R00200", "INVALID_ID"])
+
+def test_throttled_requests_are_retried(config):
+    """Test that async fetches ride through injected 503 answers."""
+    config["kegg"].update(retry_backoff=0.001, max_retries=20, rate_limit=None)
+    with ReplayServer(FIXTURES_DIR, error_rates={503: 0.5}, seed=1) as server:
+        df = asyncio.run(aget_reaction_info("R00200", config=server.configure(config)))
+        assert list(df["reaction_id"]) == ["R00200"]
+        assert server.stats()["status"][503] >= 1
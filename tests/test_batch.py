@@ -0,0 +1,49 @@
+import pytest
+import pandas as pd
+from kegg.batch import chunk_ids, split_entries, entry_id
+from kegg.client import KeggClient
+from utils.config import load_config
+from kegg.fetch_reaction import get_reactions_info
+from kegg.fetch_compound import get_compounds_info
+
+def test_chunk_ids():
+    """Test grouping IDs into KEGG-sized chunks."""
+    ids = [f"R{i:05d}" for i in range(23)]
+    chunks = list(chunk_ids(ids, 10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert sum(chunks, []) == ids
+
+def test_split_entries(kegg_entry):
+    """Test splitting a combined response on the entry terminator."""
+    entries = split_entries(kegg_entry("R00200") + kegg_entry("R00299"))
+    assert [entry_id(entry) for entry in entries] == ["R00200", "R00299"]
+
+def test_get_reactions_info(fake_kegg):
+    """Test fetching several reactions in one combined request."""
+    df = get_reactions_info(["R00299", "R00200", "R99999", "R00200"])
+    assert isinstance(df, pd.DataFrame)
+    assert list(df["reaction_id"]) == ["R00299", "R00200"]
+    assert df.attrs["missing_ids"] == ["R99999"]
+    assert len(fake_kegg) == 1
+
+def test_get_compounds_info_all_missing(fake_kegg):
+    """Test that a batch with no known compounds returns an empty frame."""
+    df = get_compounds_info(["C99998", "C99999"])
+    assert df.empty
+    assert "compound_id" in df.columns
+    assert df.attrs["missing_ids"] == ["C99998", "C99999"]
+
+def test_invalid_batch_ids():
+    """Test handling of invalid IDs in a batch."""
+    with pytest.raises(ValueError):
+        get_reactions_info(["R00200", "INVALID_ID"])
+
+def test_batch_reuses_cached_entries(fake_kegg, tmp_path):
+    """Test that single-entry cache keys are shared with batch fetches."""
+    config = dict(load_config())
+    config['cache'] = {'enabled': True, 'path': str(tmp_path / "cache.sqlite")}
+    client = KeggClient(config)
+    assert "R00200" in client.get_text(client.url("get/rn:R00200"))
+    df = get_reactions_info(["R00200", "R00299"], client=client)
+    assert list(df["reaction_id"]) == ["R00200", "R00299"]
+    assert fake_kegg[-1].endswith("/get/rn:R00299")
@@ -0,0 +1,56 @@
+import pytest
+from kegg.cache import ResponseCache, OfflineCacheMiss
+from kegg.client import KeggClient
+
+def test_cache_round_trip(tmp_path):
+    """Test storing and reading back a response."""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("https://rest.kegg.jp/get/rn:R00200") is None
+    cache.set("https://rest.kegg.jp/get/rn:R00200", "ENTRY       R00200\n///\n")
+    assert cache.get("https://rest.kegg.jp/get/rn:R00200") == "ENTRY       R00200\n///\n"
+
+def test_cache_ttl(tmp_path):
+    """Test that expired entries are only served when explicitly allowed."""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=-1)
+    cache.set("url", "body")
+    assert cache.get("url") is None
+    assert cache.get("url", allow_expired=True) == "body"
+
+def test_cache_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted over budget."""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_size_mb=2.5 / 1024)
+    cache.set("a", "x" * 1024)
+    cache.set("b", "x" * 1024)
+    cache.get("a")
+    cache.set("c", "x" * 1024)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+def test_cache_size_is_tracked_without_scanning(tmp_path):
+    """Test that inserts keep a running byte total instead of summing the table."""
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, max_size_mb=2.5 / 1024)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.set("a", "x" * 1024)
+    cache.set("a", "x" * 512)
+    cache.set("b", "x" * 1024)
+    assert cache._size == 1536
+    assert not any("SUM" in statement for statement in statements)
+
+    cache.set("c", "x" * 1100)
+    assert cache._size == 2124
+    assert cache.get("a") is None
+    cache.close()
+    assert ResponseCache(path, max_size_mb=2.5 / 1024)._size == 2124
+
+
+def test_offline_cache_miss(tmp_path):
+    """Test that offline mode never falls through to the network."""
+    config = {
+        'kegg': {'base_url': "https://rest.kegg.jp", 'timeout': 30},
+        'cache': {'enabled': True, 'path': str(tmp_path / "cache.sqlite"), 'offline': True},
+    }
+    with pytest.raises(OfflineCacheMiss):
+        KeggClient(config).get_text("https://rest.kegg.jp/get/rn:R00200")
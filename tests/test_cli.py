@@ -0,0 +1,61 @@
+import io
+import pandas as pd
+import requests
+from kegg.cli import Progress, build_parser, read_ids, run_fetch
+from kegg.client import KeggClient
+
+def run(tmp_path, *argv, stdin=""):
+    stderr = io.StringIO()
+    args = build_parser().parse_args(["fetch", *argv, "--workers", "2", "--chunk-size", "1"])
+    code = run_fetch(args, stdin=io.StringIO(stdin), stderr=stderr)
+    return code, stderr.getvalue()
+
+def test_read_ids(tmp_path):
+    """Test comments, prefixes and duplicates in ID files."""
+    path = tmp_path / "ids.txt"
+    path.write_text("# header\nrn:R00200\n\nR00299 hexokinase\nR00200\n")
+    assert read_ids(str(path)) == ["R00200", "R00299"]
+    assert read_ids("-", stdin=io.StringIO("C00031\n")) == ["C00031"]
+
+def test_fetch_writes_one_file_per_kind(fake_kegg, tmp_path):
+    """Test a fetch of reactions from a file and compounds from stdin."""
+    ids = tmp_path / "reactions.txt"
+    ids.write_text("R00200\nR00299\nR99999\n")
+    out = tmp_path / "out.csv"
+
+    code, report = run(tmp_path, "--reactions", str(ids), "--compounds", "-", "--out", str(out),
+                       stdin="C00031\nC00002\n")
+    assert code == 0
+    reactions = pd.read_csv(tmp_path / "out_reactions.csv")
+    assert list(reactions["reaction_id"]) == ["R00200", "R00299"]
+    assert list(pd.read_csv(tmp_path / "out_compounds.csv")["compound_id"]) == ["C00031", "C00002"]
+    assert "reactions: 3/3 (100.0%)" in report
+    assert "0 errors" in report
+
+def test_fetch_reports_failures(fake_kegg, monkeypatch, tmp_path):
+    """Test that failed chunks are counted and give a non-zero exit code."""
+    request = KeggClient.request
+
+    def flaky_request(client, url):
+        if "R00299" in url:
+            raise requests.ConnectionError("connection reset")
+        return request(client, url)
+
+    monkeypatch.setattr(KeggClient, "request", flaky_request)
+    ids = tmp_path / "reactions.txt"
+    ids.write_text("R00200\nR00299\nC00031\n")
+
+    code, report = run(tmp_path, "--reactions", str(ids), "--out", str(tmp_path / "out.csv"))
+    assert code == 1
+    assert "1 errors" in report
+    assert list(pd.read_csv(tmp_path / "out.csv")["reaction_id"]) == ["R00200"]
+    assert (tmp_path / "out.csv.failed.txt").read_text() == "R00299\n"
+
+def test_progress_eta():
+    """Test throughput and ETA of the progress report."""
+    now = [0.0]
+    stream = io.StringIO()
+    progress = Progress("reactions", 100, stream=stream, interval=5, clock=lambda: now[0])
+    now[0] = 10.0
+    progress.update(done=50, errors=2)
+    assert stream.getvalue() == "reactions: 50/100 (50.0%), 5.0 entries/s, 2 errors, ETA 10s\n"
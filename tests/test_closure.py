@@ -0,0 +1,38 @@
+import pytest
+from kegg.closure import fetch_reaction_closure, stoichiometry_compounds
+
+def test_stoichiometry_compounds():
+    """Test that compound IDs are unique and stripped of suffixes."""
+    record = {
+        "reactants": [{"coefficient": "1", "compound": "C00404(n)"}, {"coefficient": "1", "compound": "C00001"}],
+        "products": [{"coefficient": "1", "compound": "C00404(n+1)"}],
+    }
+    assert stoichiometry_compounds(record) == ["C00404", "C00001"]
+
+def test_closure_fetches_each_compound_once(fake_kegg):
+    """Test that shared compounds are requested once."""
+    closure = fetch_reaction_closure(["R00200", "R00299"], workers=2)
+    assert list(closure.reactions["reaction_id"]) == ["R00200", "R00299"]
+    assert set(closure.compounds["compound_id"]) == {"C00002", "C00031"}
+    # ATP is a reactant of both reactions
+    assert sum(url.count("cpd:C00002") for url in fake_kegg) == 1
+    assert "C00008" in closure.missing
+    assert closure.failed == []
+
+def test_closure_expands_through_compound_reactions(fake_kegg):
+    """Test expansion along the reactions of the fetched compounds."""
+    closure = fetch_reaction_closure(["R00200"], depth=1)
+    # R00200 gives ATP, whose recorded entry lists R00299 among its reactions
+    assert list(closure.reactions["reaction_id"]) == ["R00200", "R00299"]
+    assert "C00031" in set(closure.compounds["compound_id"])
+    assert sum(url.count("rn:R00200") for url in fake_kegg) == 1
+
+    closure = fetch_reaction_closure(["R00200"], depth=1, exclude_compounds=["C00002"])
+    assert list(closure.reactions["reaction_id"]) == ["R00200"]
+
+def test_closure_rejects_invalid_input():
+    """Test validation of IDs and depth."""
+    with pytest.raises(ValueError):
+        fetch_reaction_closure(["C00031"])
+    with pytest.raises(ValueError):
+        fetch_reaction_closure(["R00200"], depth=-1)
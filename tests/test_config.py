@@ -0,0 +1,38 @@
+import os
+import pytest
+import yaml
+from utils.config import load_config
+
+@pytest.fixture
+def config_file(tmp_path):
+    with open("config.yaml") as f:
+        config = yaml.safe_load(f)
+    config["output"]["data_dir"] = str(tmp_path / "data")
+    config["logging"]["file"] = str(tmp_path / "logs" / "kegg_fetch.log")
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+def test_load_config_is_cached(config_file):
+    """Test that an unchanged configuration file is parsed only once."""
+    config = load_config(str(config_file))
+    assert load_config(str(config_file)) is config
+    assert load_config(str(config_file), reload=True) is not config
+
+def test_load_config_reloads_on_change(config_file):
+    """Test that editing the configuration file invalidates the cache."""
+    config = load_config(str(config_file))
+    changed = yaml.safe_load(config_file.read_text())
+    changed["kegg"]["timeout"] = 5
+    config_file.write_text(yaml.safe_dump(changed))
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_config(str(config_file))["kegg"]["timeout"] == 5
+    assert config["kegg"]["timeout"] == 30
+
+def test_load_config_validates(tmp_path):
+    """Test that an invalid configuration is rejected when loaded."""
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({"kegg": {"base_url": "https://rest.kegg.jp"}}))
+    with pytest.raises(ValueError):
+        load_config(str(path))
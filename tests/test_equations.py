@@ -0,0 +1,59 @@
+import sys
+import numpy as np
+import pandas as pd
+from kegg import fetch_kegg_reaction
+from kegg.equations import parse_compounds, parse_equations
+
+EQUATIONS = pd.Series(
+    {
+        "R00200": "C00002 + C00022 <=> C00008 + C00074",
+        "R01": "(n+1) C00001 + C00404(n) => 2n C00009 + C00404(n-1)",
+        "R02": "C00001(side 1) + 1/2 C00007 <=> (m+n) C00001(side 2)",
+        "R03": "no arrow here",
+    }
+)
+
+def test_parse_compounds_symbolic():
+    """Test that both dictionary parsers keep symbolic coefficients and suffixes."""
+    expected = [
+        {"coefficient": "(n+1)", "compound": "C00001"},
+        {"coefficient": "1", "compound": "C00001(side 1)"},
+        {"coefficient": "2n", "compound": "C00404(n)"},
+    ]
+    text = "(n+1) C00001 + C00001(side 1) + 2n C00404(n)"
+    assert parse_compounds(text) == expected
+    assert fetch_kegg_reaction.parse_compounds(text) == expected
+
+def test_parse_equations_long_form():
+    """Test the long-form table of a column of equations."""
+    df = parse_equations(EQUATIONS)
+
+    assert list(df.columns) == ["reaction_id", "side", "compound", "coefficient", "coefficient_expr", "suffix"]
+    assert list(df["reaction_id"].unique()) == ["R00200", "R01", "R02"]
+
+    r00200 = df[df["reaction_id"] == "R00200"]
+    assert list(r00200["compound"]) == ["C00002", "C00022", "C00008", "C00074"]
+    assert list(r00200["side"]) == ["reactant", "reactant", "product", "product"]
+    assert (r00200["coefficient"] == 1.0).all()
+
+    r01 = df[df["reaction_id"] == "R01"]
+    assert list(r01["coefficient_expr"]) == ["(n+1)", "1", "2n", "1"]
+    assert list(r01["suffix"]) == ["", "(n)", "", "(n-1)"]
+    assert np.isnan(r01["coefficient"].iloc[0])
+
+    r02 = df[df["reaction_id"] == "R02"]
+    assert list(r02["coefficient"][:2]) == [1.0, 0.5]
+    assert list(r02["suffix"]) == ["(side 1)", "", "(side 2)"]
+
+def test_parse_equations_explicit_ids():
+    """Test explicit reaction IDs and empty input."""
+    df = parse_equations(pd.Series(["C00001 => C00002"]), reaction_ids=["R9"])
+    assert list(df["reaction_id"]) == ["R9", "R9"]
+    assert parse_equations(pd.Series([], dtype=str)).empty
+
+def test_parse_equations_without_pyarrow(monkeypatch):
+    """Test that the regex fallback gives the same table as the pyarrow path."""
+    expected = parse_equations(EQUATIONS)
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    pd.testing.assert_frame_equal(parse_equations(EQUATIONS), expected)
+    assert parse_equations(pd.Series([], dtype=str)).empty
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from kegg.formula import check_mass_balance, parse_formulas
+from kegg.parser import REACTION_SCHEMA, parse_entry
+
+def test_parse_formulas():
+    """Test element counts, Hill column order and the flags of generic formulas."""
+    result = parse_formulas(["C6H12O6", "HO4P", "C5H7O4R2", "(C6H10O5)n", "C2H4(CH2)2", "", "Xy?"],
+                            compound_ids=list("abcdefg"))
+    assert list(result.elements) == ["C", "H", "O", "P", "R"]
+    assert list(result.counts[0]) == [6, 12, 6, 0, 0]
+    assert list(result.counts[2]) == [5, 7, 4, 0, 2]
+    assert list(result.counts[4]) == [4, 8, 0, 0, 0]
+    assert list(result.has_r_group) == [False, False, True, False, False, False, False]
+    assert list(result.is_polymer) == [False, False, False, True, False, False, False]
+    assert list(result.is_unparsed) == [False, False, False, False, False, True, True]
+    assert np.isnan(result.counts[[3, 5, 6]]).all()
+
+def test_hydrates():
+    """Test that each part of a hydrate is counted with its multiplier."""
+    result = parse_formulas(["C4H4O4.2H2O", "C2H5O . H2O", "C4H4O4.", "C4H4O4.2"])
+    assert list(result.elements) == ["C", "H", "O"]
+    assert list(result.counts[0]) == [4, 8, 6]
+    assert list(result.counts[1]) == [2, 7, 2]
+    assert list(result.is_unparsed) == [False, False, True, True]
+
+def test_mass_balance(kegg_entry):
+    """Test balanced, unbalanced and unknown reactions in one product."""
+    reactions = pd.DataFrame([parse_entry(kegg_entry("R00299"), REACTION_SCHEMA)] + [
+        {"reaction_id": "R1", "reactants": [{"coefficient": "1", "compound": "C00031"}],
+         "products": [{"coefficient": "2", "compound": "C3"}], "is_reversible": False},
+        {"reaction_id": "R2", "reactants": [{"coefficient": "n", "compound": "C00031"}],
+         "products": [{"coefficient": "1", "compound": "P"}], "is_reversible": False},
+        {"reaction_id": "R3", "reactants": [{"coefficient": "1", "compound": "C00031"}],
+         "products": [{"coefficient": "1", "compound": "G"}], "is_reversible": False},
+    ])
+    compounds = pd.DataFrame({
+        "compound_id": ["C00031", "C00002", "C00008", "C00092", "C3", "P", "G"],
+        "formula": ["C6H12O6", "C10H16N5O13P3", "C10H15N5O10P2", "C6H13O9P", "C3H6O3", "(C6H10O5)n", "C6H11O6R"],
+    })
+    result = check_mass_balance(reactions, compounds)
+
+    assert list(result.reaction_ids) == ["R00299", "R1", "R2", "R3"]
+    assert list(result.is_balanced) == [True, True, False, False]
+    assert list(result.is_unknown) == [False, False, True, False]
+    assert list(result.has_r_group) == [False, False, False, True]
+    assert list(result.unbalanced_ids()) == ["R3"]
+    imbalance = dict(zip(result.elements, result.imbalance[3]))
+    assert (imbalance["H"], imbalance["R"], imbalance["C"]) == (-1, 1, 0)
+    assert np.isnan(result.imbalance[2]).all()
+
+    result = check_mass_balance(reactions.iloc[[3]], compounds, ignore_elements=("H", "R"))
+    assert "H" not in result.elements
+    assert list(result.is_balanced) == [True]
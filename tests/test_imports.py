@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+# Heavy optional dependencies that the lookup and CLI modules must not load
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "scipy"]
+
+CORE_IMPORT = "import kegg.fetch_reaction, kegg.fetch_compound, kegg.cli"
+
+def _run(*args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+def test_core_import_is_pandas_free():
+    """Test that the record API and the CLI import without pandas or numpy."""
+    result = _run("-c", f"{CORE_IMPORT}; import sys; print(' '.join(sorted(sys.modules)))")
+    loaded = set(result.stdout.split())
+    assert not loaded.intersection(HEAVY_MODULES)
+
+def test_journal_is_pandas_free(tmp_path):
+    """Test that writing and reading journal shards does not load pandas."""
+    journal = str(tmp_path / "run.journal")
+    code = (
+        "import sys; from kegg.journal import Journal; "
+        f"j = Journal({journal!r}); j.write_shard('rn', [{{'reaction_id': 'R00200'}}], ['R00200'], []); "
+        f"assert Journal({journal!r}).load_records('rn') == [{{'reaction_id': 'R00200'}}]; "
+        "print(' '.join(sorted(sys.modules)))"
+    )
+    loaded = set(_run("-c", code).stdout.split())
+    assert not loaded.intersection(HEAVY_MODULES)
+
+def test_records_without_pandas(fake_kegg):
+    """Test the record API returns plain records."""
+    from kegg.fetch_reaction import get_reaction_record, get_reaction_records
+    from kegg.records import Reaction
+
+    record = get_reaction_record("R00200")
+    assert record["reaction_id"] == "R00200"
+    assert isinstance(record["reactants"], list)
+    result = get_reaction_records(["R00200", "R00299", "R99999"], typed=True)
+    assert [reaction.reaction_id for reaction in result.records] == ["R00200", "R00299"]
+    assert isinstance(result.records[0], Reaction)
+    assert result.missing == ["R99999"]
@@ -0,0 +1,85 @@
+import requests
+from kegg.bulk import KINDS, fetch_many
+from kegg.client import KeggClient
+from kegg.fetch_reaction import get_reactions_info
+from kegg.journal import Journal
+from utils.config import load_config
+
+def test_resume_retries_only_failures(fake_kegg, monkeypatch, tmp_path):
+    """Test that a second run fetches only the IDs that failed before."""
+    journal = str(tmp_path / "run.journal")
+    client = KeggClient(dict(load_config()))
+    request = KeggClient.request
+
+    def flaky_request(self, url):
+        if "R00299" in url:
+            raise requests.ConnectionError("connection reset")
+        return request(self, url)
+
+    monkeypatch.setattr(KeggClient, "request", flaky_request)
+    ids = ["R00200", "R00299", "R99999"]
+    result = fetch_many(KINDS["reactions"], ids, client, workers=2, chunk_size=1, journal=journal, shard_size=1)
+    assert result.failed == ["R00299"]
+    assert [record["reaction_id"] for record in result.records] == ["R00200"]
+    assert Journal(journal).failed("rn") == {"R00299"}
+
+    monkeypatch.setattr(KeggClient, "request", request)
+    fake_kegg.clear()
+    result = fetch_many(KINDS["reactions"], ids, client, workers=2, chunk_size=1, journal=journal, shard_size=1)
+    assert fake_kegg == [client.url("get/rn:R00299")]
+    assert [record["reaction_id"] for record in result.records] == ["R00200", "R00299"]
+    assert result.missing == ["R99999"]
+    assert result.failed == []
+    assert Journal(journal).failed("rn") == set()
+
+def test_torn_line_is_ignored(tmp_path):
+    """Test that a partially written last line does not break the journal."""
+    path = tmp_path / "run.journal"
+    journal = Journal(str(path))
+    journal.write_shard("rn", [{"reaction_id": "R00200"}], ["R00200"], [])
+    with open(path, "a") as f:
+        f.write('{"event":"shard","datab')
+
+    reopened = Journal(str(path))
+    assert reopened.completed("rn") == {"R00200"}
+    assert reopened.load_records("rn") == [{"reaction_id": "R00200"}]
+
+def test_appends_after_torn_line_survive(tmp_path):
+    """Test that events written after a torn line are not glued onto it."""
+    path = tmp_path / "run.journal"
+    Journal(str(path)).record_failed("rn", ["R1"])
+    with open(path, "a") as f:
+        f.write('{"type":"fail')
+
+    journal = Journal(str(path))
+    journal.record_failed("rn", ["R2"])
+    journal.write_shard("rn", [{"reaction_id": "R3"}], ["R3"], [])
+
+    reopened = Journal(str(path))
+    assert reopened.failed("rn") == {"R1", "R2"}
+    assert reopened.completed("rn") == {"R3"}
+    assert path.read_text().count("\n") == 3
+
+def test_shard_records_round_trip(tmp_path):
+    """Test that shards are JSON lines giving back the records unchanged."""
+    record = {
+        "reaction_id": "R00200", "is_reversible": True,
+        "reactants": [{"coefficient": "1/2", "compound": "C00002"}], "products": [],
+    }
+    journal = Journal(str(tmp_path / "run.journal"))
+    journal.write_shard("rn", [record], ["R00200"], [])
+    [path] = journal.shards("rn")
+    assert path.endswith(".jsonl")
+    assert Journal(str(tmp_path / "run.journal")).load_records("rn") == [record]
+
+def test_batch_function_accepts_journal(fake_kegg, tmp_path):
+    """Test that get_reactions_info resumes from its journal."""
+    journal = str(tmp_path / "run.journal")
+    client = KeggClient(dict(load_config()))
+    assert len(get_reactions_info(["R00200"], client=client, journal=journal)) == 1
+
+    fake_kegg.clear()
+    df = get_reactions_info(["R00200", "R00299"], client=client, journal=journal)
+    assert list(df["reaction_id"]) == ["R00200", "R00299"]
+    assert all("R00200" not in url for url in fake_kegg)
+    assert df.attrs["failed_ids"] == []
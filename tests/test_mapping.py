@@ -0,0 +1,100 @@
+import os
+import pandas as pd
+from kegg.mapping import XrefIndex, load_index
+from kegg.parser import REACTION_SCHEMA, parse_entry
+from utils.config import load_config
+
+BIGG_REACTIONS = (
+    "bigg_id\tname\treaction_string\tmodel_list\tdatabase_links\told_bigg_ids\n"
+    "HEX1\tHexokinase\tatp_c + glc__D_c <-> adp_c + g6p_c\tiML1515\t"
+    "KEGG Reaction: http://identifiers.org/kegg.reaction/R00299; "
+    "MetaNetX (MNX) Equation: http://identifiers.org/metanetx.reaction/MNXR100024\tHEX1\n"
+    "PYK\tPyruvate kinase\tadp_c + pep_c --> atp_c + pyr_c\tiML1515\t\tPYK\n"
+)
+
+BIGG_METABOLITES = (
+    "bigg_id\tuniversal_bigg_id\tname\tmodel_list\tdatabase_links\told_bigg_ids\n"
+    "atp_c\tatp\tATP\tiML1515\tKEGG Compound: http://identifiers.org/kegg.compound/C00002\tatp_c\n"
+    "atp_m\tatp\tATP\tRECON1\tKEGG Compound: http://identifiers.org/kegg.compound/C00002\tatp_m\n"
+    "glc__D_c\tglc__D\tD-Glucose\tiML1515\tKEGG Compound: http://identifiers.org/kegg.compound/C00031\tglc_D_c\n"
+)
+
+REAC_XREF = (
+    "### MNX_version\t4.4\n"
+    "#source\tID\tdescription\n"
+    "kegg.reaction:R00200\tMNXR103371\tpyruvate kinase\n"
+    "bigg.reaction:PYK\tMNXR103371\tPYK\n"
+    "keggR:R00299\tMNXR100024\thexokinase\n"
+    "EMPTY\tEMPTY\tempty\n"
+)
+
+CHEM_XREF = (
+    "#source\tID\tdescription\n"
+    "kegg.compound:C00002\tMNXM3\tATP\n"
+    "biggM:M_atp\tMNXM3\tATP\n"
+    "kegg.compound:C00022\tMNXM23\tpyruvate\n"
+)
+
+def write_dumps(tmp_path):
+    paths = {}
+    for key, name, content in (
+        ("bigg_reactions", "bigg_models_reactions.txt", BIGG_REACTIONS),
+        ("bigg_metabolites", "bigg_models_metabolites.txt", BIGG_METABOLITES),
+        ("mnx_reac_xref", "reac_xref.tsv", REAC_XREF),
+        ("mnx_chem_xref", "chem_xref.tsv", CHEM_XREF),
+    ):
+        path = tmp_path / name
+        path.write_text(content)
+        paths[key] = str(path)
+    return paths
+
+def test_map_reactions(tmp_path):
+    """Test that BiGG links and MetaNetX links (direct and via MNX IDs) are merged."""
+    index = XrefIndex.build(**write_dumps(tmp_path))
+    df = pd.DataFrame({"reaction_id": ["R00200", "R00299", "R99999"]})
+
+    mapped = index.map_reactions(df)
+    assert list(mapped["bigg_id"][:2]) == ["PYK", "HEX1"]
+    assert list(mapped["metanetx_id"][:2]) == ["MNXR103371", "MNXR100024"]
+    assert mapped[["bigg_id", "metanetx_id"]].iloc[2].isna().all()
+
+def test_map_ids_returns_all_links(tmp_path):
+    """Test that compartment-specific BiGG metabolites collapse to universal IDs."""
+    index = XrefIndex.build(**write_dumps(tmp_path))
+    links = index.map_ids("compound", ["C00002"])
+    assert set(zip(links["target_db"], links["target_id"])) == {("bigg", "atp"), ("metanetx", "MNXM3")}
+
+def test_map_stoichiometry(tmp_path, kegg_entry):
+    """Test mapping of the compounds inside reactants and products."""
+    index = XrefIndex.build(**write_dumps(tmp_path))
+    df = pd.DataFrame([parse_entry(kegg_entry("R00299"), REACTION_SCHEMA)])
+
+    long = index.map_stoichiometry(df)
+    assert set(long["side"]) == {"reactant", "product"}
+    atp = long[long["compound"] == "C00002"].iloc[0]
+    assert atp["side"] == "reactant"
+    assert atp["bigg_id"] == "atp"
+
+def test_load_index_persists(tmp_path):
+    """Test that the index is saved once and reloaded until a dump changes."""
+    config = dict(load_config())
+    config["mapping"] = dict(write_dumps(tmp_path), index_path=str(tmp_path / "index.pkl"))
+
+    index = load_index(config)
+    assert os.path.exists(config["mapping"]["index_path"])
+    reloaded = load_index(config)
+    assert reloaded.map_ids("reaction", ["R00200"]).equals(index.map_ids("reaction", ["R00200"]))
+
+def test_load_index_rebuilds_when_dumps_change(tmp_path):
+    """Test that a dump added with an old modification time still triggers a rebuild."""
+    paths = write_dumps(tmp_path)
+    config = dict(load_config())
+    config["mapping"] = {"bigg_reactions": paths["bigg_reactions"], "index_path": str(tmp_path / "index.pkl")}
+    assert load_index(config).map_ids("reaction", ["R00200"]).empty
+
+    # As after extracting an archive: the new dump is older than the index
+    os.utime(paths["mnx_reac_xref"], ns=(0, 0))
+    config["mapping"]["mnx_reac_xref"] = paths["mnx_reac_xref"]
+    links = load_index(config).map_ids("reaction", ["R00200", "R99999", "R00200"])
+    assert list(links["target_id"]) == ["PYK", "MNXR103371"]
+    assert load_index(config).sources == XrefIndex.load(config["mapping"]["index_path"]).sources
@@ -0,0 +1,66 @@
+import pytest
+from kegg.fetch_reaction import get_reaction_info, get_reaction_record, get_reaction_records
+from kegg.memo import RecordMemo, get_memo
+from kegg.records import reaction_from_dict
+from utils.config import load_config
+
+@pytest.fixture
+def memo_config():
+    config = dict(load_config())
+    config["memo"] = {"enabled": True, "max_entries": 100, "max_size_mb": None}
+    memo = get_memo(config)
+    memo.clear()
+    yield config
+    memo.clear()
+
+def entry(entity_id, terms=1):
+    return {"reaction_id": entity_id, "name": "x" * 10,
+            "reactants": [{"coefficient": "1", "compound": "C00001"}] * terms}
+
+def test_lru_eviction_by_count_and_size():
+    """Test that the least recently used entries are evicted first."""
+    memo = RecordMemo(max_entries=2, max_size_mb=None)
+    memo.set("rn", "R1", entry("R1"))
+    memo.set("rn", "R2", entry("R2"))
+    assert memo.get("rn", "R1") is not None
+    memo.set("rn", "R3", entry("R3"))
+    assert memo.get("rn", "R2") is None
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 1, 1, 2)
+
+    memo = RecordMemo(max_entries=None, max_size_mb=0.01)
+    for index in range(10):
+        memo.set("rn", f"R{index}", entry(f"R{index}", terms=4))
+    assert 0 < len(memo) < 10
+    assert memo.stats()["size"] <= 0.01 * 1024 * 1024
+    assert memo.get("rn", "R9") is not None
+
+def test_callers_cannot_alter_memoized_entries():
+    """Test that returned and stored dictionaries are copies and typed records are shared."""
+    memo = RecordMemo()
+    data = entry("R1")
+    memo.set("rn", "R1", data)
+    data["reactants"].append("stored after")
+
+    first = memo.get("rn", "R1")
+    first["name"] = "changed"
+    first["reactants"][0]["compound"] = "C99999"
+    second = memo.get("rn", "R1")
+    assert second["name"] == "x" * 10
+    assert second["reactants"] == [{"coefficient": "1", "compound": "C00001"}]
+
+def test_repeated_lookups_skip_requests(fake_kegg, memo_config):
+    """Test that the fetch functions serve memoized entries without requests."""
+    record = get_reaction_record("R00200", config=memo_config)
+    typed = get_reaction_record("R00200", config=memo_config, typed=True)
+    assert typed == reaction_from_dict(record)
+    assert get_reaction_record("R00200", config=memo_config, typed=True) is typed
+    assert list(get_reaction_info("R00200", config=memo_config)["reaction_id"]) == ["R00200"]
+    assert len(fake_kegg) == 1
+
+    result = get_reaction_records(["R00299", "R00200", "R99999"], config=memo_config)
+    assert [record["reaction_id"] for record in result.records] == ["R00299", "R00200"]
+    assert result.missing == ["R99999"]
+    assert len(fake_kegg) == 2
+    stats = get_memo(memo_config).stats()
+    assert (stats["hits"], stats["entries"]) == (4, 2)
@@ -0,0 +1,71 @@
+import json
+import pytest
+from kegg import metrics
+from kegg.client import KeggClient
+from kegg.fetch_reaction import get_reaction_info, get_reactions_info
+from utils.config import load_config
+
+@pytest.fixture
+def registry():
+    registry = metrics.enable()
+    yield registry
+    metrics.disable()
+
+def test_disabled_records_nothing():
+    """Test that recording calls are no-ops while metrics are disabled."""
+    assert metrics.get_registry() is None
+    metrics.inc("kegg_requests_total")
+    with metrics.timer("kegg_stage_seconds", stage="parse"):
+        pass
+    assert metrics.get_registry() is None
+
+def test_histogram_quantiles():
+    """Test bucket counts and quantile estimates."""
+    histogram = metrics.Histogram()
+    for value in [0.001] * 98 + [2.0, 20.0]:
+        histogram.observe(value)
+    data = histogram.to_dict()
+    assert data["count"] == 100
+    assert data["buckets"]["+Inf"] == 100
+    assert data["p50"] <= 0.001
+    assert 2.0 <= data["p99"] <= 20.0
+    assert data["max"] == 20.0
+
+def test_fetch_stages_are_recorded(registry, fake_kegg):
+    """Test that requests and pipeline stages are instrumented."""
+    config = load_config()
+    with KeggClient(config) as client:
+        get_reaction_info("R00200", client=client)
+        get_reactions_info(["R00200", "R00299", "R99999"], client=client)
+
+    assert registry.counter("kegg_requests_total", status=200) == 2
+    assert registry.histogram("kegg_request_seconds").count == 2
+    assert registry.histogram("kegg_response_bytes").sum > 0
+    for stage in ("fetch", "parse", "frame", "select"):
+        assert registry.histogram("kegg_stage_seconds", kind="reaction", stage=stage).count == 2
+
+def test_sinks(registry, tmp_path):
+    """Test the JSON and Prometheus sinks."""
+    registry.inc("kegg_requests_total", status=200)
+    registry.observe("kegg_request_seconds", 0.02)
+    registry.sinks = [metrics.JsonSink(str(tmp_path / "m.json")), metrics.PrometheusSink(str(tmp_path / "m.prom"))]
+    registry.flush()
+
+    snapshot = json.loads((tmp_path / "m.json").read_text())
+    assert snapshot["counters"] == {'kegg_requests_total{status="200"}': 1}
+    text = (tmp_path / "m.prom").read_text()
+    assert "# TYPE kegg_request_seconds histogram" in text
+    assert 'kegg_request_seconds_bucket{le="0.025"} 1' in text
+    assert 'kegg_requests_total{status="200"} 1' in text
+    assert "kegg_request_seconds_count 1" in text
+
+def test_configure(tmp_path):
+    """Test enabling metrics from the configuration."""
+    assert metrics.configure({"metrics": {"enabled": False}}) is None
+    try:
+        registry = metrics.configure({"metrics": {"enabled": True, "sink": "json", "path": str(tmp_path / "m.json")}})
+        assert isinstance(registry.sinks[0], metrics.JsonSink)
+        with pytest.raises(ValueError):
+            metrics.configure({"metrics": {"enabled": True, "sink": "statsd"}})
+    finally:
+        metrics.disable()
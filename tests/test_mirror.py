@@ -0,0 +1,40 @@
+from kegg.client import KeggClient
+from kegg.fetch_reaction import get_reaction_info, get_reactions_info
+from kegg.mirror import KeggMirror, sync
+from utils.config import load_config
+
+def make_client(tmp_path):
+    config = dict(load_config())
+    config["mirror"] = {"enabled": True, "path": str(tmp_path / "mirror.sqlite")}
+    return KeggClient(config)
+
+def test_sync_is_incremental(fake_kegg, tmp_path):
+    """Test that a second sync downloads only stale entries."""
+    client = make_client(tmp_path)
+    counts = sync("rn", client.mirror, client)
+    assert counts["added"] == counts["listed"] == 2
+
+    fake_kegg.clear()
+    counts = sync("rn", client.mirror, client)
+    assert counts["added"] == 0
+    assert all("/get/" not in url for url in fake_kegg)
+
+    counts = sync("rn", client.mirror, client, max_age=-1)
+    assert counts["unchanged"] == 2
+
+def test_store_detects_changes(tmp_path):
+    """Test change detection by content hash."""
+    mirror = KeggMirror(str(tmp_path / "mirror.sqlite"))
+    assert mirror.store("rn", {"R00200": "a"}) == {"added": 1, "updated": 0, "unchanged": 0}
+    assert mirror.store("rn", {"R00200": "b"}) == {"added": 0, "updated": 1, "unchanged": 0}
+    assert mirror.get("rn", "R00200") == "b"
+
+def test_fetch_resolves_from_mirror(fake_kegg, tmp_path):
+    """Test that fetch functions read mirrored entries without requests."""
+    client = make_client(tmp_path)
+    sync("rn", client.mirror, client)
+
+    fake_kegg.clear()
+    assert get_reaction_info("R00200", client=client)["reaction_id"].iloc[0] == "R00200"
+    assert len(get_reactions_info(["R00200", "R00299"], client=client)) == 2
+    assert fake_kegg == []
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+from kegg.fetch_reaction import parse_kegg_response
+from kegg.output import infer_format, to_arrow_table, write_dataframe
+
+pa = pytest.importorskip("pyarrow")
+
+@pytest.fixture
+def reactions_df(kegg_entry):
+    return pd.DataFrame([parse_kegg_response(kegg_entry(rid)) for rid in ("R00200", "R00299")])
+
+@pytest.mark.parametrize("file_name", ["reactions.parquet", "reactions.feather"])
+def test_write_columnar_stoichiometry(tmp_path, reactions_df, file_name):
+    """Test that stoichiometry is stored as a nested list<struct> column."""
+    path = tmp_path / file_name
+    write_dataframe(reactions_df, str(path), compression="zstd")
+    if file_name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=["reaction_id", "reactants"])
+    else:
+        import pyarrow.feather as feather
+        table = feather.read_table(path)
+    assert pa.types.is_list(table.schema.field("reactants").type)
+    assert table.column("reactants").to_pylist()[0] == [
+        {"coefficient": "1", "compound": "C00002"},
+        {"coefficient": "1", "compound": "C00022"},
+    ]
+
+def test_stoichiometry_columns_keep_their_order(reactions_df):
+    """Test that products may come before reactants in the configured fields."""
+    df = reactions_df[["reaction_id", "products", "name", "reactants"]]
+    table = to_arrow_table(df)
+    assert table.column_names == ["reaction_id", "products", "name", "reactants"]
+    assert pa.types.is_list(table.schema.field("products").type)
+    assert table.column("reactants").to_pylist()[0][0] == {"coefficient": "1", "compound": "C00002"}
+
+def test_infer_format():
+    """Test output format detection from file names."""
+    assert infer_format("out.csv.gz") == "csv"
+    assert infer_format("out.parquet") == "parquet"
+    with pytest.raises(ValueError):
+        infer_format("out.xlsx")
@@ -0,0 +1,68 @@
+import gzip
+import io
+import pytest
+from kegg.parser import (
+    COMPOUND_SCHEMA, REACTION_SCHEMA, get_schema, iter_kegg_entries, iter_sections, parse_entries, parse_entry
+)
+from kegg.fetch_kegg_reaction import parse_kegg_reaction
+
+def test_parse_reaction_entry(kegg_entry):
+    """Test parsing a reaction entry with continuation lines."""
+    data = parse_entry(kegg_entry("R00200"), REACTION_SCHEMA)
+    assert data["reaction_id"] == "R00200"
+    assert data["equation"] == "C00002 + C00022 <=> C00008 + C00074"
+    assert data["reactants"] == [
+        {"coefficient": "1", "compound": "C00002"},
+        {"coefficient": "1", "compound": "C00022"},
+    ]
+    assert data["is_reversible"] is True
+    assert data["modules"].startswith("M00001  Glycolysis")
+    assert data["modules"].endswith("three-carbon compounds")
+
+def test_parse_compound_entry_skips_unmapped_sections(kegg_entry):
+    """Test that sections outside the schema (ATOM, BOND) are ignored."""
+    data = parse_entry(kegg_entry("C00031"), COMPOUND_SCHEMA)
+    assert data["compound_id"] == "C00031"
+    assert data["name"] == "D-Glucose; Grape sugar; Dextrose; Glucose; D-Glucopyranose"
+    assert data["formula"] == "C6H12O6"
+    assert data["dblinks"].endswith("KNApSAcK: C00001150")
+    assert list(data) == list(COMPOUND_SCHEMA.fields)
+
+def test_parse_entries_multi(kegg_entry):
+    """Test parsing a combined response in a single pass."""
+    records = parse_entries(kegg_entry("R00299") + kegg_entry("R00200"), REACTION_SCHEMA)
+    assert [record["reaction_id"] for record in records] == ["R00299", "R00200"]
+    assert records[0]["reactants"] is not records[1]["reactants"]
+
+def test_parse_kegg_reaction_sections(kegg_entry):
+    """Test the generic section dictionary of the legacy parser."""
+    info = parse_kegg_reaction(kegg_entry("R00200"))
+    assert info["ENZYME"] == "2.7.1.40"
+    assert info["RCLASS"] == ["RC00002  C00002_C00008", "RC00015  C00022_C00074"]
+
+def test_iter_sections_keeps_wanted_sections(kegg_entry):
+    """Test that only the requested sections are collected."""
+    sections = next(iter_sections(kegg_entry("R00200").split("\n"), {"EQUATION", "NAME"}))
+    assert set(sections) == {"EQUATION", "NAME"}
+    assert sections["EQUATION"] == next(iter_sections(kegg_entry("R00200").split("\n")))["EQUATION"]
+
+def test_unknown_schema():
+    """Test handling of an unknown entry kind."""
+    with pytest.raises(ValueError):
+        get_schema("glycan")
+
+def test_iter_kegg_entries_gzip(tmp_path, kegg_entry):
+    """Test streaming records from a gzip-compressed dump."""
+    path = tmp_path / "compound.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(kegg_entry("C00031") + kegg_entry("C00002"))
+    records = list(iter_kegg_entries(str(path), kind="compound"))
+    assert [record["compound_id"] for record in records] == ["C00031", "C00002"]
+
+def test_iter_kegg_entries_file_objects(kegg_entry):
+    """Test streaming records from text and binary file objects."""
+    text = kegg_entry("R00200") + kegg_entry("R00299")
+    from_text = list(iter_kegg_entries(io.StringIO(text)))
+    from_bytes = list(iter_kegg_entries(io.BytesIO(text.encode("utf-8"))))
+    assert from_text == from_bytes
+    assert [record["reaction_id"] for record in from_text] == ["R00200", "R00299"]
@@ -0,0 +1,55 @@
+import pytest
+from kegg.client import KeggClient
+from kegg.pathway import get_module_reactions, get_pathway_reactions, pathway_reaction_ids
+from kegg.replay import ReplayServer
+from utils.config import load_config
+
+@pytest.fixture
+def replay_client():
+    with ReplayServer("tests/fixtures") as server:
+        with KeggClient(server.configure(load_config())) as client:
+            yield server, client
+
+def test_pathway_reaction_ids(replay_client):
+    """Test resolving pathway members with /link."""
+    server, client = replay_client
+    assert pathway_reaction_ids("rn00010", client) == ["R00200", "R00299"]
+    assert pathway_reaction_ids("rn99999", client) == []
+    with pytest.raises(ValueError):
+        pathway_reaction_ids("glycolysis", client)
+
+def test_get_pathway_reactions_combined(replay_client):
+    """Test one /link request per pathway and shared reactions fetched once."""
+    server, client = replay_client
+    df = get_pathway_reactions(["rn00010", "rn00620"], client=client)
+    assert list(df.columns[:2]) == ["pathway", "reaction_id"]
+    assert list(df["pathway"]) == ["rn00010", "rn00010", "rn00620"]
+    assert list(df["reaction_id"]) == ["R00200", "R00299", "R00200"]
+    # Two /link requests and one combined /get
+    assert server.stats()["requests"] == 3
+
+def test_get_module_reactions_per_module(replay_client):
+    """Test the dictionary of one DataFrame per module."""
+    server, client = replay_client
+    frames = get_module_reactions(["M00001", "M00002"], client=client, combine=False)
+    assert list(frames) == ["M00001", "M00002"]
+    assert list(frames["M00001"]["reaction_id"]) == ["R00200", "R00299"]
+    assert list(frames["M00002"]["reaction_id"]) == ["R00200"]
+    assert "module" not in frames["M00001"].columns
+
+def test_link_tables_are_kept_in_the_mirror(tmp_path):
+    """Test that link tables are stored in the mirror and reused until max_age."""
+    with ReplayServer("tests/fixtures") as server:
+        config = server.configure(load_config())
+        config["mirror"] = {"enabled": True, "path": str(tmp_path / "mirror.sqlite"), "max_age": 3600}
+        with KeggClient(config) as client:
+            assert pathway_reaction_ids("rn00010", client) == ["R00200", "R00299"]
+            assert pathway_reaction_ids("rn99999", client) == []
+            assert server.stats()["requests"] == 2
+            assert pathway_reaction_ids("rn00010", client) == ["R00200", "R00299"]
+            assert pathway_reaction_ids("rn99999", client) == []
+            assert server.stats()["requests"] == 2
+
+            config["mirror"]["max_age"] = -1
+            assert pathway_reaction_ids("rn00010", client) == ["R00200", "R00299"]
+            assert server.stats()["requests"] == 3
@@ -0,0 +1,166 @@
+import pytest
+import requests
+from kegg.client import KeggClient
+from kegg.ratelimit import AdaptiveConcurrency, RateLimiter, RetryBudget, TokenBucket
+from utils.config import load_config
+from .conftest import FakeResponse
+
+def fast_config(**kegg):
+    config = dict(load_config())
+    config["kegg"] = {**config["kegg"], "retry_backoff": 0.001, "rate_limit": None, **kegg}
+    return config
+
+def scripted_session(monkeypatch, outcomes):
+    """Make Session.get return or raise the given outcomes in turn; returns the call count."""
+    calls = []
+
+    def fake_get(session, url, timeout=None):
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(url)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse("ENTRY       R00200\n///\n", status_code=outcome)
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    return calls
+
+def test_token_bucket_paces_after_burst():
+    """Test that a bucket serves its burst at once and then one token per 1/rate seconds."""
+    now = [0.0]
+    bucket = TokenBucket(rate=4, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.25, 0.5]
+    now[0] = 2.0
+    assert bucket.reserve() == 0.0
+
+def test_concurrency_window_aimd():
+    """Test the additive increase and the rate-limited multiplicative decrease."""
+    now = [0.0]
+    window = AdaptiveConcurrency(1, 8, initial=4, clock=lambda: now[0])
+    for _ in range(4):
+        assert window.try_acquire()
+    assert not window.try_acquire()
+
+    for _ in range(4):
+        window.release(throttled=False)
+    # One more request per full window of successes
+    window.acquire()
+    window.release(throttled=False)
+    assert window.limit == 5
+
+    window.acquire()
+    window.release(throttled=True)
+    assert window.limit == 2
+    # A second failure of the same overload does not shrink it again
+    window.acquire()
+    window.release(throttled=True)
+    assert window.limit == 2
+    now[0] = 5.0
+    window.acquire()
+    window.release(throttled=True)
+    assert window.limit == 1
+
+def test_client_retries_throttled_requests(monkeypatch):
+    """Test that 403, 503 and connection errors are retried until a success."""
+    calls = scripted_session(monkeypatch, [403, requests.ConnectionError("reset"), 503, 200])
+    client = KeggClient(fast_config())
+    assert client.get_text(client.url("get/rn:R00200")).startswith("ENTRY")
+    assert len(calls) == 4
+
+def test_not_found_is_not_retried(monkeypatch):
+    """Test that a 404 is returned at once."""
+    calls = scripted_session(monkeypatch, [404])
+    client = KeggClient(fast_config())
+    assert client.request(client.url("get/rn:R99999")).status_code == 404
+    assert len(calls) == 1
+
+def test_retries_and_budget_are_bounded(monkeypatch):
+    """Test that retries stop at max_retries and once the budget is spent."""
+    calls = scripted_session(monkeypatch, [503])
+    client = KeggClient(fast_config(max_retries=2, retry_budget=3, retry_budget_window=None))
+    assert client.request(client.url("get/rn:R00200")).status_code == 503
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(requests.HTTPError):
+        client.get_text(client.url("get/rn:R00200"))
+    assert len(calls) == 2
+    assert client.limiter.budget.remaining == 0
+
+    scripted_session(monkeypatch, [requests.ConnectionError("reset")])
+    with pytest.raises(requests.ConnectionError):
+        client.request(client.url("get/rn:R00200"))
+
+def test_retry_after_and_jitter():
+    """Test that Retry-After takes precedence and jittered delays stay within the backoff."""
+    limiter = RateLimiter(backoff=1.0, backoff_max=8.0)
+    assert limiter.delay(0, retry_after="3") == 3.0
+    assert limiter.delay(0, retry_after="120") == 8.0
+    assert all(0 <= limiter.delay(2) <= 4.0 for _ in range(100))
+    assert RetryBudget(None).remaining is None
+
+def test_budget_is_restored_as_retries_age(monkeypatch):
+    """Test that a library caller retries again once spent retries leave the window."""
+    now = [0.0]
+    calls = scripted_session(monkeypatch, [503])
+    client = KeggClient(fast_config(max_retries=1, retry_budget=2, retry_budget_window=60))
+    client.limiter.budget.clock = lambda: now[0]
+    for _ in range(3):
+        assert client.request(client.url("get/rn:R00200")).status_code == 503
+    # Two retries spent, then the third request is reported at once
+    assert len(calls) == 5
+    assert client.limiter.budget.remaining == 0
+
+    now[0] = 61.0
+    assert client.limiter.budget.remaining == 2
+    calls = scripted_session(monkeypatch, [503, 200])
+    assert client.get_text(client.url("get/rn:R00200")).startswith("ENTRY")
+    assert len(calls) == 2
+    assert client.limiter.budget.remaining == 1
+
+def test_sliding_budget_window():
+    """Test that the budget counts only the retries of the last window."""
+    now = [0.0]
+    budget = RetryBudget(2, window=10, clock=lambda: now[0])
+    assert budget.spend()
+    now[0] = 5.0
+    assert budget.spend()
+    assert not budget.spend()
+    now[0] = 10.0
+    assert budget.remaining == 1 and budget.spend()
+    now[0] = 15.0
+    assert budget.remaining == 1
+    budget.reset()
+    assert budget.remaining == 2
+
+def test_async_waiters_wake_on_release():
+    """Test that a task waiting for a slot resumes when a thread releases one."""
+    import asyncio
+    import threading
+
+    window = AdaptiveConcurrency(1, 1)
+    window.acquire()
+
+    async def main():
+        waiter = asyncio.ensure_future(window.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        threading.Timer(0.01, window.release).start()
+        await asyncio.wait_for(waiter, 1)
+        # A cancelled waiter leaves nothing behind
+        cancelled = asyncio.ensure_future(window.aacquire())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+
+    asyncio.run(main())
+    assert window.in_flight == 1
+    assert window._async_waiters == []
+
+def test_workers_beyond_max_concurrency_warn(caplog):
+    """Test that asking for more workers than the window allows is reported once."""
+    limiter = RateLimiter(max_concurrency=3)
+    limiter.check_parallelism(3)
+    assert "max_concurrency" not in caplog.text
+    limiter.check_parallelism(8)
+    limiter.check_parallelism(8)
+    assert caplog.text.count("8 workers requested") == 1
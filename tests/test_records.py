@@ -0,0 +1,43 @@
+from fractions import Fraction
+import pandas as pd
+from kegg.parser import COMPOUND_SCHEMA, REACTION_SCHEMA, parse_entry, parse_entries
+from kegg.records import Compound, Reaction, StoichTerm, make_term, parse_coefficient, to_frame
+from kegg.stoichiometry import build_stoichiometric_matrix
+
+def test_parse_coefficient():
+    """Test numeric and symbolic coefficient conversion."""
+    assert parse_coefficient("2") == 2
+    assert parse_coefficient("1/2") == Fraction(1, 2)
+    assert parse_coefficient("n") == "n"
+    assert parse_coefficient("(n+1)") == "(n+1)"
+
+def test_typed_reaction(kegg_entry):
+    """Test that typed records hold the same data as dictionaries."""
+    data = parse_entry(kegg_entry("R00200"), REACTION_SCHEMA)
+    record = parse_entry(kegg_entry("R00200"), REACTION_SCHEMA, typed=True)
+
+    assert isinstance(record, Reaction)
+    assert record.reaction_id == data["reaction_id"]
+    assert record.reactants[0] == StoichTerm(1, "C00002")
+    assert [term.compound for term in record.products] == [term["compound"] for term in data["products"]]
+
+def test_terms_are_shared(kegg_entry):
+    """Test that identical stoichiometry terms are the same object."""
+    records = parse_entries(kegg_entry("R00200") + kegg_entry("R00299"), REACTION_SCHEMA, typed=True)
+    atp = [term for record in records for term in record.reactants if term.compound == "C00002"]
+    assert atp[0] is atp[1] is make_term("1", "C00002")
+
+def test_typed_compound(kegg_entry):
+    """Test numeric masses of compound records."""
+    record = parse_entry(kegg_entry("C00031"), COMPOUND_SCHEMA, typed=True)
+    assert isinstance(record, Compound)
+    assert isinstance(record.exact_mass, float)
+
+def test_to_frame(kegg_entry):
+    """Test that a frame of typed records feeds the matrix builder."""
+    records = parse_entries(kegg_entry("R00200") + kegg_entry("R00299"), REACTION_SCHEMA, typed=True)
+    df = to_frame(records)
+    assert list(df.columns) == list(Reaction._fields)
+    assert list(df["reaction_id"]) == ["R00200", "R00299"]
+    assert build_stoichiometric_matrix(df).matrix.shape[1] == 2
+    assert to_frame([]).empty
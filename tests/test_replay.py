@@ -0,0 +1,60 @@
+import pytest
+import requests
+from kegg.client import KeggClient
+from kegg.fetch_reaction import get_reactions_info
+from kegg.replay import ReplayServer, link_key
+from utils.config import load_config
+
+@pytest.fixture
+def replay():
+    with ReplayServer("tests/fixtures") as server:
+        yield server
+
+def test_get_combines_entries(replay):
+    """Test that a combined /get returns the recorded entries it knows."""
+    status, body = replay.respond("/get/rn:R00200+rn:R99999+rn:R00299")
+    assert status == 200
+    assert body.count("///") == 2
+    assert replay.respond("/get/rn:R99999") == (404, "")
+
+def test_list_and_link(replay):
+    """Test /list and the links derived from the entries."""
+    status, body = replay.respond("/list/rn")
+    assert body.splitlines()[0] == "R00200\tATP:pyruvate 2-O-phosphotransferase"
+
+    status, body = replay.respond("/link/rn/path:rn00010")
+    assert status == 200
+    assert "path:rn00010\trn:R00200" in body.splitlines()
+    status, body = replay.respond("/link/rn/M00001")
+    assert body.splitlines() == ["md:M00001\trn:R00200", "md:M00001\trn:R00299"]
+    status, body = replay.respond("/link/rn/cpd:C00031")
+    assert "cpd:C00031\trn:R00299" in body.splitlines()
+    assert replay.respond("/link/rn/M99999")[0] == 404
+    assert link_key("rn00010") == link_key("path:map00010") == "path:map00010"
+
+def test_fetch_through_replay(replay):
+    """Test the batch fetcher against the replay server."""
+    config = replay.configure(load_config())
+    with KeggClient(config) as client:
+        df = get_reactions_info(["R00200", "R00299", "R99999"], client=client)
+    assert list(df["reaction_id"]) == ["R00200", "R00299"]
+    assert df.attrs["missing_ids"] == ["R99999"]
+    assert replay.stats()["status"] == {200: 1}
+
+def test_injected_errors_and_connection_limit():
+    """Test error injection and the rejection of excess connections."""
+    with ReplayServer("tests/fixtures", error_rates={503: 1.0}) as server:
+        response = requests.get(f"{server.base_url}/get/rn:R00200")
+        assert response.status_code == 503
+
+    with ReplayServer("tests/fixtures", max_connections=1) as server:
+        with requests.Session() as first, requests.Session() as second:
+            assert first.get(f"{server.base_url}/get/rn:R00200").status_code == 200
+            # The first session keeps its connection open
+            assert second.get(f"{server.base_url}/get/rn:R00200").status_code == 403
+        assert server.stats()["rejected"] == 1
+
+def test_invalid_error_rates():
+    """Test that impossible error rates are rejected."""
+    with pytest.raises(ValueError):
+        ReplayServer({}, error_rates={503: 0.8, 500: 0.5})
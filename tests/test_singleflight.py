@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import requests
+from kegg.client import KeggClient
+from kegg.fetch_compound import get_compound_info, get_compound_record
+from kegg.singleflight import SingleFlight
+from utils.config import load_config
+
+def test_concurrent_callers_share_one_call():
+    """Test that callers arriving during a call get its result without calling again."""
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"compound_id": "C00002"}
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(group.do, "C00002", slow)
+        started.wait(5)
+        waiters = [pool.submit(group.do, "C00002", slow) for _ in range(3)]
+        while group.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in [leader] + waiters]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert group.in_flight() == 0
+    # Later calls are not cached
+    assert group.do("C00002", lambda: "again") == "again"
+
+def test_waiters_receive_the_same_exception():
+    """Test that a failed call raises in the caller and in every waiter."""
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    error = requests.ConnectionError("connection reset")
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise error
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(group.do, "C00001", failing)]
+        started.wait(5)
+        futures += [pool.submit(group.do, "C00001", failing) for _ in range(2)]
+        while group.coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(requests.ConnectionError):
+                future.result()
+            assert future.exception() is error
+
+def test_hot_compound_is_requested_once(fake_kegg, monkeypatch):
+    """Test that concurrent fetches of a popular compound send one request."""
+    fake_get = requests.Session.get
+
+    def slow_get(session, url, timeout=None):
+        time.sleep(0.2)
+        return fake_get(session, url, timeout=timeout)
+
+    monkeypatch.setattr(requests.Session, "get", slow_get)
+    client = KeggClient(dict(load_config()))
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: get_compound_record("C00002", client=client), range(8)))
+        frame = pool.submit(get_compound_info, "C00031", client).result()
+
+    assert fake_kegg.count(client.url("get/cpd:C00002")) == 1
+    assert all(result is results[0] for result in results)
+    assert list(frame["compound_id"]) == ["C00031"]
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from kegg.parser import REACTION_SCHEMA, parse_entry
+from kegg.records import reaction_from_dict, to_frame
+from kegg.stoichiometry import build_stoichiometric_matrix
+
+def test_build_matrix(kegg_entry):
+    """Test signs, labels and reversibility of the stoichiometric matrix."""
+    df = pd.DataFrame([parse_entry(kegg_entry(reaction_id), REACTION_SCHEMA) for reaction_id in ("R00200", "R00299")])
+    result = build_stoichiometric_matrix(df)
+
+    assert result.matrix.shape == (len(result.compound_ids), 2)
+    assert list(result.reaction_ids) == ["R00200", "R00299"]
+    assert list(result.compound_ids) == sorted(result.compound_ids)
+
+    dense = result.matrix.toarray()
+    atp = list(result.compound_ids).index("C00002")
+    assert dense[atp, 0] == -1.0
+    assert dense[atp, 1] == -1.0
+    assert dense[list(result.compound_ids).index("C00008"), 0] == 1.0
+    assert list(result.is_reversible) == list(df["is_reversible"])
+
+def test_symbolic_coefficients(caplog):
+    """Test that symbolic coefficients become NaN with a warning."""
+    df = pd.DataFrame({
+        "reaction_id": ["R1", "R2"],
+        "reactants": [[{"coefficient": "2", "compound": "C1"}], [{"coefficient": "n", "compound": "C2"}]],
+        "products": [[{"coefficient": "1", "compound": "C2"}], [{"coefficient": "(n+1)", "compound": "C3"}]],
+        "is_reversible": [False, True],
+    })
+    result = build_stoichiometric_matrix(df, sparse_format="csr")
+
+    dense = result.matrix.toarray()
+    assert dense[0, 0] == -2.0
+    assert np.isnan(dense[1, 1]) and np.isnan(dense[2, 1])
+    assert "R2" in caplog.text
+
+def test_fractional_coefficients(caplog):
+    """Test that '1/2' is a number, the same for dictionaries and typed records."""
+    data = {
+        "reaction_id": "R00009", "name": "", "definition": "", "equation": "C00027 <=> 1/2 C00007 + C00001",
+        "reactants": [{"coefficient": "1", "compound": "C00027"}],
+        "products": [{"coefficient": "1/2", "compound": "C00007"}, {"coefficient": "1", "compound": "C00001"}],
+        "is_reversible": True, "enzyme": "", "pathways": "", "modules": "", "orthology": "", "dblinks": "",
+    }
+    result = build_stoichiometric_matrix(pd.DataFrame([data]))
+    dense = result.matrix.toarray()
+    assert dense[list(result.compound_ids).index("C00007"), 0] == 0.5
+    assert "symbolic" not in caplog.text
+
+    typed = build_stoichiometric_matrix(to_frame([reaction_from_dict(data)]))
+    assert np.array_equal(typed.matrix.toarray(), dense)
+
+def test_unsupported_format():
+    """Test that unknown sparse formats are rejected."""
+    with pytest.raises(ValueError):
+        build_stoichiometric_matrix(pd.DataFrame(), sparse_format="dok")